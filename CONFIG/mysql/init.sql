@@ -41,15 +41,20 @@ CREATE TABLE IF NOT EXISTS `mhdb`.`devanning_plan` (
   `req_from_time` DATETIME NULL COMMENT 'MH作業希望時間(From)',
   `req_to_time` DATETIME NULL COMMENT 'MH作業希望時間(To)',
   `actual_time` DATETIME NULL COMMENT 'MH作業実績時間',
+  `req_start_time` DATETIME GENERATED ALWAYS AS (COALESCE(`req_from_time`, `req_to_time`)) STORED COMMENT 'MH作業開始時間(検索用)',
   `status` INT NOT NULL COMMENT '状態(idle(0),planning(1),done(2),cancel(-1))',
   `is_bl_need` TINYINT NOT NULL DEFAULT 0 COMMENT 'B/L 検証有無(発MHのみ1,それ以外は0)',
   `is_departure_mh` TINYINT NOT NULL DEFAULT 1 COMMENT '発MHなら1、着MHなら0',
   `created_at` DATETIME NOT NULL COMMENT '作成日時',
-  `updated_at` DATETIME NOT NULL COMMENT '更新日時',
+  `updated_at` DATETIME(6) NOT NULL COMMENT '更新日時',
   PRIMARY KEY (`id`),
+  UNIQUE INDEX `uq_mh_trsp_instruction_id` (`mh` ASC, `trsp_instruction_id` ASC),
   INDEX `idx_mh` (`mh` ASC),
   INDEX `idx_req_from_time` (`req_from_time` ASC),
-  INDEX `idx_req_to_time` (`req_to_time` ASC))
+  INDEX `idx_req_to_time` (`req_to_time` ASC),
+  INDEX `idx_devanning_plan_mh_req_start_time` (`mh` ASC, `req_start_time` ASC),
+  INDEX `idx_devanning_plan_mh_updated_at_id` (`mh` ASC, `updated_at` ASC, `id` ASC),
+  INDEX `idx_devanning_plan_trsp_instruction_id_is_departure_mh` (`trsp_instruction_id` ASC, `is_departure_mh` ASC))
 ENGINE = InnoDB;
 
 
@@ -71,15 +76,117 @@ CREATE TABLE IF NOT EXISTS `mhdb`.`vanning_plan` (
   `req_from_time` DATETIME NULL COMMENT 'MH作業希望時間(From)',
   `req_to_time` DATETIME NULL COMMENT 'MH作業希望時間(To)',
   `actual_time` DATETIME NULL COMMENT 'MH作業実績時間',
+  `req_start_time` DATETIME GENERATED ALWAYS AS (COALESCE(`req_from_time`, `req_to_time`)) STORED COMMENT 'MH作業開始時間(検索用)',
   `status` INT NOT NULL COMMENT '状態(idle(0),planning(1),done(2),cancel(-1))',
   `is_bl_need` TINYINT NOT NULL DEFAULT 0 COMMENT 'B/L 検証有無(発MHのみ1,それ以外は0)',
   `is_departure_mh` TINYINT NOT NULL DEFAULT 1 COMMENT '発MHなら1、着MHなら0',
   `created_at` DATETIME NOT NULL COMMENT '作成日時',
-  `updated_at` DATETIME NOT NULL COMMENT '更新日時',
+  `updated_at` DATETIME(6) NOT NULL COMMENT '更新日時',
   PRIMARY KEY (`id`),
+  UNIQUE INDEX `uq_mh_trsp_instruction_id` (`mh` ASC, `trsp_instruction_id` ASC),
   INDEX `idx_mh` (`mh` ASC),
   INDEX `idx_req_from_time` (`req_from_time` ASC),
-  INDEX `idx_req_to_time` (`req_to_time` ASC))
+  INDEX `idx_req_to_time` (`req_to_time` ASC),
+  INDEX `idx_vanning_plan_mh_req_start_time` (`mh` ASC, `req_start_time` ASC),
+  INDEX `idx_vanning_plan_mh_updated_at_id` (`mh` ASC, `updated_at` ASC, `id` ASC),
+  INDEX `idx_vanning_plan_trsp_instruction_id_is_departure_mh` (`trsp_instruction_id` ASC, `is_departure_mh` ASC))
+ENGINE = InnoDB;
+
+
+-- -----------------------------------------------------
+-- Table `mhdb`.`plan_space`
+-- -----------------------------------------------------
+DROP TABLE IF EXISTS `mhdb`.`plan_space` ;
+
+CREATE TABLE IF NOT EXISTS `mhdb`.`plan_space` (
+  `id` INT NOT NULL AUTO_INCREMENT,
+  `plan_type` VARCHAR(16) NOT NULL COMMENT '計画の種類(vanning_plan/devanning_plan)',
+  `plan_id` INT NOT NULL COMMENT '計画のid',
+  `mh` VARCHAR(16) NOT NULL COMMENT 'MHのGLN(3桁＋13桁)',
+  `space` VARCHAR(256) NOT NULL COMMENT 'MHの駐車枠',
+  `window_start` DATETIME NULL COMMENT 'MH作業開始時間(MH作業希望時間(From)、無ければ(To))',
+  `window_end` DATETIME NULL COMMENT 'MH作業終了時間(MH作業希望時間(To)、無ければ(From))',
+  PRIMARY KEY (`id`),
+  UNIQUE INDEX `uq_plan_space_plan_type_plan_id_space` (`plan_type` ASC, `plan_id` ASC, `space` ASC),
+  INDEX `idx_plan_space_mh_space_window_start` (`mh` ASC, `space` ASC, `window_start` ASC))
+ENGINE = InnoDB;
+
+
+-- -----------------------------------------------------
+-- Table `mhdb`.`plan_version`
+-- -----------------------------------------------------
+DROP TABLE IF EXISTS `mhdb`.`plan_version` ;
+
+CREATE TABLE IF NOT EXISTS `mhdb`.`plan_version` (
+  `mh` VARCHAR(16) NOT NULL COMMENT 'MHのGLN(3桁＋13桁)',
+  `version` BIGINT NOT NULL DEFAULT 0 COMMENT '更新番号',
+  PRIMARY KEY (`mh`))
+ENGINE = InnoDB;
+
+
+-- -----------------------------------------------------
+-- Table `mhdb`.`plan_equipment`
+-- -----------------------------------------------------
+DROP TABLE IF EXISTS `mhdb`.`plan_equipment` ;
+
+CREATE TABLE IF NOT EXISTS `mhdb`.`plan_equipment` (
+  `id` INT NOT NULL AUTO_INCREMENT,
+  `plan_type` VARCHAR(16) NOT NULL COMMENT '計画の種類(vanning_plan/devanning_plan)',
+  `plan_id` INT NOT NULL COMMENT '計画のid',
+  `mh` VARCHAR(16) NOT NULL COMMENT 'MHのGLN(3桁＋13桁)',
+  `kind` VARCHAR(8) NOT NULL COMMENT '機材の種類(tractor/trailer)',
+  `giai` VARCHAR(140) NOT NULL COMMENT '機材のGIAI',
+  `window_start` DATETIME NULL COMMENT 'MH作業開始時間(MH作業希望時間(From)、無ければ(To))',
+  `window_end` DATETIME NULL COMMENT 'MH作業終了時間(MH作業希望時間(To)、無ければ(From))',
+  PRIMARY KEY (`id`),
+  UNIQUE INDEX `uq_plan_equipment_plan_type_plan_id_kind_giai` (`plan_type` ASC, `plan_id` ASC, `kind` ASC, `giai` ASC),
+  INDEX `idx_plan_equipment_giai_window_start` (`giai` ASC, `window_start` ASC))
+ENGINE = InnoDB;
+
+
+-- -----------------------------------------------------
+-- Table `mhdb`.`plan_event`
+-- -----------------------------------------------------
+DROP TABLE IF EXISTS `mhdb`.`plan_event` ;
+
+CREATE TABLE IF NOT EXISTS `mhdb`.`plan_event` (
+  `seq` BIGINT NOT NULL AUTO_INCREMENT COMMENT 'イベントの通番',
+  `mh` VARCHAR(16) NOT NULL COMMENT 'MHのGLN(3桁＋13桁)',
+  `plan_type` VARCHAR(16) NOT NULL COMMENT '計画の種類(vanning_plan/devanning_plan)',
+  `trsp_instruction_id` VARCHAR(20) NOT NULL COMMENT 'trsp_instruction_id',
+  `op` VARCHAR(8) NOT NULL COMMENT '操作(create/update/delete)',
+  `created_at` DATETIME NOT NULL COMMENT '作成日時',
+  PRIMARY KEY (`seq`),
+  INDEX `idx_plan_event_mh_seq` (`mh` ASC, `seq` ASC))
+ENGINE = InnoDB;
+
+
+-- -----------------------------------------------------
+-- Table `mhdb`.`plan_event_purge`
+-- -----------------------------------------------------
+DROP TABLE IF EXISTS `mhdb`.`plan_event_purge` ;
+
+CREATE TABLE IF NOT EXISTS `mhdb`.`plan_event_purge` (
+  `mh` VARCHAR(16) NOT NULL COMMENT 'MHのGLN(3桁＋13桁)',
+  `purged_seq` BIGINT NOT NULL DEFAULT 0 COMMENT '削除したイベントの最大の seq',
+  PRIMARY KEY (`mh`))
+ENGINE = InnoDB;
+
+
+-- -----------------------------------------------------
+-- Table `mhdb`.`plan_tombstone`
+-- -----------------------------------------------------
+DROP TABLE IF EXISTS `mhdb`.`plan_tombstone` ;
+
+CREATE TABLE IF NOT EXISTS `mhdb`.`plan_tombstone` (
+  `id` BIGINT NOT NULL AUTO_INCREMENT,
+  `plan_type` VARCHAR(16) NOT NULL COMMENT '計画の種類(vanning_plan/devanning_plan)',
+  `plan_id` INT NOT NULL COMMENT '削除した計画のid',
+  `mh` VARCHAR(16) NOT NULL COMMENT 'MHのGLN(3桁＋13桁)',
+  `trsp_instruction_id` VARCHAR(20) NOT NULL COMMENT 'trsp_instruction_id',
+  `deleted_at` DATETIME(6) NOT NULL COMMENT '削除日時',
+  PRIMARY KEY (`id`),
+  INDEX `idx_plan_tombstone_mh_deleted_at_id` (`mh` ASC, `deleted_at` ASC, `id` ASC))
 ENGINE = InnoDB;
 
 
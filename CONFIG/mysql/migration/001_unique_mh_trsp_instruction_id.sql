@@ -0,0 +1,25 @@
+-- -----------------------------------------------------
+-- 既存DB向けの更新スクリプト
+-- (mh, trsp_instruction_id) の一意キーを追加する
+-- 計画の upsert (INSERT ... ON DUPLICATE KEY UPDATE) はこの一意キーを前提とする
+-- -----------------------------------------------------
+USE `mhdb` ;
+
+-- 重複している計画は、APIが参照していたもの(idが最小)以外を削除する
+DELETE `p1` FROM `mhdb`.`vanning_plan` `p1`
+  INNER JOIN `mhdb`.`vanning_plan` `p2`
+  ON `p1`.`mh` = `p2`.`mh`
+  AND `p1`.`trsp_instruction_id` = `p2`.`trsp_instruction_id`
+  AND `p1`.`id` > `p2`.`id`;
+
+DELETE `p1` FROM `mhdb`.`devanning_plan` `p1`
+  INNER JOIN `mhdb`.`devanning_plan` `p2`
+  ON `p1`.`mh` = `p2`.`mh`
+  AND `p1`.`trsp_instruction_id` = `p2`.`trsp_instruction_id`
+  AND `p1`.`id` > `p2`.`id`;
+
+ALTER TABLE `mhdb`.`vanning_plan`
+  ADD UNIQUE INDEX `uq_mh_trsp_instruction_id` (`mh` ASC, `trsp_instruction_id` ASC);
+
+ALTER TABLE `mhdb`.`devanning_plan`
+  ADD UNIQUE INDEX `uq_mh_trsp_instruction_id` (`mh` ASC, `trsp_instruction_id` ASC);
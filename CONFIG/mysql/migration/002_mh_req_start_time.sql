@@ -0,0 +1,13 @@
+-- -----------------------------------------------------
+-- 既存DB向けの更新スクリプト
+-- 計画一覧の期間検索用に、MH作業開始時間の生成列と (mh, req_start_time) の索引を追加する
+-- -----------------------------------------------------
+USE `mhdb` ;
+
+ALTER TABLE `mhdb`.`vanning_plan`
+  ADD COLUMN `req_start_time` DATETIME GENERATED ALWAYS AS (COALESCE(`req_from_time`, `req_to_time`)) STORED COMMENT 'MH作業開始時間(検索用)' AFTER `actual_time`,
+  ADD INDEX `idx_vanning_plan_mh_req_start_time` (`mh` ASC, `req_start_time` ASC);
+
+ALTER TABLE `mhdb`.`devanning_plan`
+  ADD COLUMN `req_start_time` DATETIME GENERATED ALWAYS AS (COALESCE(`req_from_time`, `req_to_time`)) STORED COMMENT 'MH作業開始時間(検索用)' AFTER `actual_time`,
+  ADD INDEX `idx_devanning_plan_mh_req_start_time` (`mh` ASC, `req_start_time` ASC);
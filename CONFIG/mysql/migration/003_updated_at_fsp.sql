@@ -0,0 +1,11 @@
+-- -----------------------------------------------------
+-- 既存DB向けの更新スクリプト
+-- ETag で同一秒内の更新を判別できるよう、更新日時をマイクロ秒まで保持する
+-- -----------------------------------------------------
+USE `mhdb` ;
+
+ALTER TABLE `mhdb`.`vanning_plan`
+  MODIFY COLUMN `updated_at` DATETIME(6) NOT NULL COMMENT '更新日時';
+
+ALTER TABLE `mhdb`.`devanning_plan`
+  MODIFY COLUMN `updated_at` DATETIME(6) NOT NULL COMMENT '更新日時';
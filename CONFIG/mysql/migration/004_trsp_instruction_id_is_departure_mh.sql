@@ -0,0 +1,13 @@
+-- -----------------------------------------------------
+-- 既存DB向けの更新スクリプト
+-- 計画検索(plan_search)用に、(trsp_instruction_id, is_departure_mh) の索引を追加する
+-- -----------------------------------------------------
+USE `mhdb` ;
+
+ALTER TABLE `mhdb`.`vanning_plan`
+  ADD INDEX `idx_vanning_plan_trsp_instruction_id_is_departure_mh` (`trsp_instruction_id` ASC, `is_departure_mh` ASC),
+  ALGORITHM=INPLACE, LOCK=NONE;
+
+ALTER TABLE `mhdb`.`devanning_plan`
+  ADD INDEX `idx_devanning_plan_trsp_instruction_id_is_departure_mh` (`trsp_instruction_id` ASC, `is_departure_mh` ASC),
+  ALGORITHM=INPLACE, LOCK=NONE;
@@ -0,0 +1,44 @@
+-- -----------------------------------------------------
+-- 既存DB向けの更新スクリプト
+-- 駐車枠ごとの計画検索(plan_space)用に、計画の駐車枠の割当テーブルを追加し、
+-- 既存の計画の mh_space_list_str から割当を作成する
+-- -----------------------------------------------------
+USE `mhdb` ;
+
+CREATE TABLE IF NOT EXISTS `mhdb`.`plan_space` (
+  `id` INT NOT NULL AUTO_INCREMENT,
+  `plan_type` VARCHAR(16) NOT NULL COMMENT '計画の種類(vanning_plan/devanning_plan)',
+  `plan_id` INT NOT NULL COMMENT '計画のid',
+  `mh` VARCHAR(16) NOT NULL COMMENT 'MHのGLN(3桁＋13桁)',
+  `space` VARCHAR(32) NOT NULL COMMENT 'MHの駐車枠',
+  `window_start` DATETIME NULL COMMENT 'MH作業開始時間(MH作業希望時間(From)、無ければ(To))',
+  `window_end` DATETIME NULL COMMENT 'MH作業終了時間(MH作業希望時間(To)、無ければ(From))',
+  PRIMARY KEY (`id`),
+  UNIQUE INDEX `uq_plan_space_plan_type_plan_id_space` (`plan_type` ASC, `plan_id` ASC, `space` ASC),
+  INDEX `idx_plan_space_mh_space_window_start` (`mh` ASC, `space` ASC, `window_start` ASC))
+ENGINE = InnoDB;
+
+-- カンマ区切りの駐車枠を JSON 配列に変換し、JSON_TABLE で1枠1行に展開する
+INSERT IGNORE INTO `mhdb`.`plan_space`
+  (`plan_type`, `plan_id`, `mh`, `space`, `window_start`, `window_end`)
+SELECT 'vanning_plan', p.`id`, p.`mh`, s.`space`,
+  COALESCE(p.`req_from_time`, p.`req_to_time`),
+  COALESCE(p.`req_to_time`, p.`req_from_time`)
+FROM `mhdb`.`vanning_plan` p,
+  JSON_TABLE(
+    CONCAT('["', REPLACE(p.`mh_space_list_str`, ',', '","'), '"]'),
+    '$[*]' COLUMNS (`space` VARCHAR(32) PATH '$')
+  ) s
+WHERE p.`mh_space_list_str` <> '' AND s.`space` <> '';
+
+INSERT IGNORE INTO `mhdb`.`plan_space`
+  (`plan_type`, `plan_id`, `mh`, `space`, `window_start`, `window_end`)
+SELECT 'devanning_plan', p.`id`, p.`mh`, s.`space`,
+  COALESCE(p.`req_from_time`, p.`req_to_time`),
+  COALESCE(p.`req_to_time`, p.`req_from_time`)
+FROM `mhdb`.`devanning_plan` p,
+  JSON_TABLE(
+    CONCAT('["', REPLACE(p.`mh_space_list_str`, ',', '","'), '"]'),
+    '$[*]' COLUMNS (`space` VARCHAR(32) PATH '$')
+  ) s
+WHERE p.`mh_space_list_str` <> '' AND s.`space` <> '';
@@ -0,0 +1,11 @@
+-- -----------------------------------------------------
+-- 既存DB向けの更新スクリプト
+-- プロセス内の計画索引(PLAN_INDEX_ENABLED)用に、MHごとの計画の更新番号のテーブルを追加する
+-- -----------------------------------------------------
+USE `mhdb` ;
+
+CREATE TABLE IF NOT EXISTS `mhdb`.`plan_version` (
+  `mh` VARCHAR(16) NOT NULL COMMENT 'MHのGLN(3桁＋13桁)',
+  `version` BIGINT NOT NULL DEFAULT 0 COMMENT '更新番号',
+  PRIMARY KEY (`mh`))
+ENGINE = InnoDB;
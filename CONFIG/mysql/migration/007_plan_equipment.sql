@@ -0,0 +1,62 @@
+-- -----------------------------------------------------
+-- 既存DB向けの更新スクリプト
+-- 機材ごとの計画検索(plan_equipment)用に、計画の使用機材のテーブルを追加し、
+-- 既存の計画の tractor_giai, trailer_giai_list_str から行を作成する
+-- -----------------------------------------------------
+USE `mhdb` ;
+
+CREATE TABLE IF NOT EXISTS `mhdb`.`plan_equipment` (
+  `id` INT NOT NULL AUTO_INCREMENT,
+  `plan_type` VARCHAR(16) NOT NULL COMMENT '計画の種類(vanning_plan/devanning_plan)',
+  `plan_id` INT NOT NULL COMMENT '計画のid',
+  `mh` VARCHAR(16) NOT NULL COMMENT 'MHのGLN(3桁＋13桁)',
+  `kind` VARCHAR(8) NOT NULL COMMENT '機材の種類(tractor/trailer)',
+  `giai` VARCHAR(34) NOT NULL COMMENT '機材のGIAI',
+  `window_start` DATETIME NULL COMMENT 'MH作業開始時間(MH作業希望時間(From)、無ければ(To))',
+  `window_end` DATETIME NULL COMMENT 'MH作業終了時間(MH作業希望時間(To)、無ければ(From))',
+  PRIMARY KEY (`id`),
+  UNIQUE INDEX `uq_plan_equipment_plan_type_plan_id_kind_giai` (`plan_type` ASC, `plan_id` ASC, `kind` ASC, `giai` ASC),
+  INDEX `idx_plan_equipment_giai_window_start` (`giai` ASC, `window_start` ASC))
+ENGINE = InnoDB;
+
+-- トラクター
+INSERT IGNORE INTO `mhdb`.`plan_equipment`
+  (`plan_type`, `plan_id`, `mh`, `kind`, `giai`, `window_start`, `window_end`)
+SELECT 'vanning_plan', p.`id`, p.`mh`, 'tractor', p.`tractor_giai`,
+  COALESCE(p.`req_from_time`, p.`req_to_time`),
+  COALESCE(p.`req_to_time`, p.`req_from_time`)
+FROM `mhdb`.`vanning_plan` p
+WHERE p.`tractor_giai` <> '';
+
+INSERT IGNORE INTO `mhdb`.`plan_equipment`
+  (`plan_type`, `plan_id`, `mh`, `kind`, `giai`, `window_start`, `window_end`)
+SELECT 'devanning_plan', p.`id`, p.`mh`, 'tractor', p.`tractor_giai`,
+  COALESCE(p.`req_from_time`, p.`req_to_time`),
+  COALESCE(p.`req_to_time`, p.`req_from_time`)
+FROM `mhdb`.`devanning_plan` p
+WHERE p.`tractor_giai` <> '';
+
+-- トレーラー（カンマ区切りの GIAI を JSON 配列に変換し、JSON_TABLE で1台1行に展開する）
+INSERT IGNORE INTO `mhdb`.`plan_equipment`
+  (`plan_type`, `plan_id`, `mh`, `kind`, `giai`, `window_start`, `window_end`)
+SELECT 'vanning_plan', p.`id`, p.`mh`, 'trailer', t.`giai`,
+  COALESCE(p.`req_from_time`, p.`req_to_time`),
+  COALESCE(p.`req_to_time`, p.`req_from_time`)
+FROM `mhdb`.`vanning_plan` p,
+  JSON_TABLE(
+    CONCAT('["', REPLACE(p.`trailer_giai_list_str`, ',', '","'), '"]'),
+    '$[*]' COLUMNS (`giai` VARCHAR(34) PATH '$')
+  ) t
+WHERE p.`trailer_giai_list_str` <> '' AND t.`giai` <> '';
+
+INSERT IGNORE INTO `mhdb`.`plan_equipment`
+  (`plan_type`, `plan_id`, `mh`, `kind`, `giai`, `window_start`, `window_end`)
+SELECT 'devanning_plan', p.`id`, p.`mh`, 'trailer', t.`giai`,
+  COALESCE(p.`req_from_time`, p.`req_to_time`),
+  COALESCE(p.`req_to_time`, p.`req_from_time`)
+FROM `mhdb`.`devanning_plan` p,
+  JSON_TABLE(
+    CONCAT('["', REPLACE(p.`trailer_giai_list_str`, ',', '","'), '"]'),
+    '$[*]' COLUMNS (`giai` VARCHAR(34) PATH '$')
+  ) t
+WHERE p.`trailer_giai_list_str` <> '' AND t.`giai` <> '';
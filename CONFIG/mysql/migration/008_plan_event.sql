@@ -0,0 +1,16 @@
+-- -----------------------------------------------------
+-- 既存DB向けの更新スクリプト
+-- 計画の変更通知(plan_event)用に、計画の変更イベントのテーブルを追加する
+-- -----------------------------------------------------
+USE `mhdb` ;
+
+CREATE TABLE IF NOT EXISTS `mhdb`.`plan_event` (
+  `seq` BIGINT NOT NULL AUTO_INCREMENT COMMENT 'イベントの通番',
+  `mh` VARCHAR(16) NOT NULL COMMENT 'MHのGLN(3桁＋13桁)',
+  `plan_type` VARCHAR(16) NOT NULL COMMENT '計画の種類(vanning_plan/devanning_plan)',
+  `trsp_instruction_id` VARCHAR(20) NOT NULL COMMENT 'trsp_instruction_id',
+  `op` VARCHAR(8) NOT NULL COMMENT '操作(create/update/delete)',
+  `created_at` DATETIME NOT NULL COMMENT '作成日時',
+  PRIMARY KEY (`seq`),
+  INDEX `idx_plan_event_mh_seq` (`mh` ASC, `seq` ASC))
+ENGINE = InnoDB;
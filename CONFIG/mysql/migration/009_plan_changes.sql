@@ -0,0 +1,22 @@
+-- -----------------------------------------------------
+-- 既存DB向けの更新スクリプト
+-- 計画の差分同期(plan_changes)用に、更新日時の索引と、削除した計画の記録のテーブルを追加する
+-- -----------------------------------------------------
+USE `mhdb` ;
+
+ALTER TABLE `mhdb`.`vanning_plan`
+  ADD INDEX `idx_vanning_plan_mh_updated_at_id` (`mh` ASC, `updated_at` ASC, `id` ASC);
+
+ALTER TABLE `mhdb`.`devanning_plan`
+  ADD INDEX `idx_devanning_plan_mh_updated_at_id` (`mh` ASC, `updated_at` ASC, `id` ASC);
+
+CREATE TABLE IF NOT EXISTS `mhdb`.`plan_tombstone` (
+  `id` BIGINT NOT NULL AUTO_INCREMENT,
+  `plan_type` VARCHAR(16) NOT NULL COMMENT '計画の種類(vanning_plan/devanning_plan)',
+  `plan_id` INT NOT NULL COMMENT '削除した計画のid',
+  `mh` VARCHAR(16) NOT NULL COMMENT 'MHのGLN(3桁＋13桁)',
+  `trsp_instruction_id` VARCHAR(20) NOT NULL COMMENT 'trsp_instruction_id',
+  `deleted_at` DATETIME(6) NOT NULL COMMENT '削除日時',
+  PRIMARY KEY (`id`),
+  INDEX `idx_plan_tombstone_mh_deleted_at_id` (`mh` ASC, `deleted_at` ASC, `id` ASC))
+ENGINE = InnoDB;
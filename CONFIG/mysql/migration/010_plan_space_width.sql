@@ -0,0 +1,44 @@
+-- -----------------------------------------------------
+-- 既存DB向けの更新スクリプト
+-- 駐車枠の割当(plan_space)の駐車枠を、計画の mh_space_list_str と同じ長さに広げ、
+-- 005 で長さを超えて切り詰められた割当を作り直す
+-- -----------------------------------------------------
+USE `mhdb` ;
+
+ALTER TABLE `mhdb`.`plan_space`
+  MODIFY COLUMN `space` VARCHAR(256) NOT NULL COMMENT 'MHの駐車枠';
+
+-- 計画の駐車枠のリストに無い（切り詰められた）割当を削除する
+DELETE s FROM `mhdb`.`plan_space` s
+  JOIN `mhdb`.`vanning_plan` p
+    ON s.`plan_type` = 'vanning_plan' AND s.`plan_id` = p.`id`
+WHERE FIND_IN_SET(s.`space`, p.`mh_space_list_str`) = 0;
+
+DELETE s FROM `mhdb`.`plan_space` s
+  JOIN `mhdb`.`devanning_plan` p
+    ON s.`plan_type` = 'devanning_plan' AND s.`plan_id` = p.`id`
+WHERE FIND_IN_SET(s.`space`, p.`mh_space_list_str`) = 0;
+
+INSERT IGNORE INTO `mhdb`.`plan_space`
+  (`plan_type`, `plan_id`, `mh`, `space`, `window_start`, `window_end`)
+SELECT 'vanning_plan', p.`id`, p.`mh`, s.`space`,
+  COALESCE(p.`req_from_time`, p.`req_to_time`),
+  COALESCE(p.`req_to_time`, p.`req_from_time`)
+FROM `mhdb`.`vanning_plan` p,
+  JSON_TABLE(
+    CONCAT('["', REPLACE(p.`mh_space_list_str`, ',', '","'), '"]'),
+    '$[*]' COLUMNS (`space` VARCHAR(256) PATH '$')
+  ) s
+WHERE p.`mh_space_list_str` <> '' AND s.`space` <> '';
+
+INSERT IGNORE INTO `mhdb`.`plan_space`
+  (`plan_type`, `plan_id`, `mh`, `space`, `window_start`, `window_end`)
+SELECT 'devanning_plan', p.`id`, p.`mh`, s.`space`,
+  COALESCE(p.`req_from_time`, p.`req_to_time`),
+  COALESCE(p.`req_to_time`, p.`req_from_time`)
+FROM `mhdb`.`devanning_plan` p,
+  JSON_TABLE(
+    CONCAT('["', REPLACE(p.`mh_space_list_str`, ',', '","'), '"]'),
+    '$[*]' COLUMNS (`space` VARCHAR(256) PATH '$')
+  ) s
+WHERE p.`mh_space_list_str` <> '' AND s.`space` <> '';
@@ -0,0 +1,16 @@
+-- -----------------------------------------------------
+-- 既存DB向けの更新スクリプト
+-- 計画の変更通知(plan_event)用に、MHごとの削除済みのイベントの最大の seq のテーブルを追加する
+-- -----------------------------------------------------
+USE `mhdb` ;
+
+CREATE TABLE IF NOT EXISTS `mhdb`.`plan_event_purge` (
+  `mh` VARCHAR(16) NOT NULL COMMENT 'MHのGLN(3桁＋13桁)',
+  `purged_seq` BIGINT NOT NULL DEFAULT 0 COMMENT '削除したイベントの最大の seq',
+  PRIMARY KEY (`mh`))
+ENGINE = InnoDB;
+
+-- 削除済みのイベントは分からないため、残っているイベントの最小の seq より前を削除済みとする
+INSERT IGNORE INTO `mhdb`.`plan_event_purge` (`mh`, `purged_seq`)
+  SELECT `mh`, MIN(`seq`) - 1 FROM `mhdb`.`plan_event`
+  GROUP BY `mh` HAVING MIN(`seq`) > 1;
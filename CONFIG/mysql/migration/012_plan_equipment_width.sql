@@ -0,0 +1,44 @@
+-- -----------------------------------------------------
+-- 既存DB向けの更新スクリプト
+-- 計画の使用機材(plan_equipment)の GIAI を、計画の trailer_giai_list_str と同じ長さに広げ、
+-- 007 で長さを超えて切り詰められたトレーラーの行を作り直す
+-- -----------------------------------------------------
+USE `mhdb` ;
+
+ALTER TABLE `mhdb`.`plan_equipment`
+  MODIFY COLUMN `giai` VARCHAR(140) NOT NULL COMMENT '機材のGIAI';
+
+-- 計画のトレーラーのリストに無い（切り詰められた）行を削除する
+DELETE e FROM `mhdb`.`plan_equipment` e
+  JOIN `mhdb`.`vanning_plan` p
+    ON e.`plan_type` = 'vanning_plan' AND e.`plan_id` = p.`id`
+WHERE e.`kind` = 'trailer' AND FIND_IN_SET(e.`giai`, p.`trailer_giai_list_str`) = 0;
+
+DELETE e FROM `mhdb`.`plan_equipment` e
+  JOIN `mhdb`.`devanning_plan` p
+    ON e.`plan_type` = 'devanning_plan' AND e.`plan_id` = p.`id`
+WHERE e.`kind` = 'trailer' AND FIND_IN_SET(e.`giai`, p.`trailer_giai_list_str`) = 0;
+
+INSERT IGNORE INTO `mhdb`.`plan_equipment`
+  (`plan_type`, `plan_id`, `mh`, `kind`, `giai`, `window_start`, `window_end`)
+SELECT 'vanning_plan', p.`id`, p.`mh`, 'trailer', t.`giai`,
+  COALESCE(p.`req_from_time`, p.`req_to_time`),
+  COALESCE(p.`req_to_time`, p.`req_from_time`)
+FROM `mhdb`.`vanning_plan` p,
+  JSON_TABLE(
+    CONCAT('["', REPLACE(p.`trailer_giai_list_str`, ',', '","'), '"]'),
+    '$[*]' COLUMNS (`giai` VARCHAR(140) PATH '$')
+  ) t
+WHERE p.`trailer_giai_list_str` <> '' AND t.`giai` <> '';
+
+INSERT IGNORE INTO `mhdb`.`plan_equipment`
+  (`plan_type`, `plan_id`, `mh`, `kind`, `giai`, `window_start`, `window_end`)
+SELECT 'devanning_plan', p.`id`, p.`mh`, 'trailer', t.`giai`,
+  COALESCE(p.`req_from_time`, p.`req_to_time`),
+  COALESCE(p.`req_to_time`, p.`req_from_time`)
+FROM `mhdb`.`devanning_plan` p,
+  JSON_TABLE(
+    CONCAT('["', REPLACE(p.`trailer_giai_list_str`, ',', '","'), '"]'),
+    '$[*]' COLUMNS (`giai` VARCHAR(140) PATH '$')
+  ) t
+WHERE p.`trailer_giai_list_str` <> '' AND t.`giai` <> '';
@@ -2,4 +2,8 @@
 
 /etc/init.d/cron start
 
+# Prometheus のメトリクス（multiprocess モード）の書き出し先を起動時に空にする
+rm -rf "$PROMETHEUS_MULTIPROC_DIR"
+mkdir -p "$PROMETHEUS_MULTIPROC_DIR"
+
 /usr/local/bin/supervisord
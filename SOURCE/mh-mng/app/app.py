@@ -19,9 +19,7 @@ import os
 import logging
 from flask import (
     Flask,
-    has_request_context,
-    request,
-
+    jsonify,
 )
 from flask_restx import Api
 from flask_cors import CORS
@@ -31,6 +29,15 @@ from flask.logging import default_handler
 sys.path.append(os.path.join(os.path.dirname(__file__), "."))
 from config import ConfigIns
 from database import db, ma
+from com.log import setup_logging
+from com.query_profiler import db_profile_headers
+from com.metrics import (
+    end_request_metrics,
+    metrics_response,
+    record_request_metrics,
+    start_request_metrics,
+    update_db_pool_metrics,
+)
 
 LOGFILE_NAME = "/log/debug.log"
 MH_SYS_VERSION = "1.0.0"
@@ -54,41 +61,48 @@ ma.init_app(app)
 
 import model.devanning_plan
 import model.vanning_plan
+import model.plan_space
+import model.plan_version
+import model.plan_equipment
+import model.plan_event
+import model.plan_event_purge
+import model.plan_tombstone
 
 with app.app_context():
     db.create_all()
 
 
 # ログ設定
+# ファイル・標準エラーへの出力は com.log のリスナーのスレッドで行う
 app.logger.setLevel(logging.DEBUG)
-log_handler = logging.FileHandler(ConfigIns.LOGFILE_NAME)
-log_handler.setLevel(logging.DEBUG)
+app.logger.removeHandler(default_handler)
+app.logger.addHandler(setup_logging())
+app.logger.info(f"自動運転支援道：Mobilty Hub管理システム({MH_SYS_VERSION}) サーバー起動")
 
 
-class RequestFormatter(logging.Formatter):
-    def format(self, record):
-        if has_request_context():
-            record.url = request.url
-            record.remote_addr = request.remote_addr
-        else:
-            record.url = None
-            record.remote_addr = None
+# 各API登録
+from mh_api import mh_api_blueprint
 
-        return super().format(record)
+app.register_blueprint(mh_api_blueprint, url_prefix="/mhapi/v1")
 
 
-formatter = RequestFormatter("[%(asctime)s] %(levelname)s : %(module)s: %(message)s")
+# リクエスト数・処理時間のメトリクス（/metrics）
+@app.before_request
+def before_request():
+    start_request_metrics()
 
-default_handler.setFormatter(formatter)
-log_handler.setFormatter(formatter)
-app.logger.addHandler(log_handler)
-app.logger.info(f"自動運転支援道：Mobilty Hub管理システム({MH_SYS_VERSION}) サーバー起動")
 
+@app.after_request
+def after_request_metrics(response):
+    record_request_metrics(response)
+    update_db_pool_metrics(db.engine)
+    return response
 
-# 各API登録
-from mh_api import mh_api_blueprint
 
-app.register_blueprint(mh_api_blueprint, url_prefix="/mhapi/v1")
+# リクエストで実行したSQLの回数・時間（X-DB-Queries, X-DB-Time）
+@app.after_request
+def after_request_db_profile(response):
+    return db_profile_headers(response)
 
 
 @app.after_request
@@ -99,6 +113,11 @@ def after_request(response):
     return response
 
 
+@app.teardown_request
+def teardown_request(exception=None):
+    end_request_metrics()
+
+
 @app.teardown_appcontext
 def shutdown_session(exception=None):
     # リクエスト単位のセッションの終了時の処理があれば
@@ -110,5 +129,28 @@ def healthcheck():
     return "healthcheck OK"
 
 
+@app.route("/stats")
+def stats():
+    from com.cache import plan_cache
+    from com.db_pool import db_pool_stats
+    from com.plan_event import plan_event_waiters
+    from com.plan_index import plan_index
+
+    return jsonify(
+        {
+            "plan_cache": plan_cache.stats(),
+            "plan_index": plan_index.stats(),
+            "plan_event_waiters": plan_event_waiters.stats(),
+            "db_pool": db_pool_stats(db.engine),
+        }
+    )
+
+
+@app.route("/metrics")
+def metrics():
+    update_db_pool_metrics(db.engine)
+    return metrics_response()
+
+
 if __name__ == "__main__":
     app.run(debug=True, host="0.0.0.0", port=80)
@@ -0,0 +1,51 @@
+# Copyright 2025 Intent Exchange, Inc.
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software
+# and associated documentation files (the “Software”), to deal in the Software without
+# restriction, including without limitation the rights to use, copy, modify, merge, publish,
+# distribute, sublicense, and/or sell copies of the Software, and to permit persons to whom the
+# Software is furnished to do so, subject to the following conditions:
+# The above copyright notice and this permission notice shall be included in all copies or
+# substantial portions of the Software.
+# THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR
+# OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE,
+# ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+# OTHER DEALINGS IN THE SOFTWARE.
+
+import sys
+import os
+import contextlib
+from a2wsgi import WSGIMiddleware
+from starlette.applications import Starlette
+from starlette.routing import Mount
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "."))
+from config import ConfigIns
+from app import app as flask_app
+from com.async_db import async_engine
+from mh_asgi import mh_asgi_routes
+
+# 非同期サーバー(ASGI)のエントリーポイント（uvicorn asgi:app）
+# 計画の読み込みAPI(mh_asgi)はイベントループ上で非同期のDBドライバで処理し、
+# 待機中のリクエストはスレッドを使用しない。
+# その他のリクエストは Flask のアプリ(app.py)をスレッド(WORKER_THREADS)で処理する。
+# mh_asgi のリクエストは Flask を経由しないため、/metrics・/stats のリクエストの計測、
+# SQLのプロファイル(query_profiler)とコネクションプールの計測の対象外となる。
+# DB接続は同期(Flask)と非同期の両方のプールを使用する（config.py の ASYNC_DB_POOL_SIZE）。
+
+
+@contextlib.asynccontextmanager
+async def lifespan(_):
+    yield
+    await async_engine.dispose()
+
+
+app = Starlette(
+    routes=[
+        *mh_asgi_routes,
+        Mount("/", app=WSGIMiddleware(flask_app, workers=ConfigIns.WORKER_THREADS)),
+    ],
+    lifespan=lifespan,
+)
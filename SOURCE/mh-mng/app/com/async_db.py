@@ -0,0 +1,58 @@
+# Copyright 2025 Intent Exchange, Inc.
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software
+# and associated documentation files (the “Software”), to deal in the Software without
+# restriction, including without limitation the rights to use, copy, modify, merge, publish,
+# distribute, sublicense, and/or sell copies of the Software, and to permit persons to whom the
+# Software is furnished to do so, subject to the following conditions:
+# The above copyright notice and this permission notice shall be included in all copies or
+# substantial portions of the Software.
+# THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR
+# OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE,
+# ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+# OTHER DEALINGS IN THE SOFTWARE.
+
+import sys
+import os
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+from config import ConfigIns
+
+# 非同期サーバー(asgi.py)用のDB接続
+# SQLALCHEMY_DATABASE_URI のドライバを非同期のドライバに置き換え、SQLAlchemy の
+# asyncio 拡張で接続する。接続はSQLの実行中のみ使用するため、待機中のリクエストは
+# 接続を保持しない。
+# このエンジンは Flask の db.engine とは別のため、SQLのプロファイル(query_profiler)・
+# スロークエリのログ、/metrics・/stats のリクエストとコネクションプールの計測の
+# 対象外となる。
+
+# 同期のドライバに対応する非同期のドライバ
+ASYNC_DRIVERS = {"mysql": "aiomysql", "sqlite": "aiosqlite"}
+
+
+def async_database_uri(uri):
+    """同期のDBのURIから、非同期のドライバを使用するURIを作成する"""
+    url = make_url(uri)
+    backend = url.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f"async driver for {backend} is not supported")
+    return url.set(drivername=f"{backend}+{ASYNC_DRIVERS[backend]}")
+
+
+def create_plan_async_engine():
+    """ASYNC_DB_URI（省略時は SQLALCHEMY_DATABASE_URI から作成）の非同期エンジンを作成する
+
+    コネクションプールは同期のエンジンとは別の ASYNC_DB_ENGINE_OPTIONS とする。
+    """
+    uri = ConfigIns.ASYNC_DB_URI or async_database_uri(
+        ConfigIns.SQLALCHEMY_DATABASE_URI
+    )
+    return create_async_engine(uri, **ConfigIns.ASYNC_DB_ENGINE_OPTIONS)
+
+
+async_engine = create_plan_async_engine()
+async_session = async_sessionmaker(async_engine, expire_on_commit=False)
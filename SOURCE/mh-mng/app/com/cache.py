@@ -0,0 +1,189 @@
+# Copyright 2025 Intent Exchange, Inc.
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software
+# and associated documentation files (the “Software”), to deal in the Software without
+# restriction, including without limitation the rights to use, copy, modify, merge, publish,
+# distribute, sublicense, and/or sell copies of the Software, and to permit persons to whom the
+# Software is furnished to do so, subject to the following conditions:
+# The above copyright notice and this permission notice shall be included in all copies or
+# substantial portions of the Software.
+# THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR
+# OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE,
+# ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+# OTHER DEALINGS IN THE SOFTWARE.
+
+import sys
+import os
+import json
+import time
+import logging
+import threading
+from collections import OrderedDict
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+from config import ConfigIns
+
+logger = logging.getLogger("app.flask")
+
+# 計画詳細取得のキャッシュ
+# PLAN_CACHE_BACKEND で none / memory（プロセス内LRU）/ redis を選択する。
+# uwsgi を複数プロセスで動かす場合、memory は他プロセスでの更新を TTL まで反映しないため redis を使用する。
+
+
+class NullCacheBackend:
+    name = "none"
+
+    def get(self, key):
+        return None
+
+    def set(self, key, value):
+        pass
+
+    def delete_many(self, keys):
+        pass
+
+    def size(self):
+        return 0
+
+
+class LRUCacheBackend:
+    """TTL付きのプロセス内LRUキャッシュ"""
+
+    name = "memory"
+
+    def __init__(self, max_entries, ttl):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self.entries[key]
+                return None
+            self.entries.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self.lock:
+            self.entries[key] = (time.monotonic() + self.ttl, value)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+    def delete_many(self, keys):
+        with self.lock:
+            for key in keys:
+                self.entries.pop(key, None)
+
+    def size(self):
+        return len(self.entries)
+
+
+class RedisCacheBackend:
+    """Redis のキャッシュ（値はJSONで格納する）"""
+
+    name = "redis"
+
+    def __init__(self, url, ttl):
+        import redis
+
+        self.client = redis.Redis.from_url(url)
+        self.ttl = ttl
+
+    def get(self, key):
+        value = self.client.get(key)
+        if value is None:
+            return None
+        return json.loads(value)
+
+    def set(self, key, value):
+        self.client.set(key, json.dumps(value), ex=self.ttl)
+
+    def delete_many(self, keys):
+        if keys:
+            self.client.delete(*keys)
+
+    def size(self):
+        return None
+
+
+class PlanCache:
+    """キャッシュのバックエンドをラップし、ヒット・ミスを集計する
+
+    バックエンドの障害時はキャッシュなしとして動作する。
+    """
+
+    def __init__(self, backend, prefix="mh:plan:"):
+        self.backend = backend
+        self.prefix = prefix
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+        self.lock = threading.Lock()
+
+    def key(self, plan_type, mh, trsp_instruction_id):
+        return f"{self.prefix}{plan_type}:{mh}:{trsp_instruction_id}"
+
+    def count(self, name):
+        with self.lock:
+            setattr(self, name, getattr(self, name) + 1)
+
+    def get(self, key):
+        try:
+            value = self.backend.get(key)
+        except Exception as e:
+            logger.warning("キャッシュの取得に失敗: %s", e)
+            self.count("errors")
+            value = None
+        self.count("misses" if value is None else "hits")
+        return value
+
+    def set(self, key, value):
+        try:
+            self.backend.set(key, value)
+        except Exception as e:
+            logger.warning("キャッシュの登録に失敗: %s", e)
+            self.count("errors")
+
+    def invalidate(self, plan_type, mh, trsp_instruction_ids):
+        keys = [self.key(plan_type, mh, tid) for tid in trsp_instruction_ids]
+        try:
+            self.backend.delete_many(keys)
+        except Exception as e:
+            logger.warning("キャッシュの削除に失敗: %s", e)
+            self.count("errors")
+
+    def stats(self):
+        return {
+            "backend": self.backend.name,
+            "hits": self.hits,
+            "misses": self.misses,
+            "errors": self.errors,
+            "entries": self.backend.size(),
+        }
+
+
+def create_plan_cache():
+    backend_name = ConfigIns.PLAN_CACHE_BACKEND
+    if backend_name == "memory":
+        backend = LRUCacheBackend(
+            ConfigIns.PLAN_CACHE_MAX_ENTRIES, ConfigIns.PLAN_CACHE_TTL
+        )
+    elif backend_name == "redis":
+        backend = RedisCacheBackend(
+            ConfigIns.PLAN_CACHE_REDIS_URL, ConfigIns.PLAN_CACHE_TTL
+        )
+    else:
+        backend = NullCacheBackend()
+    return PlanCache(backend)
+
+
+plan_cache = create_plan_cache()
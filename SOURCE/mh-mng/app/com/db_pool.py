@@ -0,0 +1,102 @@
+# Copyright 2025 Intent Exchange, Inc.
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software
+# and associated documentation files (the “Software”), to deal in the Software without
+# restriction, including without limitation the rights to use, copy, modify, merge, publish,
+# distribute, sublicense, and/or sell copies of the Software, and to permit persons to whom the
+# Software is furnished to do so, subject to the following conditions:
+# The above copyright notice and this permission notice shall be included in all copies or
+# substantial portions of the Software.
+# THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR
+# OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE,
+# ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+# OTHER DEALINGS IN THE SOFTWARE.
+
+import sys
+import os
+import time
+import threading
+from sqlalchemy import exc
+from sqlalchemy.pool import QueuePool
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+from com.metrics import db_pool_checkout_seconds, db_pool_checkout_timeouts_total
+
+# DBコネクションプールの計測
+# 接続の取得待ち時間・タイムアウト件数を記録し、/stats で使用中の接続数とあわせて返す
+# （/metrics にも同じ値を出力する）
+
+
+class PoolStats:
+    """コネクションプールからの接続取得の集計（スレッドセーフ）"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+
+    def record_checkout(self, wait_seconds):
+        with self._lock:
+            self.checkouts += 1
+            self.wait_seconds_total += wait_seconds
+            if wait_seconds > self.wait_seconds_max:
+                self.wait_seconds_max = wait_seconds
+
+    def record_timeout(self, wait_seconds):
+        with self._lock:
+            self.timeouts += 1
+            self.wait_seconds_total += wait_seconds
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "wait_seconds_total": round(self.wait_seconds_total, 6),
+                "wait_seconds_max": round(self.wait_seconds_max, 6),
+            }
+
+
+# エンジンの破棄・再作成でプールが作り直されても集計を引き継ぐため、プロセスで1つとする
+pool_stats = PoolStats()
+
+
+class InstrumentedQueuePool(QueuePool):
+    """接続の取得（空き待ち・新規接続・pre-ping を含む）にかかった時間を記録する QueuePool"""
+
+    def connect(self):
+        start = time.perf_counter()
+        try:
+            connection = super().connect()
+        except exc.TimeoutError:
+            pool_stats.record_timeout(time.perf_counter() - start)
+            db_pool_checkout_timeouts_total.inc()
+            raise
+        wait_seconds = time.perf_counter() - start
+        pool_stats.record_checkout(wait_seconds)
+        db_pool_checkout_seconds.observe(wait_seconds)
+        return connection
+
+
+def db_pool_stats(engine):
+    """コネクションプールの設定値と現在の使用状況、接続取得の集計を返す"""
+    pool = engine.pool
+    stats = {"pool": type(pool).__name__}
+    if isinstance(pool, QueuePool):
+        stats.update(
+            {
+                "pool_size": pool.size(),
+                "max_overflow": pool._max_overflow,
+                "timeout": pool.timeout(),
+                "checked_out": pool.checkedout(),
+                "checked_in": pool.checkedin(),
+                "overflow": pool.overflow(),
+            }
+        )
+    if isinstance(pool, InstrumentedQueuePool):
+        stats.update(pool_stats.snapshot())
+    return stats
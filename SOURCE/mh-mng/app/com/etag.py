@@ -0,0 +1,47 @@
+# Copyright 2025 Intent Exchange, Inc.
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software
+# and associated documentation files (the “Software”), to deal in the Software without
+# restriction, including without limitation the rights to use, copy, modify, merge, publish,
+# distribute, sublicense, and/or sell copies of the Software, and to permit persons to whom the
+# Software is furnished to do so, subject to the following conditions:
+# The above copyright notice and this permission notice shall be included in all copies or
+# substantial portions of the Software.
+# THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR
+# OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE,
+# ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+# OTHER DEALINGS IN THE SOFTWARE.
+
+import json
+import hashlib
+from flask import Response, request
+from werkzeug.http import parse_etags, quote_etag
+
+# 計画取得APIの ETag と条件付きGET(If-None-Match)
+
+
+def make_etag(*parts):
+    """計画を特定する値と更新日時などのメタデータから強いETagを作成する"""
+    payload = json.dumps(parts, default=str, separators=(",", ":"))
+    return hashlib.sha1(payload.encode()).hexdigest()
+
+
+def is_not_modified(etag):
+    return request.if_none_match.contains_weak(etag)
+
+
+def if_none_match_contains(if_none_match, etag):
+    """If-None-Match ヘッダの値に etag が含まれるか（Flask のリクエスト外で使用する）"""
+    return parse_etags(if_none_match).contains_weak(etag)
+
+
+def not_modified_response(etag):
+    response = Response(status=304)
+    response.set_etag(etag)
+    return response
+
+
+def etag_headers(etag):
+    return {"ETag": quote_etag(etag)}
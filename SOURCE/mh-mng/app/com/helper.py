@@ -158,12 +158,63 @@ def create_restx_model_usingSchema(model_name, api, schema, exclude_fields=None)
     return api.model(model_name, model_fields)
 
 
+# compile_schema_serializer で生成するコードの、フィールドの型ごとの変換式
+SERIALIZER_EXPRESSIONS = (
+    (ma_fields.Integer, "None if (v := obj.{attr}) is None else int(v)"),
+    (ma_fields.String, "None if (v := obj.{attr}) is None else str(v)"),
+    (ma_fields.DateTime, "None if (v := obj.{attr}) is None else v.isoformat()"),
+)
+SERIALIZER_LIST_EXPRESSIONS = (
+    (
+        ma_fields.String,
+        "None if (v := obj.{attr}) is None"
+        " else [None if x is None else str(x) for x in v]",
+    ),
+)
+
+
+def compile_schema_serializer(schema, exclude_fields=None):
+    """It will compile a marshmallow schema to a single pass serializer
+
+    The returned function takes a model instance and returns the same dict as
+    marshalling schema.dump(instance) with the flask-restx model created by
+    create_restx_model_usingSchema, without the two reflective passes.
+    """
+    if exclude_fields is None:
+        exclude_fields = []
+    schema = schema() if isinstance(schema, type) else schema
+    items = []
+    for field_name, field_obj in schema.fields.items():
+        if field_name in exclude_fields:
+            continue
+        if isinstance(field_obj, ma_fields.List):
+            candidates = SERIALIZER_LIST_EXPRESSIONS
+            type_obj = field_obj.inner
+        else:
+            candidates = SERIALIZER_EXPRESSIONS
+            type_obj = field_obj
+        for field_type, expression in candidates:
+            if isinstance(type_obj, field_type):
+                break
+        else:
+            raise ValueError(f"Unsupported field for serializer: {field_name}")
+        attr = field_obj.attribute or field_name
+        items.append(f"        {field_name!r}: {expression.format(attr=attr)},")
+    source = "def serialize(obj):\n    return {\n" + "\n".join(items) + "\n    }\n"
+    namespace = {}
+    exec(compile(source, f"<serializer {type(schema).__name__}>", "exec"), namespace)
+    return namespace["serialize"]
+
+
 def create_response_model(
     model_name, api, data_field_name, data_restx_model, list_type=False
 ):
     model_fields = {}
     if list_type is True:
         model_fields[data_field_name] = fields.List(fields.Nested(data_restx_model))
+        model_fields["next_cursor"] = fields.String(
+            example=None, description="次ページのカーソル（最終ページの場合はnull）"
+        )
     else:
         model_fields[data_field_name] = fields.Nested(data_restx_model)
     model_fields["result"] = fields.Boolean(example=True, description="API結果")
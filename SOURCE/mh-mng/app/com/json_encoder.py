@@ -0,0 +1,72 @@
+# Copyright 2025 Intent Exchange, Inc.
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software
+# and associated documentation files (the “Software”), to deal in the Software without
+# restriction, including without limitation the rights to use, copy, modify, merge, publish,
+# distribute, sublicense, and/or sell copies of the Software, and to permit persons to whom the
+# Software is furnished to do so, subject to the following conditions:
+# The above copyright notice and this permission notice shall be included in all copies or
+# substantial portions of the Software.
+# THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR
+# OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE,
+# ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+# OTHER DEALINGS IN THE SOFTWARE.
+
+import json
+import datetime
+import decimal
+from flask import make_response
+
+# flask-restx の application/json レスポンスのエンコーダ
+# orjson がインストールされていれば orjson を、無ければ標準の json を使用する
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+JSON_ENCODER = "orjson" if orjson is not None else "json"
+
+
+def _default(value):
+    """標準の JSON で扱えない値の変換（orjson は datetime を直接扱う）"""
+    if isinstance(value, (datetime.datetime, datetime.date, datetime.time)):
+        return value.isoformat()
+    if isinstance(value, decimal.Decimal):
+        return str(value)
+    raise TypeError(
+        f"Object of type {type(value).__name__} is not JSON serializable"
+    )
+
+
+if orjson is not None:
+    _ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS
+
+    def dumps_json(data, newline=False):
+        """data を JSON (UTF-8 のバイト列) にエンコードする"""
+        option = _ORJSON_OPTIONS
+        if newline:
+            option |= orjson.OPT_APPEND_NEWLINE
+        return orjson.dumps(data, default=_default, option=option)
+
+else:
+
+    def dumps_json(data, newline=False):
+        """data を JSON (UTF-8 のバイト列) にエンコードする"""
+        dumped = json.dumps(
+            data, default=_default, ensure_ascii=False, separators=(",", ":")
+        )
+        if newline:
+            dumped += "\n"
+        return dumped.encode()
+
+
+def output_json(data, code, headers=None):
+    """flask-restx の representations['application/json'] に設定するレスポンス作成処理
+
+    デバッグ時の整形（インデント）は行わない。
+    """
+    response = make_response(dumps_json(data, newline=True), code)
+    response.headers.extend(headers or {})
+    return response
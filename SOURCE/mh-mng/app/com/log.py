@@ -0,0 +1,105 @@
+# Copyright 2025 Intent Exchange, Inc.
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software
+# and associated documentation files (the “Software”), to deal in the Software without
+# restriction, including without limitation the rights to use, copy, modify, merge, publish,
+# distribute, sublicense, and/or sell copies of the Software, and to permit persons to whom the
+# Software is furnished to do so, subject to the following conditions:
+# The above copyright notice and this permission notice shall be included in all copies or
+# substantial portions of the Software.
+# THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR
+# OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE,
+# ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+# OTHER DEALINGS IN THE SOFTWARE.
+
+import sys
+import os
+import atexit
+import random
+import logging
+from logging.handlers import QueueHandler, QueueListener
+import queue
+from flask import has_request_context, request
+from flask.logging import default_handler
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+from config import ConfigIns
+
+# ログ出力の共通設定
+# リクエスト処理のスレッドではレコードをキューに入れるのみとし、
+# メッセージの書式化とファイル・標準エラーへの出力は QueueListener のスレッドで行う
+
+LOG_FORMAT = "[%(asctime)s] %(levelname)s : %(module)s: %(message)s"
+
+log_queue = queue.SimpleQueue()
+log_listener = None
+
+
+class RequestFormatter(logging.Formatter):
+    def format(self, record):
+        if not hasattr(record, "url"):
+            record.url = None
+            record.remote_addr = None
+
+        return super().format(record)
+
+
+class RequestQueueHandler(QueueHandler):
+    """レコードを書式化せずにキューへ渡す QueueHandler
+
+    リクエストの情報のみ、リクエスト処理のスレッドでレコードに設定する。
+    メッセージの引数はリスナーのスレッドで書式化されるため、
+    ログ出力後に引数のオブジェクトを変更しないこと。
+    """
+
+    def prepare(self, record):
+        if has_request_context():
+            record.url = request.url
+            record.remote_addr = request.remote_addr
+        return record
+
+
+queue_handler = RequestQueueHandler(log_queue)
+
+
+def setup_logging():
+    """ログのキューとリスナーを開始し、ロガーに設定する QueueHandler を返す
+
+    複数回呼び出した場合も、リスナーは1つのみ開始する。
+    """
+    global log_listener
+    if log_listener is not None:
+        return queue_handler
+
+    formatter = RequestFormatter(LOG_FORMAT)
+    file_handler = logging.FileHandler(ConfigIns.LOGFILE_NAME)
+    file_handler.setLevel(logging.DEBUG)
+    file_handler.setFormatter(formatter)
+    default_handler.setFormatter(formatter)
+    log_listener = QueueListener(
+        log_queue, file_handler, default_handler, respect_handler_level=True
+    )
+    log_listener.start()
+    atexit.register(log_listener.stop)
+
+    if ConfigIns.LOG_SQL:
+        # 実行したSQLをキュー経由で出力する（SQLALCHEMY_ECHO は使用しない）
+        sql_logger = logging.getLogger("sqlalchemy.engine")
+        sql_logger.setLevel(logging.INFO)
+        sql_logger.addHandler(queue_handler)
+    return queue_handler
+
+
+def debug_payload(logger, msg, payload):
+    """リクエスト・レスポンスの内容をデバッグ出力する
+
+    DEBUG が無効な場合は何もしない。有効な場合も LOG_PAYLOAD_SAMPLE_RATE の割合のみ出力する。
+    """
+    if not logger.isEnabledFor(logging.DEBUG):
+        return
+    rate = ConfigIns.LOG_PAYLOAD_SAMPLE_RATE
+    if rate < 1.0 and random.random() >= rate:
+        return
+    logger.debug(msg, payload, stacklevel=2)
@@ -0,0 +1,145 @@
+# Copyright 2025 Intent Exchange, Inc.
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software
+# and associated documentation files (the “Software”), to deal in the Software without
+# restriction, including without limitation the rights to use, copy, modify, merge, publish,
+# distribute, sublicense, and/or sell copies of the Software, and to permit persons to whom the
+# Software is furnished to do so, subject to the following conditions:
+# The above copyright notice and this permission notice shall be included in all copies or
+# substantial portions of the Software.
+# THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR
+# OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE,
+# ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+# OTHER DEALINGS IN THE SOFTWARE.
+
+import os
+import atexit
+import time
+from flask import Response, current_app, g, request
+from sqlalchemy.pool import QueuePool
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+
+# Prometheus 形式のメトリクス
+# 環境変数 PROMETHEUS_MULTIPROC_DIR が設定されている場合は multiprocess モードとし、
+# uwsgi の各ワーカーが同ディレクトリに書き出した値を /metrics で集計する
+# （ディレクトリはサーバー起動時に空にしておくこと）
+
+MULTIPROCESS = bool(os.environ.get("PROMETHEUS_MULTIPROC_DIR"))
+
+LATENCY_BUCKETS = (
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+
+http_requests_total = Counter(
+    "mhmng_http_requests_total",
+    "リクエスト数",
+    ["resource", "method", "status"],
+)
+http_request_duration_seconds = Histogram(
+    "mhmng_http_request_duration_seconds",
+    "リクエストの処理時間（レスポンスのヘッダ返却まで）",
+    ["resource", "method"],
+    buckets=LATENCY_BUCKETS,
+)
+http_requests_in_flight = Gauge(
+    "mhmng_http_requests_in_flight",
+    "処理中のリクエスト数",
+    multiprocess_mode="livesum",
+)
+db_pool_checkout_seconds = Histogram(
+    "mhmng_db_pool_checkout_seconds",
+    "コネクションプールからの接続取得時間",
+    buckets=LATENCY_BUCKETS,
+)
+db_pool_checkout_timeouts_total = Counter(
+    "mhmng_db_pool_checkout_timeouts_total",
+    "コネクションプールからの接続取得のタイムアウト数",
+)
+db_pool_checked_out = Gauge(
+    "mhmng_db_pool_checked_out",
+    "使用中の接続数",
+    multiprocess_mode="livesum",
+)
+db_pool_overflow = Gauge(
+    "mhmng_db_pool_overflow",
+    "pool_size を超えて作成した接続数",
+    multiprocess_mode="livesum",
+)
+
+
+def mark_process_dead():
+    """終了したワーカーの livesum の値を集計から除く
+
+    uwsgi の lazy-apps を使用しない場合、読み込み時のプロセスはマスターのため、
+    プロセスIDは終了時に取得する。
+    """
+    multiprocess.mark_process_dead(os.getpid())
+
+
+if MULTIPROCESS:
+    atexit.register(mark_process_dead)
+
+
+def request_resource_name():
+    """メトリクスのラベルに使用する、リクエストを処理したリソース（クラス名・関数名）"""
+    if request.url_rule is None:
+        return "unmatched"
+    view = current_app.view_functions.get(request.endpoint)
+    return getattr(view, "view_class", view).__name__
+
+
+def start_request_metrics():
+    g.metrics_start = time.perf_counter()
+    http_requests_in_flight.inc()
+
+
+def record_request_metrics(response):
+    if "metrics_start" not in g:
+        return
+    resource = request_resource_name()
+    http_requests_total.labels(resource, request.method, response.status_code).inc()
+    http_request_duration_seconds.labels(resource, request.method).observe(
+        time.perf_counter() - g.metrics_start
+    )
+
+
+def end_request_metrics():
+    if g.pop("metrics_start", None) is not None:
+        http_requests_in_flight.dec()
+
+
+def update_db_pool_metrics(engine):
+    pool = engine.pool
+    if isinstance(pool, QueuePool):
+        db_pool_checked_out.set(pool.checkedout())
+        db_pool_overflow.set(max(pool.overflow(), 0))
+
+
+def metrics_response():
+    if MULTIPROCESS:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return Response(generate_latest(registry), content_type=CONTENT_TYPE_LATEST)
@@ -0,0 +1,65 @@
+# Copyright 2025 Intent Exchange, Inc.
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software
+# and associated documentation files (the “Software”), to deal in the Software without
+# restriction, including without limitation the rights to use, copy, modify, merge, publish,
+# distribute, sublicense, and/or sell copies of the Software, and to permit persons to whom the
+# Software is furnished to do so, subject to the following conditions:
+# The above copyright notice and this permission notice shall be included in all copies or
+# substantial portions of the Software.
+# THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR
+# OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE,
+# ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+# OTHER DEALINGS IN THE SOFTWARE.
+
+# 駐車枠ごとの占有状況の計算（スイープライン）
+
+# 同時刻の終了(-1)を開始(+1)より先に処理し、接する作業時間を重なりとしない
+OCCUPANCY_END = -1
+OCCUPANCY_START = 1
+
+
+def space_occupancy(windows, range_from, range_to):
+    """計画の作業時間から、駐車枠ごとの占有区間と最大同時使用数を計算する
+
+    windows は (駐車枠のリスト, 開始, 終了) の並び。作業時間は [開始, 終了) として
+    検索範囲 [range_from, range_to) に切り詰め、長さ0の作業時間は占有区間に含めない。
+    駐車枠ごとに開始・終了のイベントを時刻順に走査し、使用数が変わる時刻で区切った
+    [開始, 終了, 使用数] の区間（使用数0の区間は除く）を返す。
+    """
+    events = {}
+    plan_counts = {}
+    for spaces, start, end in windows:
+        start = max(start, range_from)
+        end = min(end, range_to)
+        for space in spaces:
+            plan_counts[space] = plan_counts.get(space, 0) + 1
+            if start < end:
+                space_events = events.setdefault(space, [])
+                space_events.append((start, OCCUPANCY_START))
+                space_events.append((end, OCCUPANCY_END))
+    occupancy = {}
+    for space in sorted(plan_counts):
+        segments = []
+        peak = 0
+        count = 0
+        previous = None
+        for time, delta in sorted(events.get(space, ())):
+            if count > 0 and previous < time:
+                last = segments[-1] if segments else None
+                if last and last[1] == previous and last[2] == count:
+                    # 同時刻の終了・開始で区切れた同じ使用数の区間はまとめる
+                    last[1] = time
+                else:
+                    segments.append([previous, time, count])
+            count += delta
+            peak = max(peak, count)
+            previous = time
+        occupancy[space] = {
+            "plan_count": plan_counts[space],
+            "peak": peak,
+            "segments": segments,
+        }
+    return occupancy
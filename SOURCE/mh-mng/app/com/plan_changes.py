@@ -0,0 +1,219 @@
+# Copyright 2025 Intent Exchange, Inc.
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software
+# and associated documentation files (the “Software”), to deal in the Software without
+# restriction, including without limitation the rights to use, copy, modify, merge, publish,
+# distribute, sublicense, and/or sell copies of the Software, and to permit persons to whom the
+# Software is furnished to do so, subject to the following conditions:
+# The above copyright notice and this permission notice shall be included in all copies or
+# substantial portions of the Software.
+# THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR
+# OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE,
+# ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+# OTHER DEALINGS IN THE SOFTWARE.
+
+import sys
+import os
+import json
+import time
+import heapq
+import base64
+import binascii
+import datetime
+import threading
+from sqlalchemy import delete, insert, literal, or_, select
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+from config import ConfigIns
+from database import db
+from model.devanning_plan import DevanningPlanModel
+from model.plan_tombstone import PlanTombstoneModel
+from model.vanning_plan import VanningPlanModel
+
+# 計画の差分同期
+# バンニング計画・デバンニング計画の (mh, updated_at, id) と、削除した計画の記録
+# (mh, deleted_at, id) の索引を、(更新日時, 種類, id) の順に1本の列として読み進める。
+# カーソルは最後に返した変更のキー。初回の同期（全計画）のページング中は、
+# 同期の開始日時もカーソルに持つ。
+
+PLAN_CHANGE_UPSERT = "upsert"
+PLAN_CHANGE_DELETE = "delete"
+# 変更の種類（カーソル内の番号）と、変更を読み込むテーブル
+PLAN_CHANGE_SOURCES = (VanningPlanModel, DevanningPlanModel, PlanTombstoneModel)
+TOMBSTONE_SOURCE = PLAN_CHANGE_SOURCES.index(PlanTombstoneModel)
+
+_purged_at = 0.0
+_purge_lock = threading.Lock()
+
+
+def record_plan_tombstones(model, mh, trsp_instruction_ids):
+    """削除する計画の記録を追加する（計画の削除前に呼び出す。コミットは呼び出し側で行う）"""
+    dt = datetime.datetime.now()
+    db.session.execute(
+        insert(PlanTombstoneModel).from_select(
+            ["plan_type", "plan_id", "mh", "trsp_instruction_id", "deleted_at"],
+            select(
+                literal(model.__tablename__),
+                model.id,
+                model.mh,
+                model.trsp_instruction_id,
+                literal(dt, PlanTombstoneModel.deleted_at.type),
+            ).where(
+                model.mh == mh, model.trsp_instruction_id.in_(trsp_instruction_ids)
+            ),
+        )
+    )
+    purge_plan_tombstones()
+
+
+def purge_plan_tombstones():
+    """PLAN_TOMBSTONE_RETENTION_DAYS より古い記録を削除する（プロセスごとに1時間に1回）"""
+    global _purged_at
+    now = time.monotonic()
+    with _purge_lock:
+        if _purged_at and now - _purged_at < 3600:
+            return
+        _purged_at = now
+    db.session.execute(
+        delete(PlanTombstoneModel).where(
+            PlanTombstoneModel.deleted_at < plan_tombstone_cutoff()
+        )
+    )
+
+
+def plan_tombstone_cutoff():
+    return datetime.datetime.now() - datetime.timedelta(
+        days=ConfigIns.PLAN_TOMBSTONE_RETENTION_DAYS
+    )
+
+
+def encode_change_cursor(key, full_sync_at=None):
+    """変更のキー (更新日時, 種類, id) と初回の同期の開始日時からカーソルを作成する"""
+    changed_at, source, row_id = key
+    values = [changed_at.isoformat(), source, row_id]
+    if full_sync_at is not None:
+        values.append(full_sync_at.isoformat())
+    payload = json.dumps(values)
+    return base64.urlsafe_b64encode(payload.encode()).decode()
+
+
+def decode_change_cursor(cursor):
+    """カーソルから (変更のキー, 初回の同期の開始日時（差分同期の場合は None）) を返す"""
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        changed_at, source, row_id, *rest = values
+        if len(rest) > 1:
+            raise ValueError("too many values")
+        key = (datetime.datetime.fromisoformat(changed_at), int(source), int(row_id))
+        full_sync_at = datetime.datetime.fromisoformat(rest[0]) if rest else None
+        return key, full_sync_at
+    except (ValueError, TypeError, binascii.Error):
+        raise ValueError("since is invalid")
+
+
+def is_change_cursor_expired(key, full_sync_at=None):
+    """カーソル以降の削除の記録が、保持期間を過ぎて削除済みの可能性があるか
+
+    差分同期ではカーソルの変更日時以降、初回の同期のページング中は同期の開始日時
+    以降の削除が必要となる（初回の同期のキーは古い計画の更新日時のことがある）。
+    """
+    if full_sync_at is not None:
+        return full_sync_at < plan_tombstone_cutoff()
+    return key[0] < plan_tombstone_cutoff()
+
+
+def change_columns(source):
+    model = PLAN_CHANGE_SOURCES[source]
+    if source == TOMBSTONE_SOURCE:
+        return model, model.deleted_at, model.id
+    return model, model.updated_at, model.id
+
+
+def change_key_filter(source, key):
+    """変更のキーがカーソル key より後ろとなる条件を作成する"""
+    _, changed_at, row_id = change_columns(source)
+    key_changed_at, key_source, key_id = key
+    if source < key_source:
+        return (changed_at > key_changed_at,)
+    if source > key_source:
+        return (changed_at >= key_changed_at,)
+    return (
+        changed_at >= key_changed_at,
+        or_(changed_at > key_changed_at, row_id > key_id),
+    )
+
+
+def read_source_changes(source, mh, key, until, limit, full_sync_at=None):
+    """1つのテーブルから、カーソルより後ろで until より前の変更を limit 件読み込む
+
+    初回の同期のページング中は、同期の開始日時より前の削除は読み込まない。
+    """
+    model, changed_at, row_id = change_columns(source)
+    query = db.session.query(model).filter(model.mh == mh, changed_at < until)
+    if key is not None:
+        query = query.filter(*change_key_filter(source, key))
+    if full_sync_at is not None and source == TOMBSTONE_SOURCE:
+        query = query.filter(changed_at >= full_sync_at)
+    return [
+        ((getattr(row, changed_at.key), source, row.id), row)
+        for row in query.order_by(changed_at, row_id).limit(limit).all()
+    ]
+
+
+def read_plan_changes(mh, key, limit, serializers, full_sync_at=None):
+    """カーソル key より後ろの変更を最大 limit 件返す
+
+    (変更の一覧, 次回のカーソルのキー, 続きがあるか, 初回の同期の開始日時) を返す。
+    key が None の場合は初回の同期として全計画を返し、削除の記録は返さない。
+    初回の同期の続き（full_sync_at を指定）では、同期の開始後の削除のみ返す。
+    書き込み中のトランザクションの更新日時は、コミット前に後続の書き込みに追い越される
+    ことがあるため、PLAN_CHANGES_LAG_SECONDS 秒より前の変更のみ返す。
+    """
+    until = datetime.datetime.now() - datetime.timedelta(
+        seconds=ConfigIns.PLAN_CHANGES_LAG_SECONDS
+    )
+    sources = range(len(PLAN_CHANGE_SOURCES))
+    if key is None:
+        sources = [source for source in sources if source != TOMBSTONE_SOURCE]
+        full_sync_at = until
+    # テーブルごとに limit + 1 件読み込み、キーの順にまとめる
+    source_rows = [
+        read_source_changes(source, mh, key, until, limit + 1, full_sync_at)
+        for source in sources
+    ]
+    rows = list(heapq.merge(*source_rows, key=lambda item: item[0]))
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    changes = []
+    for (changed_at, source, _), row in rows:
+        if source == TOMBSTONE_SOURCE:
+            changes.append(
+                {
+                    "op": PLAN_CHANGE_DELETE,
+                    "plan_type": row.plan_type,
+                    "trsp_instruction_id": row.trsp_instruction_id,
+                    "changed_at": changed_at,
+                    "plan": None,
+                }
+            )
+        else:
+            plan_type = PLAN_CHANGE_SOURCES[source].__tablename__
+            changes.append(
+                {
+                    "op": PLAN_CHANGE_UPSERT,
+                    "plan_type": plan_type,
+                    "trsp_instruction_id": row.trsp_instruction_id,
+                    "changed_at": changed_at,
+                    "plan": serializers[plan_type](row),
+                }
+            )
+    if has_more:
+        next_key = rows[-1][0]
+    else:
+        # until より前の変更は全て返したため、変更が無くてもカーソルを進める
+        # （初回の同期も完了したため、以降は差分同期のカーソルとする）
+        next_key = (until, -1, 0)
+        full_sync_at = None
+    return changes, next_key, has_more, full_sync_at
@@ -0,0 +1,219 @@
+# Copyright 2025 Intent Exchange, Inc.
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software
+# and associated documentation files (the “Software”), to deal in the Software without
+# restriction, including without limitation the rights to use, copy, modify, merge, publish,
+# distribute, sublicense, and/or sell copies of the Software, and to permit persons to whom the
+# Software is furnished to do so, subject to the following conditions:
+# The above copyright notice and this permission notice shall be included in all copies or
+# substantial portions of the Software.
+# THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR
+# OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE,
+# ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+# OTHER DEALINGS IN THE SOFTWARE.
+
+import sys
+import os
+import bisect
+import logging
+import datetime
+from sqlalchemy import func, select
+from flask_restx import fields
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+from config import ConfigIns
+from database import db
+from com.plan_query import PLAN_STATUS_CANCEL
+from com.plan_store import PLAN_SPACE_COLUMNS, plan_id_subquery
+from model.devanning_plan import DevanningPlanModel
+from model.plan_space import PlanSpaceModel
+from model.vanning_plan import VanningPlanModel
+
+# 計画の駐車枠の重複（同じ駐車枠を作業時間が重なって使用する計画）の検出
+# reject の場合は、候補の駐車枠の割当(plan_space)の範囲と計画の行を
+# SELECT ... FOR UPDATE でロックしてから判定する。同じ駐車枠・作業時間への同時の書き込みは
+# 先にロックしたトランザクションのコミットを待って最新の行で判定されるため、重なる計画が
+# 両方コミットされることはない（互いの書き込みを待つ場合は、DBのデッドロック検出により
+# 片方がエラーとなる）。
+
+logger = logging.getLogger("app.flask")
+
+# 重複の検出が必要となるカラム（取消からの戻しで駐車枠を再び使用する場合を含む）
+PLAN_CONFLICT_COLUMNS = PLAN_SPACE_COLUMNS + ("status",)
+PLAN_MODELS = {
+    model.__tablename__: model for model in (VanningPlanModel, DevanningPlanModel)
+}
+
+# レスポンスの conflicts の項目
+PLAN_CONFLICT_FIELDS = {
+    "trsp_instruction_id": fields.String(
+        example="20241024", description="書き込んだ計画の trsp_instruction_id"
+    ),
+    "space": fields.String(example="1", description="重複した駐車枠"),
+    "conflict_plan_type": fields.String(
+        example="devanning_plan",
+        description="重複した計画の種類(vanning_plan/devanning_plan)",
+    ),
+    "conflict_trsp_instruction_id": fields.String(
+        example="20241025", description="重複した計画の trsp_instruction_id"
+    ),
+    "conflict_window_start": fields.DateTime(
+        example="2024-10-24T10:00:00", description="重複した計画のMH作業開始時間"
+    ),
+    "conflict_window_end": fields.DateTime(
+        example="2024-10-24T11:00:00", description="重複した計画のMH作業終了時間"
+    ),
+}
+
+
+def windows_overlap(a_start, a_end, b_start, b_end):
+    """作業時間 [開始, 終了) が重なるか（開始が同じ場合は長さ0でも重なりとする）"""
+    if a_start == b_start:
+        return True
+    return a_start < b_end and b_start < a_end
+
+
+def find_plan_conflicts(model, mh, trsp_instruction_ids, lock=False):
+    """書き込んだ計画と駐車枠・作業時間が重なる計画を返す（書き込み後・コミット前に呼び出す）
+
+    書き込んだ計画の駐車枠の割当(plan_space)を駐車枠ごとにまとめ、駐車枠ごとに
+    (mh, space, window_start) の索引を1回範囲検索して候補を取得し、開始時間順に
+    並べた候補から二分探索で重なる計画を探す。
+    lock=True の場合は、候補の範囲と重なる計画の行をコミットまでロックする。
+    """
+    written = db.session.execute(
+        select(
+            PlanSpaceModel.plan_id,
+            PlanSpaceModel.space,
+            PlanSpaceModel.window_start,
+            PlanSpaceModel.window_end,
+            model.trsp_instruction_id,
+        )
+        .join(model, model.id == PlanSpaceModel.plan_id)
+        .where(
+            PlanSpaceModel.plan_type == model.__tablename__,
+            PlanSpaceModel.plan_id.in_(
+                plan_id_subquery(model, mh, trsp_instruction_ids)
+            ),
+            PlanSpaceModel.window_start.is_not(None),
+            model.status != PLAN_STATUS_CANCEL,
+        )
+    ).all()
+    windows_by_space = {}
+    for row in written:
+        windows_by_space.setdefault(row.space, []).append(row)
+    max_window = datetime.timedelta(hours=ConfigIns.PLAN_MAX_WINDOW_HOURS)
+    pairs = []
+    for space, windows in windows_by_space.items():
+        range_from = min(w.window_start for w in windows)
+        range_to = max(w.window_end or w.window_start for w in windows)
+        candidates_query = (
+            select(
+                PlanSpaceModel.plan_type,
+                PlanSpaceModel.plan_id,
+                PlanSpaceModel.window_start,
+                func.coalesce(
+                    PlanSpaceModel.window_end, PlanSpaceModel.window_start
+                ).label("window_end"),
+            )
+            .where(
+                PlanSpaceModel.mh == mh,
+                PlanSpaceModel.space == space,
+                PlanSpaceModel.window_start >= range_from - max_window,
+                PlanSpaceModel.window_start <= range_to,
+                func.coalesce(PlanSpaceModel.window_end, PlanSpaceModel.window_start)
+                >= range_from,
+            )
+            .order_by(PlanSpaceModel.window_start)
+        )
+        if lock:
+            # 索引の範囲をロックし、同時に書き込まれる割当のコミットを待つ
+            candidates_query = candidates_query.with_for_update()
+        candidates = db.session.execute(candidates_query).all()
+        starts = [c.window_start for c in candidates]
+        # 候補の作業時間の最大の長さだけ前から走査する（PLAN_MAX_WINDOW_HOURS より短い）
+        longest = max(
+            (c.window_end - c.window_start for c in candidates),
+            default=datetime.timedelta(0),
+        )
+        for w in windows:
+            w_end = w.window_end or w.window_start
+            low = bisect.bisect_left(starts, w.window_start - longest)
+            high = bisect.bisect_right(starts, w_end)
+            for c in candidates[low:high]:
+                if c.plan_type == model.__tablename__ and c.plan_id == w.plan_id:
+                    continue
+                if windows_overlap(
+                    w.window_start, w_end, c.window_start, c.window_end
+                ):
+                    pairs.append((w, c))
+    if not pairs:
+        return []
+    # 重複した計画の trsp_instruction_id を取得し、取消の計画を除く
+    conflict_plans = {}
+    for plan_type in {c.plan_type for _, c in pairs}:
+        plan_model = PLAN_MODELS[plan_type]
+        plan_ids = {c.plan_id for _, c in pairs if c.plan_type == plan_type}
+        plans_query = select(
+            plan_model.id, plan_model.trsp_instruction_id, plan_model.status
+        ).where(plan_model.id.in_(plan_ids))
+        if lock:
+            # 同時に取消から戻される場合に備え、最新の状態を読み込む
+            plans_query = plans_query.with_for_update()
+        for plan in db.session.execute(plans_query):
+            if plan.status != PLAN_STATUS_CANCEL:
+                conflict_plans[(plan_type, plan.id)] = plan.trsp_instruction_id
+    conflicts = []
+    for w, c in pairs:
+        conflict_trsp_instruction_id = conflict_plans.get((c.plan_type, c.plan_id))
+        if conflict_trsp_instruction_id is None:
+            continue
+        conflicts.append(
+            {
+                "trsp_instruction_id": w.trsp_instruction_id,
+                "space": w.space,
+                "conflict_plan_type": c.plan_type,
+                "conflict_trsp_instruction_id": conflict_trsp_instruction_id,
+                "conflict_window_start": c.window_start,
+                "conflict_window_end": c.window_end,
+            }
+        )
+    conflicts.sort(
+        key=lambda c: (
+            c["trsp_instruction_id"],
+            c["space"],
+            c["conflict_window_start"],
+            c["conflict_plan_type"],
+            c["conflict_trsp_instruction_id"],
+        )
+    )
+    return conflicts
+
+
+def check_plan_conflicts(
+    model, mh, trsp_instruction_ids, columns=PLAN_CONFLICT_COLUMNS
+):
+    """PLAN_CONFLICT_MODE に従って駐車枠の重複を検出し、(重複の一覧, 書き込みを拒否するか) を返す
+
+    columns には書き込んだカラムを指定し、駐車枠・作業時間・状態を変更しない場合は
+    検出しない。reject の場合は候補の行をロックする。
+    """
+    mode = ConfigIns.PLAN_CONFLICT_MODE
+    if mode not in ("warn", "reject"):
+        return [], False
+    if not any(column in columns for column in PLAN_CONFLICT_COLUMNS):
+        return [], False
+    conflicts = find_plan_conflicts(
+        model, mh, trsp_instruction_ids, lock=mode == "reject"
+    )
+    if conflicts:
+        logger.warning(
+            "駐車枠の重複: %s mh=%s 件数=%d %s",
+            model.__tablename__,
+            mh,
+            len(conflicts),
+            conflicts[:10],
+        )
+    return conflicts, bool(conflicts) and mode == "reject"
@@ -0,0 +1,342 @@
+# Copyright 2025 Intent Exchange, Inc.
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software
+# and associated documentation files (the “Software”), to deal in the Software without
+# restriction, including without limitation the rights to use, copy, modify, merge, publish,
+# distribute, sublicense, and/or sell copies of the Software, and to permit persons to whom the
+# Software is furnished to do so, subject to the following conditions:
+# The above copyright notice and this permission notice shall be included in all copies or
+# substantial portions of the Software.
+# THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR
+# OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE,
+# ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+# OTHER DEALINGS IN THE SOFTWARE.
+
+import sys
+import os
+import time
+import logging
+import datetime
+import threading
+from sqlalchemy import delete, event, func, insert, select
+from sqlalchemy.dialects import mysql, sqlite
+from sqlalchemy.orm import Session
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+from config import ConfigIns
+from database import db
+from com.json_encoder import dumps_json
+from model.devanning_plan import DevanningPlanModel
+from model.plan_event import PlanEventModel
+from model.plan_event_purge import PlanEventPurgeModel
+from model.vanning_plan import VanningPlanModel
+
+# 計画の変更イベント
+# 計画の書き込みと同じトランザクションで plan_event に追加し、コミット後にこのプロセスの
+# 待機中の配信（SSE・ロングポーリング）を起こす。他プロセスでの書き込みは
+# PLAN_EVENT_POLL_INTERVAL ごとのDBの確認で配信する。
+# seq は追加時に採番されるため、後から採番されたイベントが先にコミットされることがある。
+# 追加から PLAN_EVENT_LAG_SECONDS 秒経過したイベントまでを seq 順に配信し、
+# コミット前のイベントを飛ばさないようにする。
+# 古いイベントの削除時は、MHごとに削除した最大の seq を plan_event_purge に記録し、
+# それより前の seq から再開するクライアントに全件の再取得を促す。
+
+logger = logging.getLogger("app.flask")
+
+PLAN_EVENT_CREATE = "create"
+PLAN_EVENT_UPDATE = "update"
+PLAN_EVENT_DELETE = "delete"
+PLAN_MODELS = {
+    model.__tablename__: model for model in (VanningPlanModel, DevanningPlanModel)
+}
+
+
+class PlanEventNotifier:
+    """コミットされた変更イベントを、このプロセスで待機中の配信に通知する"""
+
+    def __init__(self):
+        self.condition = threading.Condition()
+        self.counter = 0
+
+    def notify(self):
+        with self.condition:
+            self.counter += 1
+            self.condition.notify_all()
+
+    def wait(self, counter, timeout):
+        """counter 以降に通知されるか timeout 秒経過するまで待ち、現在の通知回数を返す"""
+        with self.condition:
+            self.condition.wait_for(lambda: self.counter != counter, timeout)
+            return self.counter
+
+
+class PlanEventWaiters:
+    """SSE・ロングポーリングで待機中のスレッド数を PLAN_EVENT_MAX_WAITERS までに制限する"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.active = 0
+        self.rejected = 0
+
+    def acquire(self):
+        with self.lock:
+            if self.active >= ConfigIns.PLAN_EVENT_MAX_WAITERS:
+                self.rejected += 1
+                return False
+            self.active += 1
+            return True
+
+    def release(self):
+        with self.lock:
+            self.active -= 1
+
+    def stats(self):
+        with self.lock:
+            return {
+                "active": self.active,
+                "max": ConfigIns.PLAN_EVENT_MAX_WAITERS,
+                "rejected": self.rejected,
+            }
+
+
+plan_event_notifier = PlanEventNotifier()
+plan_event_waiters = PlanEventWaiters()
+_purged_at = 0.0
+_purge_lock = threading.Lock()
+
+
+@event.listens_for(Session, "after_commit")
+def _notify_plan_events(session):
+    if session.info.pop("plan_events", False):
+        plan_event_notifier.notify()
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_plan_events(session):
+    session.info.pop("plan_events", None)
+
+
+def existing_trsp_instruction_ids(model, mh, trsp_instruction_ids):
+    """登録済みの trsp_instruction_id を返す（登録・更新のイベントの判別用）"""
+    return set(
+        db.session.execute(
+            select(model.trsp_instruction_id).where(
+                model.mh == mh, model.trsp_instruction_id.in_(trsp_instruction_ids)
+            )
+        ).scalars()
+    )
+
+
+def record_plan_events(model, mh, trsp_instruction_ids, op=None, existing=()):
+    """計画の変更イベントを追加する（コミットは呼び出し側で行う）
+
+    op を省略した場合は、existing に含まれる計画を update、それ以外を create とする。
+    """
+    dt = datetime.datetime.now()
+    rows = [
+        {
+            "mh": mh,
+            "plan_type": model.__tablename__,
+            "trsp_instruction_id": trsp_instruction_id,
+            "op": op
+            or (
+                PLAN_EVENT_UPDATE
+                if trsp_instruction_id in existing
+                else PLAN_EVENT_CREATE
+            ),
+            "created_at": dt,
+        }
+        for trsp_instruction_id in dict.fromkeys(trsp_instruction_ids)
+    ]
+    if not rows:
+        return
+    db.session.execute(insert(PlanEventModel.__table__), rows)
+    db.session.info["plan_events"] = True
+    purge_plan_events()
+
+
+def purge_plan_events():
+    """PLAN_EVENT_RETENTION_HOURS より古いイベントを削除する（プロセスごとに1時間に1回）"""
+    global _purged_at
+    now = time.monotonic()
+    with _purge_lock:
+        if _purged_at and now - _purged_at < 3600:
+            return
+        _purged_at = now
+    cutoff = datetime.datetime.now() - datetime.timedelta(
+        hours=ConfigIns.PLAN_EVENT_RETENTION_HOURS
+    )
+    purged = db.session.execute(
+        select(PlanEventModel.mh, func.max(PlanEventModel.seq))
+        .where(PlanEventModel.created_at < cutoff)
+        .group_by(PlanEventModel.mh)
+    ).all()
+    for mh, purged_seq in purged:
+        db.session.execute(plan_event_purge_statement(mh, purged_seq))
+    db.session.execute(delete(PlanEventModel).where(PlanEventModel.created_at < cutoff))
+
+
+def plan_event_purge_statement(mh, purged_seq):
+    """MHの削除済みのイベントの最大の seq を記録する upsert 文を作成する
+
+    他プロセスの削除と前後しても小さくならないよう、大きい方を残す。
+    """
+    table = PlanEventPurgeModel.__table__
+    row = {"mh": mh, "purged_seq": purged_seq}
+    if db.session.get_bind().dialect.name == "mysql":
+        stmt = mysql.insert(table).values(row)
+        return stmt.on_duplicate_key_update(
+            purged_seq=func.greatest(table.c.purged_seq, stmt.inserted.purged_seq)
+        )
+    stmt = sqlite.insert(table).values(row)
+    return stmt.on_conflict_do_update(
+        index_elements=[table.c.mh],
+        set_={"purged_seq": func.max(table.c.purged_seq, stmt.excluded.purged_seq)},
+    )
+
+
+def plan_event_visible_until():
+    """配信するイベントの追加日時の上限（これより前に追加されたイベントを配信する）"""
+    return datetime.datetime.now() - datetime.timedelta(
+        seconds=ConfigIns.PLAN_EVENT_LAG_SECONDS
+    )
+
+
+def latest_plan_event_seq(mh):
+    """配信済みとしてよい最後の seq（PLAN_EVENT_LAG_SECONDS 秒より前のイベント）"""
+    return (
+        db.session.execute(
+            select(func.max(PlanEventModel.seq)).where(
+                PlanEventModel.mh == mh,
+                PlanEventModel.created_at < plan_event_visible_until(),
+            )
+        ).scalar()
+        or 0
+    )
+
+
+def is_plan_event_expired(mh, since):
+    """since より後のイベントが削除済みか（全件の再取得が必要か）
+
+    イベントが全て削除されていても判定できるよう、削除した最大の seq と比較する。
+    """
+    purged_seq = db.session.execute(
+        select(PlanEventPurgeModel.purged_seq).where(PlanEventPurgeModel.mh == mh)
+    ).scalar()
+    return purged_seq is not None and since < purged_seq
+
+
+def read_plan_events(mh, since, serializers):
+    """since より後のイベントを、登録・更新は現在の計画を付けて seq 順に返す
+
+    計画はイベント後に更新・削除されている場合があるため、常に最新の内容（削除済みなら
+    null）を返す。1回で返すイベントは PLAN_EVENT_BATCH_SIZE 件まで。
+    追加から PLAN_EVENT_LAG_SECONDS 秒経過していないイベント以降は返さない（その前の
+    seq のイベントがコミット前の可能性があるため）。
+    """
+    until = plan_event_visible_until()
+    events = db.session.execute(
+        select(PlanEventModel)
+        .where(PlanEventModel.mh == mh, PlanEventModel.seq > since)
+        .order_by(PlanEventModel.seq)
+        .limit(ConfigIns.PLAN_EVENT_BATCH_SIZE)
+    ).scalars().all()
+    for index, plan_event in enumerate(events):
+        if plan_event.created_at >= until:
+            events = events[:index]
+            break
+    plans = {}
+    for plan_type, model in PLAN_MODELS.items():
+        trsp_instruction_ids = {
+            e.trsp_instruction_id
+            for e in events
+            if e.plan_type == plan_type and e.op != PLAN_EVENT_DELETE
+        }
+        if not trsp_instruction_ids:
+            continue
+        for plan in db.session.execute(
+            select(model).where(
+                model.mh == mh, model.trsp_instruction_id.in_(trsp_instruction_ids)
+            )
+        ).scalars():
+            plans[(plan_type, plan.trsp_instruction_id)] = serializers[plan_type](plan)
+    return [
+        {
+            "seq": e.seq,
+            "op": e.op,
+            "plan_type": e.plan_type,
+            "trsp_instruction_id": e.trsp_instruction_id,
+            "created_at": e.created_at,
+            "plan": plans.get((e.plan_type, e.trsp_instruction_id)),
+        }
+        for e in events
+    ]
+
+
+def wait_plan_events(mh, since, serializers, timeout):
+    """since より後のイベントがあれば返し、無ければ最大 timeout 秒待つ
+
+    このプロセスでのコミットの通知、または PLAN_EVENT_POLL_INTERVAL ごとにDBを確認する。
+    待機中はDBの接続をプールに返す。
+    """
+    deadline = time.monotonic() + timeout
+    counter = plan_event_notifier.counter
+    while True:
+        events = read_plan_events(mh, since, serializers)
+        # トランザクションを終了して接続を返し、次の確認で新しいイベントを読めるようにする
+        db.session.close()
+        remaining = deadline - time.monotonic()
+        if events or remaining <= 0:
+            return events
+        counter = plan_event_notifier.wait(
+            counter, min(remaining, ConfigIns.PLAN_EVENT_POLL_INTERVAL)
+        )
+
+
+def format_sse(event_id=None, event_name=None, data=None, retry=None, comment=None):
+    """Server-Sent Events の1イベントを作成する"""
+    lines = []
+    if comment is not None:
+        lines.append(f": {comment}")
+    if retry is not None:
+        lines.append(f"retry: {retry}")
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    if event_name is not None:
+        lines.append(f"event: {event_name}")
+    if data is not None:
+        lines.append("data: " + dumps_json(data).decode())
+    return ("\n".join(lines) + "\n\n").encode()
+
+
+def plan_event_stream(mh, since, serializers):
+    """SSE で変更イベントを配信する
+
+    PLAN_EVENT_HEARTBEAT 秒ごとにコメントを送って接続を維持し、
+    PLAN_EVENT_STREAM_TIMEOUT 秒で終了する（クライアントは Last-Event-ID で再接続する）。
+    """
+    deadline = time.monotonic() + ConfigIns.PLAN_EVENT_STREAM_TIMEOUT
+    yield format_sse(retry=int(ConfigIns.PLAN_EVENT_POLL_INTERVAL * 1000))
+    if since is None:
+        since = latest_plan_event_seq(mh)
+        db.session.close()
+    elif is_plan_event_expired(mh, since):
+        # 再接続までにイベントが削除された場合は、一覧の再取得を促す
+        since = latest_plan_event_seq(mh)
+        db.session.close()
+        yield format_sse(event_id=since, event_name="reset", data={"seq": since})
+    while time.monotonic() < deadline:
+        timeout = min(
+            ConfigIns.PLAN_EVENT_HEARTBEAT, max(deadline - time.monotonic(), 0)
+        )
+        events = wait_plan_events(mh, since, serializers, timeout)
+        if not events:
+            yield format_sse(comment="keep-alive")
+            continue
+        for plan_event in events:
+            yield format_sse(
+                event_id=plan_event["seq"], event_name=plan_event["op"], data=plan_event
+            )
+        since = events[-1]["seq"]
@@ -0,0 +1,306 @@
+# Copyright 2025 Intent Exchange, Inc.
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software
+# and associated documentation files (the “Software”), to deal in the Software without
+# restriction, including without limitation the rights to use, copy, modify, merge, publish,
+# distribute, sublicense, and/or sell copies of the Software, and to permit persons to whom the
+# Software is furnished to do so, subject to the following conditions:
+# The above copyright notice and this permission notice shall be included in all copies or
+# substantial portions of the Software.
+# THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR
+# OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE,
+# ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+# OTHER DEALINGS IN THE SOFTWARE.
+
+import sys
+import os
+import time
+import bisect
+import logging
+import datetime
+import threading
+from collections import OrderedDict, namedtuple
+from flask import Response
+from sqlalchemy import select
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+from config import ConfigIns
+from database import db
+from com.json_encoder import dumps_json
+from com.plan_query import (
+    NDJSON_MIMETYPE,
+    decode_plan_cursor,
+    encode_plan_cursor,
+    parse_plan_limit,
+)
+from model.plan_version import PlanVersionModel
+
+# 計画一覧のプロセス内の計画索引
+# MHごとに、バンニング・デバンニング計画を (req_start_time, id) 順に保持する。
+# 初回の検索時に読み込み、このプロセスでの書き込みは書き込み後に差分を反映する。
+# 他プロセスでの書き込みは、DBの更新番号(plan_version)を PLAN_INDEX_CHECK_INTERVAL
+# ごとに確認し、変わっていればMHの計画を読み込み直す。
+
+logger = logging.getLogger("app.flask")
+
+# 索引に保持する計画1件（plan は一覧のレスポンスに返す変換済みの値）
+PlanRecord = namedtuple(
+    "PlanRecord",
+    ["req_start_time", "id", "window_end", "updated_at", "trsp_instruction_id", "plan"],
+)
+
+
+def plan_record_key(record):
+    return (record.req_start_time, record.id)
+
+
+class HubPlans:
+    """1つのMHの計画（計画の種類ごとに (req_start_time, id) 順）"""
+
+    def __init__(self, version, floor, plans):
+        self.version = version
+        self.floor = floor
+        self.loaded_at = time.monotonic()
+        self.checked_at = self.loaded_at
+        self.plans = plans
+        self.keys = {
+            plan_type: [plan_record_key(r) for r in records]
+            for plan_type, records in plans.items()
+        }
+
+    def remove(self, plan_type, trsp_instruction_ids):
+        records = self.plans[plan_type]
+        kept = [r for r in records if r.trsp_instruction_id not in trsp_instruction_ids]
+        if len(kept) != len(records):
+            self.plans[plan_type] = kept
+            self.keys[plan_type] = [plan_record_key(r) for r in kept]
+
+    def insert(self, plan_type, record):
+        keys = self.keys[plan_type]
+        position = bisect.bisect_left(keys, plan_record_key(record))
+        keys.insert(position, plan_record_key(record))
+        self.plans[plan_type].insert(position, record)
+
+
+class PlanIndex:
+    """MHごとの計画索引（PLAN_INDEX_MAX_HUBS 件を超えた場合は最も古く使用したMHを破棄する）"""
+
+    def __init__(self, max_hubs, past_days, check_interval, max_age):
+        self.max_hubs = max_hubs
+        self.past_days = past_days
+        self.check_interval = check_interval
+        self.max_age = max_age
+        self.models = {}
+        self.hubs = OrderedDict()
+        self.lock = threading.Lock()
+        # MHごとの読み込み中のロックと、書き込みの反映回数
+        self.load_locks = {}
+        self.write_counts = {}
+        self.counts = {"hits": 0, "fallbacks": 0, "loads": 0, "patches": 0}
+
+    def register(self, model, serialize):
+        """索引に保持する計画のモデルと、一覧のレスポンスへの変換処理を登録する"""
+        self.models[model.__tablename__] = (model, serialize)
+
+    def count(self, name):
+        with self.lock:
+            self.counts[name] += 1
+
+    def make_record(self, serialize, plan):
+        return PlanRecord(
+            plan.req_start_time,
+            plan.id,
+            plan.req_to_time or plan.req_start_time,
+            plan.updated_at,
+            plan.trsp_instruction_id,
+            serialize(plan),
+        )
+
+    def read_version(self, mh):
+        version = db.session.execute(
+            select(PlanVersionModel.version).where(PlanVersionModel.mh == mh)
+        ).scalar()
+        return version or 0
+
+    def load(self, mh):
+        """MHの計画を読み込む（更新番号と計画は同じトランザクションで読み込む）"""
+        with self.lock:
+            write_count = self.write_counts.get(mh, 0)
+        today = datetime.datetime.combine(datetime.date.today(), datetime.time())
+        floor = today - datetime.timedelta(days=self.past_days)
+        version = self.read_version(mh)
+        plans = {}
+        for plan_type, (model, serialize) in self.models.items():
+            rows = (
+                db.session.query(model)
+                .filter(model.mh == mh, model.req_start_time >= floor)
+                .order_by(model.req_start_time, model.id)
+                .all()
+            )
+            plans[plan_type] = [self.make_record(serialize, r) for r in rows]
+        hub = HubPlans(version, floor, plans)
+        self.count("loads")
+        with self.lock:
+            if self.write_counts.get(mh, 0) != write_count:
+                # 読み込み中にこのプロセスで書き込まれた場合は、次の検索で更新番号を確認する
+                hub.checked_at = 0
+            self.hubs[mh] = hub
+            self.hubs.move_to_end(mh)
+            while len(self.hubs) > self.max_hubs:
+                self.hubs.popitem(last=False)
+        return hub
+
+    def hub(self, mh):
+        """MHの計画を返す（未読み込み・更新番号が変わった場合は読み込む）"""
+        now = time.monotonic()
+        with self.lock:
+            hub = self.hubs.get(mh)
+            if hub is not None:
+                self.hubs.move_to_end(mh)
+            load_lock = self.load_locks.setdefault(mh, threading.Lock())
+        if hub is not None and now - hub.loaded_at < self.max_age:
+            if now - hub.checked_at < self.check_interval:
+                return hub
+            if self.read_version(mh) == hub.version:
+                hub.checked_at = now
+                return hub
+        with load_lock:
+            # 他のスレッドが読み込んだ場合はその結果を使用する
+            with self.lock:
+                loaded = self.hubs.get(mh)
+            if loaded is not None and loaded is not hub and loaded.checked_at >= now:
+                return loaded
+            return self.load(mh)
+
+    def query(self, model, mh, range_from, range_to):
+        """MH作業希望時間が検索範囲と重なる計画を (req_start_time, id) 順に返す
+
+        plan_overlap_filter と同じ条件で絞り込む。検索範囲が索引に保持する範囲より
+        前を含む場合は None を返す（DBを検索する）。
+        """
+        max_window = datetime.timedelta(hours=ConfigIns.PLAN_MAX_WINDOW_HOURS)
+        range_start = range_from - max_window
+        hub = self.hub(mh)
+        if range_start < hub.floor:
+            self.count("fallbacks")
+            return None
+        self.count("hits")
+        with self.lock:
+            keys = hub.keys[model.__tablename__]
+            records = hub.plans[model.__tablename__]
+            low = bisect.bisect_left(keys, (range_start,))
+            high = bisect.bisect_left(keys, (range_to,), lo=low)
+            return [r for r in records[low:high] if r.window_end >= range_from]
+
+    def patch(self, model, mh, trsp_instruction_ids):
+        """このプロセスでの書き込みを反映する（コミット後に呼び出す）
+
+        DBの更新番号が索引の次の番号なら書き込んだ計画を読み直して差し替え、
+        そうでなければ（他プロセスでも書き込まれた場合）MHの計画を破棄する。
+        """
+        with self.lock:
+            self.write_counts[mh] = self.write_counts.get(mh, 0) + 1
+            hub = self.hubs.get(mh)
+        if hub is None or model.__tablename__ not in self.models:
+            return
+        _, serialize = self.models[model.__tablename__]
+        version = self.read_version(mh)
+        rows = (
+            db.session.query(model)
+            .filter(
+                model.mh == mh,
+                model.trsp_instruction_id.in_(trsp_instruction_ids),
+                model.req_start_time >= hub.floor,
+            )
+            .all()
+        )
+        with self.lock:
+            if self.hubs.get(mh) is not hub:
+                return
+            if version != hub.version + 1:
+                del self.hubs[mh]
+                return
+            hub.remove(model.__tablename__, set(trsp_instruction_ids))
+            for row in rows:
+                hub.insert(model.__tablename__, self.make_record(serialize, row))
+            hub.version = version
+        self.count("patches")
+
+    def stats(self):
+        with self.lock:
+            return dict(
+                self.counts,
+                enabled=True,
+                hubs=len(self.hubs),
+                plans=sum(
+                    len(records)
+                    for hub in self.hubs.values()
+                    for records in hub.plans.values()
+                ),
+            )
+
+
+class NullPlanIndex:
+    """計画索引を使用しない場合（常にDBを検索する）"""
+
+    def register(self, model, serialize):
+        pass
+
+    def query(self, model, mh, range_from, range_to):
+        return None
+
+    def patch(self, model, mh, trsp_instruction_ids):
+        pass
+
+    def stats(self):
+        return {"enabled": False}
+
+
+def plan_records_meta(records):
+    """ETag 用に、計画の件数と最終更新日時を返す"""
+    return len(records), max((r.updated_at for r in records), default=None)
+
+
+def plan_records_after_cursor(records, args):
+    """クエリパラメータ cursor があれば、その計画より後ろの計画に絞り込む"""
+    if not args.get("cursor"):
+        return records
+    cursor = decode_plan_cursor(args.get("cursor"))
+    return records[bisect.bisect_right(records, cursor, key=plan_record_key) :]
+
+
+def plan_records_page(records, args):
+    """plan_page_query と同様に、ページの計画と次ページのカーソルを返す"""
+    limit = parse_plan_limit(args)
+    records = plan_records_after_cursor(records, args)
+    if len(records) <= limit:
+        return records, None
+    records = records[:limit]
+    return records, encode_plan_cursor(records[-1])
+
+
+def plan_records_ndjson_response(records, args):
+    """plan_ndjson_response と同様に、cursor 以降の全件を NDJSON で返す"""
+    records = plan_records_after_cursor(records, args)
+
+    def generate():
+        for record in records:
+            yield dumps_json(record.plan, newline=True)
+
+    return Response(generate(), mimetype=NDJSON_MIMETYPE)
+
+
+def create_plan_index():
+    if not ConfigIns.PLAN_INDEX_ENABLED:
+        return NullPlanIndex()
+    return PlanIndex(
+        ConfigIns.PLAN_INDEX_MAX_HUBS,
+        ConfigIns.PLAN_INDEX_PAST_DAYS,
+        ConfigIns.PLAN_INDEX_CHECK_INTERVAL,
+        ConfigIns.PLAN_INDEX_MAX_AGE,
+    )
+
+
+plan_index = create_plan_index()
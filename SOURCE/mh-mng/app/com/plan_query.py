@@ -0,0 +1,290 @@
+# Copyright 2025 Intent Exchange, Inc.
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software
+# and associated documentation files (the “Software”), to deal in the Software without
+# restriction, including without limitation the rights to use, copy, modify, merge, publish,
+# distribute, sublicense, and/or sell copies of the Software, and to permit persons to whom the
+# Software is furnished to do so, subject to the following conditions:
+# The above copyright notice and this permission notice shall be included in all copies or
+# substantial portions of the Software.
+# THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR
+# OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE,
+# ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+# OTHER DEALINGS IN THE SOFTWARE.
+
+import sys
+import os
+import re
+import json
+import base64
+import binascii
+import datetime
+import dateutil.parser
+from sqlalchemy import func, or_, select, union_all
+from flask import Response, request, stream_with_context
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+from config import ConfigIns
+from database import db
+from com.json_encoder import dumps_json
+from model.plan_equipment import PlanEquipmentModel
+from model.plan_space import PlanSpaceModel
+
+# バンニング計画・デバンニング計画で共通の検索処理
+
+DAY_PATTERN = re.compile(r"^\d{8}$")
+NDJSON_MIMETYPE = "application/x-ndjson"
+# 取消(cancel)の計画は駐車枠を使用しないものとして扱う
+PLAN_STATUS_CANCEL = -1
+
+
+def parse_range_time(value, is_end=False):
+    """検索範囲の日時を解析する
+
+    yyyymmdd 形式の場合は日単位とし、終了側はその日の終わり（翌日0時）とする。
+    タイムゾーン付きの日時は、登録済みの計画の時間と比較できるようローカル時間に変換し、
+    タイムゾーンなしとする。
+    """
+    if DAY_PATTERN.match(value):
+        day = datetime.datetime.strptime(value, "%Y%m%d")
+        return day + datetime.timedelta(days=1) if is_end else day
+    range_time = dateutil.parser.parse(value)
+    if range_time.tzinfo is not None:
+        range_time = range_time.astimezone().replace(tzinfo=None)
+    return range_time
+
+
+def parse_plan_range(args):
+    """クエリパラメータ date または from/to から検索範囲 [from, to) を作成する"""
+    if args.get("from") is not None:
+        range_from = parse_range_time(args.get("from"))
+        if args.get("to") is not None:
+            range_to = parse_range_time(args.get("to"), is_end=True)
+        else:
+            range_to = range_from + datetime.timedelta(days=1)
+    elif args.get("date") is not None:
+        range_from = parse_range_time(args.get("date"))
+        range_to = range_from + datetime.timedelta(days=1)
+    else:
+        raise ValueError("date is missing")
+    if range_to <= range_from:
+        raise ValueError("to must be after from")
+    if range_to - range_from > datetime.timedelta(days=ConfigIns.PLAN_LIST_MAX_DAYS):
+        raise ValueError(f"range must be within {ConfigIns.PLAN_LIST_MAX_DAYS} days")
+    return range_from, range_to
+
+
+def plan_overlap_filter(model, mh, range_from, range_to):
+    """MH作業希望時間が検索範囲と重なる計画の条件を作成する
+
+    (mh, req_start_time) の索引を範囲検索できるよう、開始時間の下限を
+    PLAN_MAX_WINDOW_HOURS だけ前に広げて絞り込み、終了時間で重なりを判定する。
+    これより長い計画は com.plan_store で登録・更新を拒否する（駐車枠・機材の割当、
+    計画索引、駐車枠の重複の検出も同じ前提で絞り込む）。
+    """
+    max_window = datetime.timedelta(hours=ConfigIns.PLAN_MAX_WINDOW_HOURS)
+    return (
+        model.mh == mh,
+        model.req_start_time >= range_from - max_window,
+        model.req_start_time < range_to,
+        func.coalesce(model.req_to_time, model.req_start_time) >= range_from,
+    )
+
+
+def plan_windows_query(models, mh, range_from, range_to):
+    """複数の計画テーブルから、検索範囲と重なる計画の駐車枠と作業時間を1文で取得する
+
+    各テーブルを (mh, req_start_time) の索引で絞り込み、UNION ALL でまとめる。
+    取消の計画は駐車枠を使用しないため含めない。
+    """
+    return union_all(
+        *(
+            select(
+                model.mh_space_list_str,
+                model.req_start_time.label("window_start"),
+                func.coalesce(model.req_to_time, model.req_start_time).label(
+                    "window_end"
+                ),
+            ).where(
+                *plan_overlap_filter(model, mh, range_from, range_to),
+                model.status != PLAN_STATUS_CANCEL,
+            )
+            for model in models
+        )
+    )
+
+
+def plan_child_window_filter(child_model, range_from, range_to):
+    """計画を展開した子テーブル(plan_space, plan_equipment)の作業時間が検索範囲と重なる条件
+
+    plan_overlap_filter と同様に、window_start の範囲検索と終了時間で重なりを判定する。
+    """
+    max_window = datetime.timedelta(hours=ConfigIns.PLAN_MAX_WINDOW_HOURS)
+    return (
+        child_model.window_start >= range_from - max_window,
+        child_model.window_start < range_to,
+        func.coalesce(child_model.window_end, child_model.window_start) >= range_from,
+    )
+
+
+def plan_space_overlap_filter(mh, space, range_from, range_to):
+    """駐車枠の割当の作業時間が検索範囲と重なる条件を作成する
+
+    (mh, space, window_start) の索引を範囲検索する。
+    """
+    return (
+        PlanSpaceModel.mh == mh,
+        PlanSpaceModel.space == space,
+        *plan_child_window_filter(PlanSpaceModel, range_from, range_to),
+    )
+
+
+def plan_equipment_overlap_filter(giai, range_from, range_to):
+    """機材を使用する計画の作業時間が検索範囲と重なる条件を作成する
+
+    (giai, window_start) の索引を範囲検索する。
+    """
+    return (
+        PlanEquipmentModel.giai == giai,
+        *plan_child_window_filter(PlanEquipmentModel, range_from, range_to),
+    )
+
+
+def parse_plan_limit(args):
+    """クエリパラメータ limit から1ページの件数を作成する（上限 PLAN_LIST_MAX_LIMIT）"""
+    if args.get("limit") is None:
+        return ConfigIns.PLAN_LIST_MAX_LIMIT
+    limit = int(args.get("limit"))
+    if limit < 1 or limit > ConfigIns.PLAN_LIST_MAX_LIMIT:
+        raise ValueError(f"limit must be 1 to {ConfigIns.PLAN_LIST_MAX_LIMIT}")
+    return limit
+
+
+def encode_plan_cursor(plan):
+    """ページの最後の計画の (req_start_time, id) から次ページのカーソルを作成する"""
+    payload = json.dumps([plan.req_start_time.isoformat(), plan.id])
+    return base64.urlsafe_b64encode(payload.encode()).decode()
+
+
+def decode_plan_cursor(cursor):
+    try:
+        start_time, plan_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return datetime.datetime.fromisoformat(start_time), int(plan_id)
+    except (ValueError, TypeError, binascii.Error):
+        raise ValueError("cursor is invalid")
+
+
+def plan_cursor_filter(query, model, args):
+    """クエリパラメータ cursor があれば、その計画より後ろの計画に絞り込む"""
+    if not args.get("cursor"):
+        return query
+    start_time, plan_id = decode_plan_cursor(args.get("cursor"))
+    return query.filter(
+        model.req_start_time >= start_time,
+        or_(model.req_start_time > start_time, model.id > plan_id),
+    )
+
+
+def plan_page_query(query, model, args):
+    """(req_start_time, id) のキーセットでページングした計画と、次ページのカーソルを返す
+
+    カーソルより後ろの計画を limit + 1 件取得し、limit 件を超えた場合のみカーソルを返す。
+    """
+    limit = parse_plan_limit(args)
+    query = plan_cursor_filter(query, model, args)
+    plans = query.order_by(model.req_start_time, model.id).limit(limit + 1).all()
+    return plan_page_result(plans, limit)
+
+
+def plan_page_result(plans, limit):
+    """limit + 1 件まで読み込んだ計画から、ページの計画と次ページのカーソルを返す"""
+    if len(plans) <= limit:
+        return plans, None
+    plans = plans[:limit]
+    return plans, encode_plan_cursor(plans[-1])
+
+
+def accepts_ndjson():
+    return (
+        request.accept_mimetypes.best_match(["application/json", NDJSON_MIMETYPE])
+        == NDJSON_MIMETYPE
+    )
+
+
+def plan_ndjson_response(query, model, args, serialize):
+    """検索結果を serialize で変換し、1行1計画の NDJSON でストリーミングするレスポンスを作成する
+
+    ページの上限は適用せず、cursor 以降の全件を返す。サーバーサイドカーソル(yield_per)から
+    PLAN_STREAM_BATCH_SIZE 件ずつ読み込むため、メモリ使用量は結果件数によらない。
+    """
+    query = (
+        plan_cursor_filter(query, model, args)
+        .order_by(model.req_start_time, model.id)
+        .yield_per(ConfigIns.PLAN_STREAM_BATCH_SIZE)
+    )
+
+    def generate():
+        for plan in query:
+            yield dumps_json(serialize(plan), newline=True)
+
+    return Response(stream_with_context(generate()), mimetype=NDJSON_MIMETYPE)
+
+
+def parse_flag_values(data, name):
+    """0/1 のフラグ、またはその配列を受け取り、値の配列を返す（省略時は両方）"""
+    values = data.get(name)
+    if values is None:
+        return [1, 0]
+    if not isinstance(values, list):
+        values = [values]
+    if not values or any(value not in (0, 1) for value in values):
+        raise ValueError(f"{name} must be 0, 1 or a list of them")
+    return sorted(set(values), reverse=True)
+
+
+def parse_plan_search_batch(data):
+    """一括検索のリクエストから検索条件を作成する
+
+    (trsp_instruction_id の配列（重複除去）, is_vanning の値, is_departure_mh の値) を返す。
+    """
+    if not isinstance(data, dict):
+        raise ValueError("request must be an object")
+    trsp_instruction_ids = data.get("trsp_instruction_ids")
+    if not isinstance(trsp_instruction_ids, list) or not all(
+        isinstance(value, str) and value for value in trsp_instruction_ids
+    ):
+        raise ValueError("trsp_instruction_ids must be a list of strings")
+    if len(trsp_instruction_ids) > ConfigIns.PLAN_SEARCH_BATCH_MAX_ITEMS:
+        raise ValueError("too many trsp_instruction_ids")
+    return (
+        list(dict.fromkeys(trsp_instruction_ids)),
+        parse_flag_values(data, "is_vanning"),
+        parse_flag_values(data, "is_departure_mh"),
+    )
+
+
+def plan_search_batch(model, trsp_instruction_ids, departure_values):
+    """trsp_instruction_id の IN 検索で計画を取得する
+
+    (trsp_instruction_id, is_departure_mh) ごとに、1件検索と同じく id が最小の計画を返す。
+    IN に指定する件数は PLAN_SEARCH_BATCH_CHUNK_SIZE ずつに分割する。
+    """
+    found = {}
+    chunk_size = ConfigIns.PLAN_SEARCH_BATCH_CHUNK_SIZE
+    for start in range(0, len(trsp_instruction_ids), chunk_size):
+        plans = (
+            db.session.query(model)
+            .filter(
+                model.trsp_instruction_id.in_(
+                    trsp_instruction_ids[start : start + chunk_size]
+                ),
+                model.is_departure_mh.in_(departure_values),
+            )
+            .order_by(model.id)
+            .all()
+        )
+        for plan in plans:
+            found.setdefault((plan.trsp_instruction_id, plan.is_departure_mh), plan)
+    return found
@@ -0,0 +1,383 @@
+# Copyright 2025 Intent Exchange, Inc.
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software
+# and associated documentation files (the “Software”), to deal in the Software without
+# restriction, including without limitation the rights to use, copy, modify, merge, publish,
+# distribute, sublicense, and/or sell copies of the Software, and to permit persons to whom the
+# Software is furnished to do so, subject to the following conditions:
+# The above copyright notice and this permission notice shall be included in all copies or
+# substantial portions of the Software.
+# THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR
+# OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE,
+# ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+# OTHER DEALINGS IN THE SOFTWARE.
+
+import sys
+import os
+import datetime
+import dateutil.parser
+from marshmallow import EXCLUDE
+from sqlalchemy import delete, insert, select
+from sqlalchemy.dialects import mysql, sqlite
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+from config import ConfigIns
+from database import db
+from com.plan_changes import record_plan_tombstones
+from com.plan_event import (
+    PLAN_EVENT_DELETE,
+    existing_trsp_instruction_ids,
+    record_plan_events,
+)
+from model.plan_equipment import PlanEquipmentModel
+from model.plan_space import PlanSpaceModel
+from model.plan_version import PlanVersionModel
+
+# バンニング計画・デバンニング計画で共通の書き込み処理
+
+# リクエストのリスト項目と、カンマ区切りで格納するカラムの対応
+PLAN_LIST_FIELDS = {
+    "mh_space_list": "mh_space_list_str",
+    "trailer_giai_list": "trailer_giai_list_str",
+}
+PLAN_TIME_FIELDS = ("req_from_time", "req_to_time", "actual_time")
+PLAN_VALUE_FIELDS = (
+    "shipper_cid",
+    "recipient_cid",
+    "carrier_cid",
+    "tractor_giai",
+    "status",
+    "is_bl_need",
+    "is_departure_mh",
+)
+# 一意キー (mh, trsp_instruction_id)
+PLAN_KEY_COLUMNS = ("mh", "trsp_instruction_id")
+# 一括登録で計画のスキーマによる確認から除く項目（時間は parse_plan_time で確認する）
+PLAN_ITEM_SCHEMA_EXCLUDE = (*PLAN_TIME_FIELDS, "mh", "created_at", "updated_at")
+# 更新(PUT)で新規登録となった場合に、リクエストに無い必須項目へ設定する値
+PLAN_INSERT_DEFAULTS = {"mh_space_list_str": "", "status": 0}
+# 駐車枠の割当(plan_space)・使用機材(plan_equipment)の作り直しが必要となるカラム
+PLAN_SPACE_COLUMNS = ("mh_space_list_str", "req_from_time", "req_to_time")
+PLAN_EQUIPMENT_COLUMNS = (
+    "tractor_giai",
+    "trailer_giai_list_str",
+    "req_from_time",
+    "req_to_time",
+)
+
+
+class PlanWindowError(ValueError):
+    """MH作業希望時間(From～To)が PLAN_MAX_WINDOW_HOURS より長い"""
+
+
+def validate_plan_window(req_from_time, req_to_time):
+    """MH作業希望時間の長さを確認する
+
+    計画の期間検索・駐車枠の重複の検出は、開始時間の PLAN_MAX_WINDOW_HOURS 前からの
+    範囲検索で計画を絞り込むため、それより長い計画は登録・更新できない。
+    """
+    if req_from_time is None or req_to_time is None:
+        return
+    max_window = datetime.timedelta(hours=ConfigIns.PLAN_MAX_WINDOW_HOURS)
+    if req_to_time - req_from_time > max_window:
+        raise PlanWindowError(
+            "req_to_time must be within "
+            f"{ConfigIns.PLAN_MAX_WINDOW_HOURS} hours of req_from_time"
+        )
+
+
+def parse_plan_time(value):
+    if value == "" or value is None:
+        return None
+    return dateutil.parser.parse(value)
+
+
+def split_list_str(list_str):
+    """カンマ区切りの文字列（駐車枠・トレーラーのGIAI）を、重複と空文字を除いたリストにする"""
+    return [value for value in dict.fromkeys(list_str.split(",")) if value]
+
+
+def plan_values_from_body(data, replace=False):
+    """リクエストに含まれる項目から書き込む値を作成する
+
+    replace=True（登録）の場合は希望時間を置き換え、実績時間をクリアする。
+    replace=False（更新）の場合は値が指定された時間のみ更新する。
+    """
+    values = {}
+    for field, column in PLAN_LIST_FIELDS.items():
+        if field in data:
+            values[column] = ",".join(data[field])
+    for field in PLAN_VALUE_FIELDS:
+        if field in data:
+            values[field] = data[field]
+    if replace:
+        values["req_from_time"] = parse_plan_time(data.get("req_from_time"))
+        values["req_to_time"] = parse_plan_time(data.get("req_to_time"))
+        values["actual_time"] = None
+    else:
+        for field in PLAN_TIME_FIELDS:
+            time_value = parse_plan_time(data.get(field))
+            if time_value is not None:
+                values[field] = time_value
+    validate_plan_window(values.get("req_from_time"), values.get("req_to_time"))
+    return values
+
+
+def plan_item_schema(schema_class):
+    """一括登録の計画1件の項目の型・長さを確認するスキーマを作成する"""
+    return schema_class(
+        exclude=PLAN_ITEM_SCHEMA_EXCLUDE, partial=True, unknown=EXCLUDE
+    )
+
+
+def validate_plan_item(schema, data):
+    """計画1件の項目を確認し、不正な場合は最初の項目のエラーを ValueError とする
+
+    リスト項目はカンマ区切りで格納するため、結合後の長さもカラムの長さと比較する。
+    """
+    errors = schema.validate(data)
+    if errors:
+        field = sorted(errors)[0]
+        messages = errors[field]
+        while isinstance(messages, dict):
+            messages = next(iter(messages.values()))
+        raise ValueError(f"{field}: {messages[0]}")
+    table = schema.opts.model.__table__
+    for field, column in PLAN_LIST_FIELDS.items():
+        max_length = table.c[column].type.length
+        if len(",".join(data.get(field) or [])) > max_length:
+            raise ValueError(f"{field}: Longer than maximum length {max_length}.")
+
+
+def plan_row_from_body(schema, mh, data, dt):
+    """一括登録用に、リクエストの計画1件から全カラムの値を作成する
+
+    schema には plan_item_schema で作成した計画のスキーマを指定する。
+    """
+    if not isinstance(data, dict):
+        raise ValueError("plan must be an object")
+    trsp_instruction_id = data.get("trsp_instruction_id")
+    if trsp_instruction_id is None or trsp_instruction_id == "":
+        raise ValueError("trsp_instruction_id is missing")
+    if data.get("status") is None:
+        raise ValueError("status is missing")
+    validate_plan_item(schema, data)
+    row = {
+        "mh": mh,
+        "trsp_instruction_id": trsp_instruction_id,
+    }
+    for field, column in PLAN_LIST_FIELDS.items():
+        row[column] = ",".join(data.get(field) or [])
+    for field in PLAN_VALUE_FIELDS:
+        row[field] = data.get(field)
+    if row["is_bl_need"] is None:
+        row["is_bl_need"] = 0
+    if row["is_departure_mh"] is None:
+        row["is_departure_mh"] = 1
+    for field in PLAN_TIME_FIELDS:
+        row[field] = parse_plan_time(data.get(field))
+    validate_plan_window(row["req_from_time"], row["req_to_time"])
+    row["created_at"] = dt
+    row["updated_at"] = dt
+    return row
+
+
+def plan_upsert_statement(model, rows, update_columns):
+    """(mh, trsp_instruction_id) をキーにした複数行の INSERT ... ON DUPLICATE KEY UPDATE を作成する
+
+    MySQL 以外（テスト用の SQLite）では ON CONFLICT DO UPDATE で代替する。
+    """
+    table = model.__table__
+    dialect_name = db.session.get_bind().dialect.name
+    if dialect_name == "mysql":
+        stmt = mysql.insert(table).values(rows)
+        return stmt.on_duplicate_key_update(
+            {column: stmt.inserted[column] for column in update_columns}
+        )
+    stmt = sqlite.insert(table).values(rows)
+    return stmt.on_conflict_do_update(
+        index_elements=[table.c[column] for column in PLAN_KEY_COLUMNS],
+        set_={column: stmt.excluded[column] for column in update_columns},
+    )
+
+
+def plan_version_bump_statement(mh):
+    """MHの計画の更新番号を加算する upsert 文を作成する"""
+    table = PlanVersionModel.__table__
+    row = {"mh": mh, "version": 1}
+    if db.session.get_bind().dialect.name == "mysql":
+        return (
+            mysql.insert(table)
+            .values(row)
+            .on_duplicate_key_update(version=table.c.version + 1)
+        )
+    return (
+        sqlite.insert(table)
+        .values(row)
+        .on_conflict_do_update(
+            index_elements=[table.c.mh], set_={"version": table.c.version + 1}
+        )
+    )
+
+
+def bump_plan_versions(mhs):
+    """計画索引(PLAN_INDEX_ENABLED)を使用する場合のみ、MHの計画の更新番号を加算する"""
+    if not ConfigIns.PLAN_INDEX_ENABLED:
+        return
+    for mh in sorted(set(mhs)):
+        db.session.execute(plan_version_bump_statement(mh))
+
+
+def upsert_plans(model, rows, chunk_size, update_columns=None):
+    """計画を chunk_size 件ずつ複数行の upsert 文で書き込む（コミットは呼び出し側で行う）
+
+    update_columns を省略した場合は、キーと作成日時以外の全カラムを更新する。
+    """
+    if update_columns is None:
+        update_columns = [
+            column
+            for column in rows[0]
+            if column not in PLAN_KEY_COLUMNS and column != "created_at"
+        ]
+    for start in range(0, len(rows), chunk_size):
+        chunk = rows[start : start + chunk_size]
+        plan_keys = {}
+        for row in chunk:
+            plan_keys.setdefault(row["mh"], []).append(row["trsp_instruction_id"])
+        existing = {
+            mh: existing_trsp_instruction_ids(model, mh, trsp_instruction_ids)
+            for mh, trsp_instruction_ids in plan_keys.items()
+        }
+        db.session.execute(plan_upsert_statement(model, chunk, update_columns))
+        for mh, trsp_instruction_ids in plan_keys.items():
+            sync_plan_children(model, mh, trsp_instruction_ids, update_columns)
+            record_plan_events(model, mh, trsp_instruction_ids, existing=existing[mh])
+    bump_plan_versions(row["mh"] for row in rows)
+
+
+def upsert_plan(model, mh, trsp_instruction_id, values, dt):
+    """計画1件を1文の upsert で書き込み、(書き込んだ値, 書き込み後の計画) を返す
+
+    更新(PUT)では一部の項目のみ書き込むため、書き込み後の計画を1回だけ読み込み、
+    作業時間の確認・子テーブルの作り直し・レスポンスに使用する。
+    upsert で行をロックした後に読み込むため、同じ計画の同時の更新があっても、
+    子テーブルとレスポンスはこのトランザクションで書き込んだ計画と一致する。
+    （コミットは呼び出し側で行う）
+    """
+    row = {"mh": mh, "trsp_instruction_id": trsp_instruction_id}
+    row.update(values)
+    row["updated_at"] = dt
+    update_columns = [column for column in row if column not in PLAN_KEY_COLUMNS]
+    insert_row = dict(PLAN_INSERT_DEFAULTS)
+    insert_row.update(row)
+    insert_row["created_at"] = dt
+    existing = existing_trsp_instruction_ids(model, mh, [trsp_instruction_id])
+    db.session.execute(plan_upsert_statement(model, [insert_row], update_columns))
+    plan = db.session.execute(
+        select(model)
+        .where(model.mh == mh, model.trsp_instruction_id == trsp_instruction_id)
+        .execution_options(populate_existing=True)
+    ).scalar_one()
+    if ("req_from_time" in values) != ("req_to_time" in values):
+        # 更新(PUT)で片方の時間のみ指定された場合は、書き込んだ計画の時間で確認する
+        validate_plan_window(plan.req_from_time, plan.req_to_time)
+    sync_plan_children(model, mh, [trsp_instruction_id], values, plans=[plan])
+    record_plan_events(model, mh, [trsp_instruction_id], existing=existing)
+    bump_plan_versions([mh])
+    return row, plan
+
+
+def delete_plan(model, mh, trsp_instruction_id):
+    """計画と計画を展開した子テーブルの行を削除し、計画の削除件数を返す（コミットは呼び出し側で行う）"""
+    for child_model, _, _ in PLAN_CHILD_TABLES:
+        delete_plan_children(child_model, model, mh, [trsp_instruction_id])
+    bump_plan_versions([mh])
+    record_plan_tombstones(model, mh, [trsp_instruction_id])
+    deleted = db.session.execute(
+        delete(model).where(
+            model.mh == mh,
+            model.trsp_instruction_id == trsp_instruction_id,
+        )
+    ).rowcount
+    if deleted:
+        record_plan_events(model, mh, [trsp_instruction_id], op=PLAN_EVENT_DELETE)
+    return deleted
+
+
+def plan_id_subquery(model, mh, trsp_instruction_ids):
+    return select(model.id).where(
+        model.mh == mh, model.trsp_instruction_id.in_(trsp_instruction_ids)
+    )
+
+
+def delete_plan_children(child_model, model, mh, trsp_instruction_ids):
+    db.session.execute(
+        delete(child_model).where(
+            child_model.plan_type == model.__tablename__,
+            child_model.plan_id.in_(plan_id_subquery(model, mh, trsp_instruction_ids)),
+        )
+    )
+
+
+def plan_space_values(plan):
+    for space in split_list_str(plan.mh_space_list_str or ""):
+        yield {"space": space}
+
+
+def plan_equipment_values(plan):
+    if plan.tractor_giai:
+        yield {"kind": "tractor", "giai": plan.tractor_giai}
+    for giai in split_list_str(plan.trailer_giai_list_str or ""):
+        yield {"kind": "trailer", "giai": giai}
+
+
+# 計画を展開した子テーブルと、作り直しが必要となるカラム、計画1件から作成する行の値
+PLAN_CHILD_TABLES = (
+    (PlanSpaceModel, PLAN_SPACE_COLUMNS, plan_space_values),
+    (PlanEquipmentModel, PLAN_EQUIPMENT_COLUMNS, plan_equipment_values),
+)
+
+
+def sync_plan_children(model, mh, trsp_instruction_ids, columns, plans=None):
+    """書き込んだカラムに応じて、計画を展開した子テーブル（駐車枠の割当・使用機材）を作り直す
+
+    計画の項目は更新(PUT)では一部のみ指定されるため、書き込んだ計画を読み直して
+    行を作成する。読み込み済みの場合は plans に書き込み後の計画を指定する。
+    （コミットは呼び出し側で行う）
+    """
+    children = [
+        (child_model, make_values)
+        for child_model, child_columns, make_values in PLAN_CHILD_TABLES
+        if any(column in columns for column in child_columns)
+    ]
+    if not children:
+        return
+    for child_model, _ in children:
+        delete_plan_children(child_model, model, mh, trsp_instruction_ids)
+    if plans is None:
+        plans = db.session.execute(
+            select(
+                model.id,
+                model.mh_space_list_str,
+                model.tractor_giai,
+                model.trailer_giai_list_str,
+                model.req_from_time,
+                model.req_to_time,
+            ).where(model.id.in_(plan_id_subquery(model, mh, trsp_instruction_ids)))
+        ).all()
+    for child_model, make_values in children:
+        child_rows = []
+        for plan in plans:
+            for values in make_values(plan):
+                values.update(
+                    plan_type=model.__tablename__,
+                    plan_id=plan.id,
+                    mh=mh,
+                    window_start=plan.req_from_time or plan.req_to_time,
+                    window_end=plan.req_to_time or plan.req_from_time,
+                )
+                child_rows.append(values)
+        if child_rows:
+            db.session.execute(insert(child_model.__table__), child_rows)
@@ -0,0 +1,52 @@
+# Copyright 2025 Intent Exchange, Inc.
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software
+# and associated documentation files (the “Software”), to deal in the Software without
+# restriction, including without limitation the rights to use, copy, modify, merge, publish,
+# distribute, sublicense, and/or sell copies of the Software, and to permit persons to whom the
+# Software is furnished to do so, subject to the following conditions:
+# The above copyright notice and this permission notice shall be included in all copies or
+# substantial portions of the Software.
+# THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR
+# OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE,
+# ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+# OTHER DEALINGS IN THE SOFTWARE.
+
+import sys
+import os
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+from com.helper import compile_schema_serializer
+from model.devanning_plan import DevanningPlanModel, DevanningPlanModelSchema
+from model.vanning_plan import VanningPlanModel, VanningPlanModelSchema
+
+# 計画の種類（バンニング・デバンニング）ごとの共通の定義
+
+# 計画の種類（is_vanning）ごとのモデル
+PLAN_VANNING_MODELS = {1: VanningPlanModel, 0: DevanningPlanModel}
+# 計画の種類（テーブル名）ごとの、計画一覧と同じ形の変換処理
+PLAN_SUMMARY_SERIALIZERS = {
+    VanningPlanModel.__tablename__: compile_schema_serializer(
+        VanningPlanModelSchema, exclude_fields=["created_at", "updated_at"]
+    ),
+    DevanningPlanModel.__tablename__: compile_schema_serializer(
+        DevanningPlanModelSchema, exclude_fields=["created_at", "updated_at"]
+    ),
+}
+
+
+def parse_vanning_models(args):
+    """クエリパラメータ is_vanning から検索する計画のモデルの配列を作成する（省略時は両方）"""
+    if args.get("is_vanning") is None:
+        return list(PLAN_VANNING_MODELS.values())
+    is_vanning = int(args.get("is_vanning"))
+    if is_vanning not in PLAN_VANNING_MODELS:
+        raise ValueError("is_vanning must be 0 or 1")
+    return [PLAN_VANNING_MODELS[is_vanning]]
+
+
+def plan_list_key(model):
+    """計画の種類ごとの結果のキー（vanning_plan_list, devanning_plan_list）"""
+    return f"{model.__tablename__}_list"
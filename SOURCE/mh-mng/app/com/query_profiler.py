@@ -0,0 +1,88 @@
+# Copyright 2025 Intent Exchange, Inc.
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software
+# and associated documentation files (the “Software”), to deal in the Software without
+# restriction, including without limitation the rights to use, copy, modify, merge, publish,
+# distribute, sublicense, and/or sell copies of the Software, and to permit persons to whom the
+# Software is furnished to do so, subject to the following conditions:
+# The above copyright notice and this permission notice shall be included in all copies or
+# substantial portions of the Software.
+# THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR
+# OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE,
+# ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+# OTHER DEALINGS IN THE SOFTWARE.
+
+import sys
+import os
+import json
+import time
+import logging
+from flask import g, has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+from config import ConfigIns
+
+# リクエスト単位のSQL実行回数・実行時間の計測
+# レスポンスヘッダ X-DB-Queries（実行回数）、X-DB-Time（合計時間(ミリ秒)）に設定し、
+# SLOW_QUERY_THRESHOLD_MS 以上かかったSQLはスロークエリとしてログに出力する
+
+logger = logging.getLogger("app.flask")
+
+# スロークエリのログに出力するパラメータの最大文字数
+SLOW_QUERY_MAX_PARAMETERS_LENGTH = 1000
+
+
+def query_timer(conn, context):
+    """SQLの開始時間の保持先
+
+    実行ごとのコンテキストに保持し、エラーで終了したSQL（after_cursor_execute が
+    呼ばれない）の開始時間が後続のSQLの計測に残らないようにする。コンテキストの無い
+    内部のSQLは接続に保持する（接続では1文ずつ実行されるため、次のSQLで上書きされる）。
+    """
+    return context.__dict__ if context is not None else conn.info
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    query_timer(conn, context)["query_start_time"] = time.perf_counter()
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    start_time = query_timer(conn, context).pop("query_start_time", None)
+    if start_time is None:
+        return
+    elapsed = time.perf_counter() - start_time
+    if not has_request_context():
+        return
+    g.db_queries = g.get("db_queries", 0) + 1
+    g.db_time = g.get("db_time", 0.0) + elapsed
+    if elapsed * 1000 >= ConfigIns.SLOW_QUERY_THRESHOLD_MS:
+        log_slow_query(statement, parameters, elapsed, executemany)
+
+
+def log_slow_query(statement, parameters, elapsed, executemany):
+    """スロークエリを1行の JSON でログに出力する"""
+    rule = request.url_rule
+    record = {
+        "route": rule.rule if rule is not None else None,
+        "endpoint": request.endpoint,
+        "method": request.method,
+        "path": request.path,
+        "elapsed_ms": round(elapsed * 1000, 3),
+        "statement": " ".join(statement.split()),
+        "parameters": repr(parameters)[:SLOW_QUERY_MAX_PARAMETERS_LENGTH],
+        "executemany": executemany,
+    }
+    logger.warning("slow query: %s", json.dumps(record, ensure_ascii=False))
+
+
+def db_profile_headers(response):
+    """リクエストで実行したSQLの回数と合計時間をレスポンスヘッダに設定する"""
+    response.headers["X-DB-Queries"] = str(g.get("db_queries", 0))
+    response.headers["X-DB-Time"] = f"{g.get('db_time', 0.0) * 1000:.3f}"
+    return response
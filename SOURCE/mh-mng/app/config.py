@@ -18,7 +18,8 @@ import os
 
 
 class Config:
-    SQLALCHEMY_DATABASE_URI = (
+    # MHMNG_DB_URI を指定した場合はそのDBを使用する（ベンチマーク等で SQLite を使用する場合）
+    SQLALCHEMY_DATABASE_URI = os.getenv("MHMNG_DB_URI") or (
         "mysql+pymysql://{user}:{password}@{host}/{database}?charset=utf8mb4".format(
             **{
                 "user": os.getenv("MHMNG_DB_USER_NAME"),
@@ -28,10 +29,111 @@ class Config:
             }
         )
     )
+    # 非同期サーバー(asgi.py)で使用するDB（省略時は上記のドライバを非同期に置き換える）
+    ASYNC_DB_URI = os.getenv("ASYNC_DB_URI")
     SQLALCHEMY_TRACK_MODIFICATIONS = False
-    SQLALCHEMY_ECHO = True
+    # SQLAlchemy 標準のSQL出力は同期で書き込むため使用せず、LOG_SQL でログに出力する
+    SQLALCHEMY_ECHO = False
+    # uwsgi の1プロセスあたりのスレッド数（uwsgi.ini の threads と合わせる）
+    WORKER_THREADS = int(os.getenv("WORKER_THREADS") or "100")
+    # DBコネクションプール
+    # 既定では pool_size + max_overflow をスレッド数と同じにし、接続の空き待ちを発生させない
+    DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE") or "20")
+    DB_MAX_OVERFLOW = int(
+        os.getenv("DB_MAX_OVERFLOW") or max(WORKER_THREADS - DB_POOL_SIZE, 0)
+    )
+    SQLALCHEMY_ENGINE_OPTIONS = {
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "pool_timeout": int(os.getenv("DB_POOL_TIMEOUT") or "10"),
+        "pool_recycle": int(os.getenv("DB_POOL_RECYCLE") or "3600"),
+        "pool_pre_ping": os.getenv("DB_POOL_PRE_PING", "true").lower() == "true",
+    }
+    # 非同期サーバー(asgi.py)の計画の読み込みAPI用のDBコネクションプール
+    # 接続はSQLの実行中のみ使用するため、同期のプールより小さくする。
+    # asgi.py のプロセスは書き込み等の Flask のAPIで同期のプールも使用するため、
+    # 1プロセスの最大接続数は DB_POOL_SIZE + DB_MAX_OVERFLOW + ASYNC_DB_POOL_SIZE +
+    # ASYNC_DB_MAX_OVERFLOW（既定値では 100 + 20）となる。
+    # プロセス数を掛けた合計を MySQL の max_connections（既定値151）より小さくする
+    ASYNC_DB_POOL_SIZE = int(os.getenv("ASYNC_DB_POOL_SIZE") or "10")
+    ASYNC_DB_MAX_OVERFLOW = int(os.getenv("ASYNC_DB_MAX_OVERFLOW") or "10")
+    ASYNC_DB_ENGINE_OPTIONS = {
+        **SQLALCHEMY_ENGINE_OPTIONS,
+        "pool_size": ASYNC_DB_POOL_SIZE,
+        "max_overflow": ASYNC_DB_MAX_OVERFLOW,
+    }
     SERVER_ROLE = "openapi"  # demand or supply or openapi
-    LOGFILE_NAME = "/log/debug.log"
+    LOGFILE_NAME = os.getenv("MHMNG_LOGFILE", "/log/debug.log")
+    # 実行したSQLをログに出力するか
+    LOG_SQL = os.getenv("LOG_SQL", "false").lower() == "true"
+    # リクエスト・レスポンスの内容をデバッグ出力する割合(0.0～1.0)
+    LOG_PAYLOAD_SAMPLE_RATE = float(os.getenv("LOG_PAYLOAD_SAMPLE_RATE") or "1.0")
+    # スロークエリとしてログに出力するSQLの実行時間(ミリ秒)
+    SLOW_QUERY_THRESHOLD_MS = float(os.getenv("SLOW_QUERY_THRESHOLD_MS") or "200")
+    # 計画一括登録の最大件数と、1回の upsert 文で書き込む件数
+    PLAN_BULK_MAX_ITEMS = int(os.getenv("PLAN_BULK_MAX_ITEMS") or "1000")
+    PLAN_BULK_CHUNK_SIZE = int(os.getenv("PLAN_BULK_CHUNK_SIZE") or "500")
+    # 計画の一括検索(plan_search/_batch)の最大件数と、1回の IN 検索で指定する件数
+    PLAN_SEARCH_BATCH_MAX_ITEMS = int(
+        os.getenv("PLAN_SEARCH_BATCH_MAX_ITEMS") or "1000"
+    )
+    PLAN_SEARCH_BATCH_CHUNK_SIZE = int(
+        os.getenv("PLAN_SEARCH_BATCH_CHUNK_SIZE") or "500"
+    )
+    # 計画一覧で検索できる最大日数と、MH作業希望時間(From～To)の最大の長さ(時間)
+    # 期間検索は開始時間のこの時間前から範囲検索するため、超える計画の登録・更新は
+    # 400とする（登録済みの計画の最大の長さ以上とする）
+    PLAN_LIST_MAX_DAYS = int(os.getenv("PLAN_LIST_MAX_DAYS") or "31")
+    PLAN_MAX_WINDOW_HOURS = int(os.getenv("PLAN_MAX_WINDOW_HOURS") or "24")
+    # 計画の登録・更新時に、同じ駐車枠を作業時間が重なって使用する計画を検出するか
+    # off: 検出しない, warn: ログとレスポンスで通知する, reject: 書き込まずに409を返す
+    # （reject は候補の行をロックして判定し、重なる計画の同時の書き込みを直列化する）
+    PLAN_CONFLICT_MODE = os.getenv("PLAN_CONFLICT_MODE", "off").lower()
+    # 計画一覧の1ページの最大件数
+    PLAN_LIST_MAX_LIMIT = int(os.getenv("PLAN_LIST_MAX_LIMIT") or "500")
+    # 計画一覧を NDJSON で返す際に、DBから一度に読み込む件数
+    PLAN_STREAM_BATCH_SIZE = int(os.getenv("PLAN_STREAM_BATCH_SIZE") or "500")
+    # 計画詳細取得のキャッシュ(none/memory/redis)と有効期間(秒)
+    PLAN_CACHE_BACKEND = os.getenv("PLAN_CACHE_BACKEND", "memory")
+    PLAN_CACHE_TTL = int(os.getenv("PLAN_CACHE_TTL") or "30")
+    PLAN_CACHE_MAX_ENTRIES = int(os.getenv("PLAN_CACHE_MAX_ENTRIES") or "10000")
+    PLAN_CACHE_REDIS_URL = os.getenv("PLAN_CACHE_REDIS_URL", "redis://localhost:6379/0")
+    # 計画一覧をプロセス内の計画索引から返すか
+    PLAN_INDEX_ENABLED = os.getenv("PLAN_INDEX_ENABLED", "false").lower() == "true"
+    # 計画索引に保持するMHの数と、保持する計画の開始時間の範囲（何日前から）
+    PLAN_INDEX_MAX_HUBS = int(os.getenv("PLAN_INDEX_MAX_HUBS") or "100")
+    PLAN_INDEX_PAST_DAYS = int(os.getenv("PLAN_INDEX_PAST_DAYS") or "7")
+    # 他プロセスでの更新をDBの更新番号で確認する間隔(秒)と、読み込み直すまでの時間(秒)
+    PLAN_INDEX_CHECK_INTERVAL = float(os.getenv("PLAN_INDEX_CHECK_INTERVAL") or "1.0")
+    PLAN_INDEX_MAX_AGE = float(os.getenv("PLAN_INDEX_MAX_AGE") or "600")
+    # 計画の変更イベント(plan_event)の保持期間(時間)と、1回で返す最大件数
+    PLAN_EVENT_RETENTION_HOURS = int(os.getenv("PLAN_EVENT_RETENTION_HOURS") or "48")
+    PLAN_EVENT_BATCH_SIZE = int(os.getenv("PLAN_EVENT_BATCH_SIZE") or "500")
+    # 他プロセスでの変更をDBで確認する間隔(秒)と、SSE の接続維持のコメントの間隔(秒)
+    PLAN_EVENT_POLL_INTERVAL = float(os.getenv("PLAN_EVENT_POLL_INTERVAL") or "1.0")
+    PLAN_EVENT_HEARTBEAT = float(os.getenv("PLAN_EVENT_HEARTBEAT") or "15")
+    # SSE の接続を終了するまでの時間(秒)と、ロングポーリングの最大待ち時間(秒)
+    # nginx の uwsgi_read_timeout より短くする
+    PLAN_EVENT_STREAM_TIMEOUT = float(os.getenv("PLAN_EVENT_STREAM_TIMEOUT") or "300")
+    PLAN_EVENT_LONG_POLL_MAX = float(os.getenv("PLAN_EVENT_LONG_POLL_MAX") or "30")
+    # SSE の接続と待機中のロングポーリングの同時数の上限（プロセスごと）
+    # 待機中は uwsgi のスレッドを1つ使用し続けるため、WORKER_THREADS のうち書き込み等の
+    # 他のAPIに使用するスレッドを残す。超えた場合、SSE は503を返し、
+    # ロングポーリングは待たずに返す
+    PLAN_EVENT_MAX_WAITERS = int(
+        os.getenv("PLAN_EVENT_MAX_WAITERS") or max(WORKER_THREADS // 4, 1)
+    )
+    # 変更イベントを配信するまでの時間(秒)
+    # seq はコミット順ではなく追加順に採番されるため、計画の書き込みのトランザクションの
+    # 最大時間（とサーバー間の時刻のずれ）より長くし、コミット前のイベントを飛ばさない
+    PLAN_EVENT_LAG_SECONDS = float(os.getenv("PLAN_EVENT_LAG_SECONDS") or "2")
+    # 差分同期(plan_changes)で返す削除の記録の保持期間(日)
+    PLAN_TOMBSTONE_RETENTION_DAYS = int(
+        os.getenv("PLAN_TOMBSTONE_RETENTION_DAYS") or "30"
+    )
+    # 差分同期で返す変更の更新日時を、現在より何秒前までとするか
+    # 計画の書き込みのトランザクションの最大時間（とサーバー間の時刻のずれ）より長くする
+    PLAN_CHANGES_LAG_SECONDS = float(os.getenv("PLAN_CHANGES_LAG_SECONDS") or "5")
 
 
 ConfigIns = Config()
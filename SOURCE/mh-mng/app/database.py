@@ -17,7 +17,9 @@
 from flask_sqlalchemy import SQLAlchemy
 from flask_migrate import Migrate
 from flask_marshmallow import Marshmallow
+from com.db_pool import InstrumentedQueuePool
 
-db = SQLAlchemy()
+# 接続の取得待ち時間などを計測するため、コネクションプールを差し替える
+db = SQLAlchemy(engine_options={"poolclass": InstrumentedQueuePool})
 ma = Marshmallow()
 
@@ -21,15 +21,14 @@ import logging
 import sys
 
 sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
-from config import ConfigIns
+from com.json_encoder import output_json
+from com.log import setup_logging
 
 logger = logging.getLogger("app.flask")
 logger.setLevel(logging.getLevelNamesMapping()[os.environ.get("LOGLEVEL", "DEBUG")])
-log_handler = logging.FileHandler(ConfigIns.LOGFILE_NAME)
-log_handler.setFormatter(
-    logging.Formatter("[%(asctime)s] %(levelname)s : %(module)s: %(message)s")
-)
-logger.addHandler(log_handler)
+logger.addHandler(setup_logging())
+# app.logger と同じハンドラに出力するため、親のロガーへは伝播させない
+logger.propagate = False
 
 mh_api_blueprint = Blueprint("mh_api", __name__)
 mh_api = Api(
@@ -56,11 +55,20 @@ mh_api = Api(
     ),
     doc="/swagger/",
 )
+mh_api.representations["application/json"] = output_json
 
 from .vanning_plan_api import vanning_plan_api_ns
 from .devanning_plan_api import devanning_plan_api_ns
 from .plan_search_api import plan_search_api_ns
+from .plan_space_api import plan_space_api_ns
+from .plan_equipment_api import plan_equipment_api_ns
+from .plan_event_api import plan_event_api_ns
+from .plan_changes_api import plan_changes_api_ns
 
 mh_api.add_namespace(vanning_plan_api_ns, path="/vanning_plan")
 mh_api.add_namespace(devanning_plan_api_ns, path="/devanning_plan")
 mh_api.add_namespace(plan_search_api_ns, path="/plan_search")
+mh_api.add_namespace(plan_space_api_ns, path="/plan_space")
+mh_api.add_namespace(plan_equipment_api_ns, path="/plan_equipment")
+mh_api.add_namespace(plan_event_api_ns, path="/plan_event")
+mh_api.add_namespace(plan_changes_api_ns, path="/plan_changes")
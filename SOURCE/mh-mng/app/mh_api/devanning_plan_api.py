@@ -18,16 +18,49 @@ import sys
 import os
 import logging
 import datetime
-import dateutil.parser
-from sqlalchemy import or_, and_
+from sqlalchemy import func
 from flask import jsonify, request, make_response
-from flask_restx import Namespace, Resource, fields
+from flask_restx import Namespace, Resource, fields, marshal
 
 sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+from com.cache import plan_cache
+from com.etag import (
+    etag_headers,
+    is_not_modified,
+    make_etag,
+    not_modified_response,
+)
 from com.helper import (
+    compile_schema_serializer,
     create_restx_model_usingSchema,
     create_response_model,
 )
+from com.log import debug_payload
+from com.plan_conflict import PLAN_CONFLICT_FIELDS, check_plan_conflicts
+from com.plan_index import (
+    plan_index,
+    plan_records_meta,
+    plan_records_ndjson_response,
+    plan_records_page,
+)
+from com.plan_query import (
+    NDJSON_MIMETYPE,
+    accepts_ndjson,
+    parse_plan_range,
+    plan_ndjson_response,
+    plan_overlap_filter,
+    plan_page_query,
+)
+from com.plan_store import (
+    PlanWindowError,
+    delete_plan,
+    plan_item_schema,
+    plan_row_from_body,
+    plan_values_from_body,
+    upsert_plan,
+    upsert_plans,
+)
+from config import ConfigIns
 from model.devanning_plan import DevanningPlanModel, DevanningPlanModelSchema
 from database import db, ma
 
@@ -45,6 +78,14 @@ post_request_model = create_restx_model_usingSchema(
     DevanningPlanModelSchema,
     exclude_fields=["created_at", "updated_at"],
 )
+# 一括登録の計画1件の確認用
+devanning_plan_item_schema = plan_item_schema(DevanningPlanModelSchema)
+# 一覧取得用。post_request_model で marshal した結果と同じ形を1回で作成する
+serialize_devanning_plan = compile_schema_serializer(
+    DevanningPlanModelSchema, exclude_fields=["created_at", "updated_at"]
+)
+plan_index.register(DevanningPlanModel, serialize_devanning_plan)
+plan_conflict_model = devanning_plan_api_ns.model("PlanConflict", PLAN_CONFLICT_FIELDS)
 
 
 @devanning_plan_api_ns.route("/<string:mh>/<string:trsp_instruction_id>")
@@ -58,79 +99,70 @@ class DevanningPlanAPI(Resource):
         "devanning_plan",
         post_request_model,
     )
+    write_response_model = devanning_plan_api_ns.inherit(
+        "DevanningPlanWriteResult",
+        post_response_model,
+        {"conflicts": fields.List(fields.Nested(plan_conflict_model))},
+    )
 
     @devanning_plan_api_ns.doc(
         description=(
             "デバンニング計画更新 <br/>"
             "- 共同輸送システム・コアからのみ利用可"
             "計画の変更または実績の登録に使用する。"
+            "レスポンスには更新後の計画を返す。<br/>"
+            "MH作業希望時間(From～To)が PLAN_MAX_WINDOW_HOURS 時間を超える場合は"
+            "400を返す。<br/>"
+            "PLAN_CONFLICT_MODE が warn/reject の場合、同じ駐車枠を作業時間が重なって"
+            "使用する計画を conflicts に返す（reject の場合は書き込まずに409を返す）。"
         ),
     )
     @devanning_plan_api_ns.expect(post_request_model)
-    @devanning_plan_api_ns.marshal_with(post_response_model)
+    @devanning_plan_api_ns.marshal_with(write_response_model)
     def put(self, mh, trsp_instruction_id):
         logger.debug("デバンニング計画更新")
         try:
             data = request.get_json(force=True)
-            devanning_plan = (
-                db.session.query(DevanningPlanModel)
-                .filter(
-                    DevanningPlanModel.mh == mh,
-                    DevanningPlanModel.trsp_instruction_id == trsp_instruction_id,
-                )
-                .first()
-            )
-            is_insert = False
-            if devanning_plan is None:
-                # insert
-                devanning_plan = DevanningPlanModel(
-                    mh=mh,
-                    trsp_instruction_id=trsp_instruction_id,
-                )
-                is_insert = True
-
-            if "mh_space_list" in data:
-                devanning_plan.mh_space_list_str = ",".join(data["mh_space_list"])
-            if "shipper_cid" in data:
-                devanning_plan.shipper_cid = data["shipper_cid"]
-            if "recipient_cid" in data:
-                devanning_plan.recipient_cid = data["recipient_cid"]
-            if "carrier_cid" in data:
-                devanning_plan.carrier_cid = data["carrier_cid"]
-            if "tractor_giai" in data:
-                devanning_plan.tractor_giai = data["tractor_giai"]
-            if "trailer_giai_list" in data:
-                devanning_plan.trailer_giai_list_str = ",".join(
-                    data["trailer_giai_list"]
-                )
-            if "req_from_time" in data:
-                if data["req_from_time"] != "" and data["req_from_time"] is not None:
-                    devanning_plan.req_from_time = dateutil.parser.parse(data["req_from_time"])
-            if "req_to_time" in data:
-                if data["req_to_time"] != "" and data["req_to_time"] is not None:
-                    devanning_plan.req_to_time = dateutil.parser.parse(data["req_to_time"])
-            if "actual_time" in data:
-                if data["actual_time"] != "" and data["actual_time"] is not None:
-                    devanning_plan.actual_time = dateutil.parser.parse(data["actual_time"])
-            if "status" in data:
-                devanning_plan.status = data["status"]
-            if "is_bl_need" in data:
-                devanning_plan.is_bl_need = data["is_bl_need"]
-            if "is_departure_mh" in data:
-                devanning_plan.is_departure_mh = data["is_departure_mh"]
             dt = datetime.datetime.now()
-            devanning_plan.updated_at = dt.isoformat()
-
-            if is_insert:
-                db.session.add(devanning_plan)
+            row, plan = upsert_plan(
+                DevanningPlanModel,
+                mh,
+                trsp_instruction_id,
+                plan_values_from_body(data),
+                dt,
+            )
+            conflicts, rejected = check_plan_conflicts(
+                DevanningPlanModel, mh, [trsp_instruction_id], row
+            )
+            if rejected:
+                db.session.rollback()
+                result = {
+                    "devanning_plan": {},
+                    "conflicts": conflicts,
+                    "result": False,
+                    "error_msg": "conflict",
+                }
+                return result, 409
+            # コミット後は計画が期限切れとなり読み直すため、コミット前に作成する
+            devanning_plan = DevanningPlanModelSchema(many=False).dump(plan)
             db.session.commit()
-            devanning_plan_schema = DevanningPlanModelSchema(many=False)
+            plan_cache.invalidate(
+                DevanningPlanModel.__tablename__, mh, [trsp_instruction_id]
+            )
+            plan_index.patch(DevanningPlanModel, mh, [trsp_instruction_id])
             result = {
-                "devanning_plan": devanning_plan_schema.dump(devanning_plan),
+                "devanning_plan": devanning_plan,
+                "conflicts": conflicts,
                 "result": True,
                 "error_msg": "",
             }
+            debug_payload(logger, "result:%s", result)
             status = 200
+        except PlanWindowError as e:
+            logger.debug("計画が不正: %s", e)
+            db.session.rollback()
+            result = {"devanning_plan": {}, "result": False, "error_msg": str(e)}
+            status = 400
         except Exception as e:
             logger.error(e, exc_info=True, stack_info=True)
             db.session.rollback()
@@ -140,75 +172,61 @@ class DevanningPlanAPI(Resource):
 
     @devanning_plan_api_ns.doc(
         description=(
-            "デバンニング計画登録 <br/>" "- 共同輸送システム・コアからのみ利用可"
+            "デバンニング計画登録 <br/>"
+            "- 共同輸送システム・コアからのみ利用可<br/>"
+            "レスポンスには登録後の計画を返す。<br/>"
+            "MH作業希望時間(From～To)が PLAN_MAX_WINDOW_HOURS 時間を超える場合は"
+            "400を返す。<br/>"
+            "PLAN_CONFLICT_MODE が warn/reject の場合、同じ駐車枠を作業時間が重なって"
+            "使用する計画を conflicts に返す（reject の場合は書き込まずに409を返す）。"
         ),
     )
     @devanning_plan_api_ns.expect(post_request_model)
-    @devanning_plan_api_ns.marshal_with(post_response_model)
+    @devanning_plan_api_ns.marshal_with(write_response_model)
     def post(self, mh, trsp_instruction_id):
         try:
             data = request.get_json(force=True)
-            logger.debug(f"デバンニング計画登録: {data}")
-            devanning_plan = (
-                db.session.query(DevanningPlanModel)
-                .filter(
-                    DevanningPlanModel.mh == mh,
-                    DevanningPlanModel.trsp_instruction_id == trsp_instruction_id,
-                )
-                .first()
-            )
+            debug_payload(logger, "デバンニング計画登録: %s", data)
             dt = datetime.datetime.now()
-            is_add = False
-            if devanning_plan is None:
-                devanning_plan = DevanningPlanModel(
-                    mh=mh,
-                    trsp_instruction_id=trsp_instruction_id,
-                )
-                devanning_plan.created_at = dt.isoformat()
-                is_add = True
-            devanning_plan.updated_at = dt.isoformat()
-
-            if "mh_space_list" in data:
-                devanning_plan.mh_space_list_str = ",".join(data["mh_space_list"])
-            if "shipper_cid" in data:
-                devanning_plan.shipper_cid = data["shipper_cid"]
-            if "recipient_cid" in data:
-                devanning_plan.recipient_cid = data["recipient_cid"]
-            if "carrier_cid" in data:
-                devanning_plan.carrier_cid = data["carrier_cid"]
-            if "tractor_giai" in data:
-                devanning_plan.tractor_giai = data["tractor_giai"]
-            if "trailer_giai_list" in data:
-                devanning_plan.trailer_giai_list_str = ",".join(
-                    data["trailer_giai_list"]
-                )
-            devanning_plan.req_from_time = None
-            devanning_plan.req_to_time = None
-            devanning_plan.actual_time = None
-            if "req_from_time" in data:
-                if data["req_from_time"] != "" and data["req_from_time"] is not None:
-                    devanning_plan.req_from_time = dateutil.parser.parse(data["req_from_time"])
-            if "req_to_time" in data:
-                if data["req_to_time"] != "" and data["req_to_time"] is not None:
-                    devanning_plan.req_to_time = dateutil.parser.parse(data["req_to_time"])
-            if "status" in data:
-                devanning_plan.status = data["status"]
-            if "is_bl_need" in data:
-                devanning_plan.is_bl_need = data["is_bl_need"]
-            if "is_departure_mh" in data:
-                devanning_plan.is_departure_mh = data["is_departure_mh"]
-
-            if is_add:
-                db.session.add(devanning_plan)
+            row, plan = upsert_plan(
+                DevanningPlanModel,
+                mh,
+                trsp_instruction_id,
+                plan_values_from_body(data, replace=True),
+                dt,
+            )
+            conflicts, rejected = check_plan_conflicts(
+                DevanningPlanModel, mh, [trsp_instruction_id], row
+            )
+            if rejected:
+                db.session.rollback()
+                result = {
+                    "devanning_plan": {},
+                    "conflicts": conflicts,
+                    "result": False,
+                    "error_msg": "conflict",
+                }
+                return result, 409
+            # コミット後は計画が期限切れとなり読み直すため、コミット前に作成する
+            devanning_plan = DevanningPlanModelSchema(many=False).dump(plan)
             db.session.commit()
-            devanning_plan_schema = DevanningPlanModelSchema(many=False)
+            plan_cache.invalidate(
+                DevanningPlanModel.__tablename__, mh, [trsp_instruction_id]
+            )
+            plan_index.patch(DevanningPlanModel, mh, [trsp_instruction_id])
             result = {
-                "devanning_plan": devanning_plan_schema.dump(devanning_plan),
+                "devanning_plan": devanning_plan,
+                "conflicts": conflicts,
                 "result": True,
                 "error_msg": "",
             }
-            logger.debug(f"result:{result}")
+            debug_payload(logger, "result:%s", result)
             status = 200
+        except PlanWindowError as e:
+            logger.debug("計画が不正: %s", e)
+            db.session.rollback()
+            result = {"devanning_plan": {}, "result": False, "error_msg": str(e)}
+            status = 400
         except Exception as e:
             logger.error(e, exc_info=True, stack_info=True)
             db.session.rollback()
@@ -217,40 +235,81 @@ class DevanningPlanAPI(Resource):
         return result, status
 
     @devanning_plan_api_ns.doc(
-        description=("デバンニング計画詳細取得 <br/>"),
+        description=(
+            "デバンニング計画詳細取得 <br/>"
+            "レスポンスの ETag を If-None-Match に指定すると、更新が無い場合は304を返す。"
+        ),
     )
-    @devanning_plan_api_ns.marshal_with(post_response_model)
+    @devanning_plan_api_ns.response(200, "Success", post_response_model)
     def get(self, mh, trsp_instruction_id):
         logger.debug("デバンニング計画詳細取得")
         try:
-            devanning_plan = (
-                db.session.query(DevanningPlanModel)
-                .filter(
-                    DevanningPlanModel.mh == mh,
-                    DevanningPlanModel.trsp_instruction_id == trsp_instruction_id,
-                )
-                .first()
+            cache_key = plan_cache.key(
+                DevanningPlanModel.__tablename__, mh, trsp_instruction_id
             )
-            if devanning_plan is None:
+            plan = plan_cache.get(cache_key)
+            if plan is None and request.if_none_match:
+                # 更新日時のみ取得し、更新が無ければ計画を読み込まずに304を返す
+                updated_at = (
+                    db.session.query(DevanningPlanModel.updated_at)
+                    .filter(
+                        DevanningPlanModel.mh == mh,
+                        DevanningPlanModel.trsp_instruction_id == trsp_instruction_id,
+                    )
+                    .scalar()
+                )
+                if updated_at is not None:
+                    etag = make_etag(
+                        DevanningPlanModel.__tablename__,
+                        mh,
+                        trsp_instruction_id,
+                        updated_at.isoformat(),
+                    )
+                    if is_not_modified(etag):
+                        return not_modified_response(etag)
+            if plan is None:
+                devanning_plan = (
+                    db.session.query(DevanningPlanModel)
+                    .filter(
+                        DevanningPlanModel.mh == mh,
+                        DevanningPlanModel.trsp_instruction_id == trsp_instruction_id,
+                    )
+                    .first()
+                )
+                if devanning_plan is not None:
+                    devanning_plan_schema = DevanningPlanModelSchema(many=False)
+                    plan = devanning_plan_schema.dump(devanning_plan)
+                    plan_cache.set(cache_key, plan)
+            headers = {}
+            if plan is None:
                 result = {
                     "devanning_plan": None,
                     "result": False,
                     "error_msg": "Not Found",
                 }
             else:
-                devanning_plan_schema = DevanningPlanModelSchema(many=False)
+                etag = make_etag(
+                    DevanningPlanModel.__tablename__,
+                    mh,
+                    trsp_instruction_id,
+                    plan["updated_at"],
+                )
+                if is_not_modified(etag):
+                    return not_modified_response(etag)
+                headers = etag_headers(etag)
                 result = {
-                    "devanning_plan": devanning_plan_schema.dump(devanning_plan),
+                    "devanning_plan": plan,
                     "result": True,
                     "error_msg": "",
                 }
-            logger.debug(f"result:{result}")
+            debug_payload(logger, "result:%s", result)
             status = 200
         except Exception as e:
             logger.error(e, exc_info=True, stack_info=True)
             result = {"devanning_plan": {}, "result": False, "error_msg": "Error"}
             status = 400
-        return result, status
+            headers = {}
+        return marshal(result, self.post_response_model), status, headers
 
     del_res_model = devanning_plan_api_ns.model(
         "DelResModel",
@@ -269,31 +328,26 @@ class DevanningPlanAPI(Resource):
     def delete(self, mh, trsp_instruction_id):
         logger.debug("デバンニング計画削除")
         try:
-            devanning_plan = (
-                db.session.query(DevanningPlanModel)
-                .filter(
-                    DevanningPlanModel.mh == mh,
-                    DevanningPlanModel.trsp_instruction_id == trsp_instruction_id,
-                )
-                .first()
-            )
-            if devanning_plan is None:
+            deleted = delete_plan(DevanningPlanModel, mh, trsp_instruction_id)
+            if deleted == 0:
+                db.session.rollback()
                 result = {"result": False, "error_msg": "Not found"}
-                status = 403
-                return result, status
-            db.session.query(DevanningPlanModel).filter(
-                DevanningPlanModel.mh == mh,
-                DevanningPlanModel.trsp_instruction_id == trsp_instruction_id,
-            ).delete()
+                return result, 403
+            db.session.commit()
+            plan_cache.invalidate(
+                DevanningPlanModel.__tablename__, mh, [trsp_instruction_id]
+            )
+            plan_index.patch(DevanningPlanModel, mh, [trsp_instruction_id])
             result = {
                 "result": True,
                 "error_msg": "",
             }
-            logger.debug(f"result:{result}")
+            debug_payload(logger, "result:%s", result)
             status = 200
         except Exception as e:
             logger.error(e, exc_info=True, stack_info=True)
-            result = {"devanning_plan": {}, "result": False, "error_msg": "Error"}
+            db.session.rollback()
+            result = {"result": False, "error_msg": "Error"}
             status = 400
         return result, status
 
@@ -310,53 +364,229 @@ class DevanningPlanListAPI(Resource):
     )
 
     @devanning_plan_api_ns.doc(
-        description=("デバンニング計画検索<br/>"),
+        description=(
+            "デバンニング計画検索<br/>"
+            "MH作業希望時間(From～To)が検索範囲と重なる計画を返す。"
+            "date または from のいずれかが必須。"
+            "結果は limit 件ずつ返し、続きは next_cursor を cursor に指定して取得する。"
+            "Accept: application/x-ndjson の場合は、全件を1行1計画でストリーミングする。"
+            "レスポンスの ETag を If-None-Match に指定すると、更新が無い場合は304を返す。"
+        ),
+    )
+    @devanning_plan_api_ns.param("date", "検索する日付[yyyymmdd]")
+    @devanning_plan_api_ns.param(
+        "from", "検索範囲の開始[yyyymmdd または ISO8601 日時]"
+    )
+    @devanning_plan_api_ns.param(
+        "to",
+        "検索範囲の終了[yyyymmdd(その日を含む) または ISO8601 日時]"
+        "（省略時は from の1日後）",
     )
-    @devanning_plan_api_ns.param("date", "検索する日付[yyyymmhh](required)")
-    @devanning_plan_api_ns.marshal_with(get_list_res_model)
+    @devanning_plan_api_ns.param(
+        "limit", "1ページの件数（省略時、最大 PLAN_LIST_MAX_LIMIT 件）"
+    )
+    @devanning_plan_api_ns.param("cursor", "前ページの next_cursor")
+    @devanning_plan_api_ns.produces(["application/json", NDJSON_MIMETYPE])
+    @devanning_plan_api_ns.response(200, "Success", get_list_res_model)
     def get(self, mh):
         logger.debug("デバンニング計画検索")
         try:
-            if request.args.get("date") is not None:
-                date_str = request.args.get("date")
-            else:
-                logger.debug("dateがない")
+            try:
+                range_from, range_to = parse_plan_range(request.args)
+                # 計画索引(PLAN_INDEX_ENABLED)で検索できればDBを検索しない
+                records = plan_index.query(DevanningPlanModel, mh, range_from, range_to)
+                if records is not None:
+                    if accepts_ndjson():
+                        return plan_records_ndjson_response(records, request.args)
+                    count, last_updated_at = plan_records_meta(records)
+                else:
+                    query = db.session.query(DevanningPlanModel).filter(
+                        *plan_overlap_filter(
+                            DevanningPlanModel, mh, range_from, range_to
+                        )
+                    )
+                    if accepts_ndjson():
+                        return plan_ndjson_response(
+                            query,
+                            DevanningPlanModel,
+                            request.args,
+                            serialize_devanning_plan,
+                        )
+                    # 検索条件に該当する件数と最終更新日時から ETag を作成する
+                    count, last_updated_at = query.with_entities(
+                        func.count(DevanningPlanModel.id),
+                        func.max(DevanningPlanModel.updated_at),
+                    ).one()
+                etag = make_etag(
+                    DevanningPlanModel.__tablename__,
+                    mh,
+                    sorted(request.args.items(multi=True)),
+                    count,
+                    last_updated_at,
+                )
+                if is_not_modified(etag):
+                    return not_modified_response(etag)
+                if records is not None:
+                    page, next_cursor = plan_records_page(records, request.args)
+                    devanning_plan_list = [r.plan for r in page]
+                else:
+                    devanning_plan, next_cursor = plan_page_query(
+                        query, DevanningPlanModel, request.args
+                    )
+                    devanning_plan_list = [
+                        serialize_devanning_plan(p) for p in devanning_plan
+                    ]
+            except (ValueError, OverflowError) as e:
+                logger.debug("検索条件が不正: %s", e)
                 result = {
                     "devanning_plan_list": {},
                     "result": False,
-                    "error_msg": "date is missing",
+                    "error_msg": str(e),
+                }
+                return marshal(result, self.get_list_res_model), 400
+            result = {
+                "devanning_plan_list": devanning_plan_list,
+                "next_cursor": next_cursor,
+                "result": True,
+                "error_msg": "",
+            }
+            debug_payload(logger, "result:%s", result)
+            return result, 200, etag_headers(etag)
+        except Exception as e:
+            logger.error(e, exc_info=True, stack_info=True)
+            result = {"devanning_plan_list": {}, "result": False, "error_msg": "Error"}
+            return marshal(result, self.get_list_res_model), 400
+
+
+@devanning_plan_api_ns.route("/<string:mh>/_bulk")
+@devanning_plan_api_ns.param("mh", "MHのGLN")
+class DevanningPlanBulkAPI(Resource):
+    bulk_item_res_model = devanning_plan_api_ns.model(
+        "DevanningPlanBulkItemResult",
+        {
+            "index": fields.Integer(example=0, description="リクエスト配列内の位置"),
+            "trsp_instruction_id": fields.String(
+                example="20241024", description="trsp_instruction_id"
+            ),
+            "result": fields.Boolean(example=True, description="登録結果"),
+            "error_msg": fields.String(example="", description="エラーメッセージ"),
+        },
+    )
+    bulk_res_model = devanning_plan_api_ns.model(
+        "DevanningPlanBulkResult",
+        {
+            "results": fields.List(fields.Nested(bulk_item_res_model)),
+            "conflicts": fields.List(fields.Nested(plan_conflict_model)),
+            "result": fields.Boolean(example=True, description="API結果"),
+            "error_msg": fields.String(example="", description="エラーメッセージ"),
+        },
+    )
+
+    @devanning_plan_api_ns.doc(
+        description=(
+            "デバンニング計画一括登録 <br/>"
+            "- 共同輸送システム・コアからのみ利用可<br/>"
+            "計画の配列を受け取り、(mh, trsp_instruction_id) 単位で1トランザクションで登録または置き換える。"
+            "不正な計画（項目の型・長さが不正な計画、MH作業希望時間(From～To)が"
+            " PLAN_MAX_WINDOW_HOURS 時間を超える計画、同じ trsp_instruction_id の"
+            "2件目以降の計画を含む）は登録せず、results にエラーを返す。<br/>"
+            "PLAN_CONFLICT_MODE が warn/reject の場合、同じ駐車枠を作業時間が重なって"
+            "使用する計画を conflicts に返す（reject の場合は全件を書き込まずに409を返し、"
+            "重複の無い計画の results も rolled back で失敗とする）。"
+        ),
+    )
+    @devanning_plan_api_ns.expect([post_request_model])
+    @devanning_plan_api_ns.marshal_with(bulk_res_model)
+    def post(self, mh):
+        logger.debug("デバンニング計画一括登録")
+        try:
+            data = request.get_json(force=True)
+            if not isinstance(data, list):
+                result = {
+                    "results": [],
+                    "result": False,
+                    "error_msg": "plans must be a list",
+                }
+                return result, 400
+            if len(data) > ConfigIns.PLAN_BULK_MAX_ITEMS:
+                result = {
+                    "results": [],
+                    "result": False,
+                    "error_msg": "too many plans",
                 }
-                status = 400
-                return result, status
-            start_time = datetime.datetime.strptime(date_str, "%Y%m%d")
-            end_time = datetime.datetime.strptime(
-                date_str, "%Y%m%d"
-            ) + datetime.timedelta(days=1)
-            devanning_plan = db.session.query(DevanningPlanModel).filter(
-                and_(
-                    DevanningPlanModel.mh == mh,
-                    or_(
-                        and_(
-                            DevanningPlanModel.req_from_time >= start_time,
-                            DevanningPlanModel.req_from_time < end_time,
-                        ),
-                        and_(
-                            DevanningPlanModel.req_to_time >= start_time,
-                            DevanningPlanModel.req_to_time < end_time,
-                        ),
+                return result, 400
+            dt = datetime.datetime.now()
+            rows = []
+            results = []
+            trsp_instruction_ids = set()
+            for index, item in enumerate(data):
+                item_result = {
+                    "index": index,
+                    "trsp_instruction_id": (
+                        item.get("trsp_instruction_id")
+                        if isinstance(item, dict)
+                        else None
                     ),
+                    "result": True,
+                    "error_msg": "",
+                }
+                try:
+                    row = plan_row_from_body(devanning_plan_item_schema, mh, item, dt)
+                    # 同じ計画を複数指定した場合は、最初の計画のみ登録する
+                    if row["trsp_instruction_id"] in trsp_instruction_ids:
+                        raise ValueError("duplicate trsp_instruction_id")
+                    trsp_instruction_ids.add(row["trsp_instruction_id"])
+                    rows.append(row)
+                except (ValueError, TypeError, OverflowError) as e:
+                    item_result["result"] = False
+                    item_result["error_msg"] = str(e)
+                results.append(item_result)
+            conflicts = []
+            if rows:
+                upsert_plans(DevanningPlanModel, rows, ConfigIns.PLAN_BULK_CHUNK_SIZE)
+                conflicts, rejected = check_plan_conflicts(
+                    DevanningPlanModel, mh, [row["trsp_instruction_id"] for row in rows]
+                )
+                if rejected:
+                    db.session.rollback()
+                    # 全件を書き込まないため、重複の無い計画も登録失敗とする
+                    conflict_ids = {c["trsp_instruction_id"] for c in conflicts}
+                    for item_result in results:
+                        if not item_result["result"]:
+                            continue
+                        item_result["result"] = False
+                        item_result["error_msg"] = (
+                            "conflict"
+                            if item_result["trsp_instruction_id"] in conflict_ids
+                            else "rolled back"
+                        )
+                    result = {
+                        "results": results,
+                        "conflicts": conflicts,
+                        "result": False,
+                        "error_msg": "conflict",
+                    }
+                    return result, 409
+                db.session.commit()
+                plan_cache.invalidate(
+                    DevanningPlanModel.__tablename__,
+                    mh,
+                    [row["trsp_instruction_id"] for row in rows],
+                )
+                plan_index.patch(
+                    DevanningPlanModel, mh, [row["trsp_instruction_id"] for row in rows]
                 )
-            )
-            devanning_plan_schema = DevanningPlanModelSchema(many=True)
             result = {
-                "devanning_plan_list": devanning_plan_schema.dump(devanning_plan),
-                "result": True,
+                "results": results,
+                "conflicts": conflicts,
+                "result": all(item["result"] for item in results),
                 "error_msg": "",
             }
-            logger.debug(f"result:{result}")
+            debug_payload(logger, "result:%s", result)
             status = 200
         except Exception as e:
             logger.error(e, exc_info=True, stack_info=True)
-            result = {"devanning_plan_list": {}, "result": False, "error_msg": "Error"}
+            db.session.rollback()
+            result = {"results": [], "result": False, "error_msg": "Error"}
             status = 400
         return result, status
@@ -0,0 +1,98 @@
+# Copyright 2025 Intent Exchange, Inc.
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software
+# and associated documentation files (the “Software”), to deal in the Software without
+# restriction, including without limitation the rights to use, copy, modify, merge, publish,
+# distribute, sublicense, and/or sell copies of the Software, and to permit persons to whom the
+# Software is furnished to do so, subject to the following conditions:
+# The above copyright notice and this permission notice shall be included in all copies or
+# substantial portions of the Software.
+# THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR
+# OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE,
+# ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+# OTHER DEALINGS IN THE SOFTWARE.
+
+import sys
+import os
+import logging
+from flask import request
+from flask_restx import Namespace, Resource
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+from com.log import debug_payload
+from com.plan_changes import (
+    decode_change_cursor,
+    encode_change_cursor,
+    is_change_cursor_expired,
+    read_plan_changes,
+)
+from com.plan_query import parse_plan_limit
+from com.plan_types import PLAN_SUMMARY_SERIALIZERS
+
+logger = logging.getLogger("app.flask")
+logger.setLevel(logging.getLevelNamesMapping()[os.environ.get("LOGLEVEL", "DEBUG")])
+
+
+plan_changes_api_ns = Namespace(
+    "/mhapi/v1/plan_changes", description="バンニング・デバンニング計画の差分同期"
+)
+
+
+@plan_changes_api_ns.route("/<string:mh>")
+@plan_changes_api_ns.param("mh", "MHのGLN")
+class PlanChangesApi(Resource):
+
+    @plan_changes_api_ns.doc(
+        description=(
+            "計画の差分同期<br/>"
+            "MHのバンニング・デバンニング計画のうち、since より後に登録・更新された計画"
+            "(op: upsert)と削除された計画(op: delete、plan は null)を、"
+            "変更日時(changed_at)順に最大 limit 件返す。"
+            "次回は next_cursor を since に指定する。has_more が true の場合は、"
+            "続けて取得する。<br/>"
+            "since を省略した場合は全計画を返す（削除は返さない）。"
+            "reset が true の場合は保持期間を過ぎて返せない削除があるため、"
+            "保持している計画を破棄し、since を省略して取得し直す。"
+        ),
+    )
+    @plan_changes_api_ns.param("since", "前回の next_cursor")
+    @plan_changes_api_ns.param("limit", "1回で返す最大件数（最大 PLAN_LIST_MAX_LIMIT）")
+    def get(self, mh):
+        logger.debug("計画の差分同期")
+        try:
+            try:
+                key, full_sync_at = None, None
+                if request.args.get("since"):
+                    key, full_sync_at = decode_change_cursor(request.args.get("since"))
+                limit = parse_plan_limit(request.args)
+            except (ValueError, OverflowError) as e:
+                logger.debug("検索条件が不正: %s", e)
+                return {"changes": [], "result": False, "error_msg": str(e)}, 400
+            if key is not None and is_change_cursor_expired(key, full_sync_at):
+                result = {
+                    "changes": [],
+                    "next_cursor": None,
+                    "has_more": False,
+                    "reset": True,
+                    "result": True,
+                    "error_msg": "",
+                }
+                return result, 200
+            changes, next_key, has_more, full_sync_at = read_plan_changes(
+                mh, key, limit, PLAN_SUMMARY_SERIALIZERS, full_sync_at
+            )
+            result = {
+                "changes": changes,
+                "next_cursor": encode_change_cursor(next_key, full_sync_at),
+                "has_more": has_more,
+                "reset": False,
+                "result": True,
+                "error_msg": "",
+            }
+            debug_payload(logger, "result:%s", result)
+            return result, 200
+        except Exception as e:
+            logger.error(e, exc_info=True, stack_info=True)
+            return {"changes": [], "result": False, "error_msg": "Error"}, 400
@@ -0,0 +1,124 @@
+# Copyright 2025 Intent Exchange, Inc.
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software
+# and associated documentation files (the “Software”), to deal in the Software without
+# restriction, including without limitation the rights to use, copy, modify, merge, publish,
+# distribute, sublicense, and/or sell copies of the Software, and to permit persons to whom the
+# Software is furnished to do so, subject to the following conditions:
+# The above copyright notice and this permission notice shall be included in all copies or
+# substantial portions of the Software.
+# THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR
+# OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE,
+# ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+# OTHER DEALINGS IN THE SOFTWARE.
+
+import sys
+import os
+import logging
+import datetime
+from flask import request
+from flask_restx import Namespace, Resource
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+from com.log import debug_payload
+from com.plan_query import parse_plan_range, plan_equipment_overlap_filter
+from com.plan_types import (
+    PLAN_SUMMARY_SERIALIZERS,
+    parse_vanning_models,
+    plan_list_key,
+)
+from config import ConfigIns
+from model.plan_equipment import PlanEquipmentModel
+from database import db
+
+logger = logging.getLogger("app.flask")
+logger.setLevel(logging.getLevelNamesMapping()[os.environ.get("LOGLEVEL", "DEBUG")])
+
+
+plan_equipment_api_ns = Namespace(
+    "/mhapi/v1/plan_equipment", description="機材（トラクター・トレーラー）ごとの計画検索"
+)
+
+PLAN_EQUIPMENT_KINDS = ("tractor", "trailer")
+
+
+def parse_equipment_range(args):
+    """検索範囲を作成する（date, from とも省略時は現在から PLAN_LIST_MAX_DAYS 日）"""
+    if args.get("date") is None and args.get("from") is None:
+        range_from = datetime.datetime.now()
+        return range_from, range_from + datetime.timedelta(
+            days=ConfigIns.PLAN_LIST_MAX_DAYS
+        )
+    return parse_plan_range(args)
+
+
+@plan_equipment_api_ns.route("/<string:giai>")
+@plan_equipment_api_ns.param("giai", "トラクターまたはトレーラーのGIAI")
+class PlanEquipmentApi(Resource):
+
+    @plan_equipment_api_ns.doc(
+        description=(
+            "機材ごとの計画検索<br/>"
+            "指定したGIAIのトラクターまたはトレーラーを使用し、MH作業希望時間(From～To)が"
+            "検索範囲と重なるバンニング・デバンニング計画を、開始時間順に返す。"
+            "date, from を省略した場合は、現在以降（終了していない）の計画を返す。"
+        ),
+    )
+    @plan_equipment_api_ns.param("date", "検索する日付[yyyymmdd]")
+    @plan_equipment_api_ns.param(
+        "from", "検索範囲の開始[yyyymmdd または ISO8601 日時]（省略時は現在）"
+    )
+    @plan_equipment_api_ns.param(
+        "to",
+        "検索範囲の終了[yyyymmdd(その日を含む) または ISO8601 日時]"
+        "（省略時は from の1日後、from も省略時は PLAN_LIST_MAX_DAYS 日後）",
+    )
+    @plan_equipment_api_ns.param(
+        "kind", "機材の種類 tractor または trailer（省略時は両方）"
+    )
+    @plan_equipment_api_ns.param(
+        "is_vanning", "バンニング計画なら1、デバンニング計画なら0（省略時は両方）"
+    )
+    def get(self, giai):
+        logger.debug("機材ごとの計画検索")
+        try:
+            try:
+                range_from, range_to = parse_equipment_range(request.args)
+                kind = request.args.get("kind")
+                if kind is not None and kind not in PLAN_EQUIPMENT_KINDS:
+                    raise ValueError("kind must be tractor or trailer")
+                plan_models = parse_vanning_models(request.args)
+            except (ValueError, OverflowError) as e:
+                logger.debug("検索条件が不正: %s", e)
+                return {"result": False, "error_msg": str(e)}, 400
+            equipment_filter = plan_equipment_overlap_filter(giai, range_from, range_to)
+            if kind is not None:
+                equipment_filter += (PlanEquipmentModel.kind == kind,)
+            result = {}
+            for plan_model in plan_models:
+                serialize_plan = PLAN_SUMMARY_SERIALIZERS[plan_model.__tablename__]
+                # (giai, window_start) の索引で機材を絞り込み、計画を主キーで結合する
+                plan_ids = (
+                    db.session.query(PlanEquipmentModel.plan_id)
+                    .filter(
+                        PlanEquipmentModel.plan_type == plan_model.__tablename__,
+                        *equipment_filter,
+                    )
+                    .distinct()
+                )
+                plans = (
+                    db.session.query(plan_model)
+                    .filter(plan_model.id.in_(plan_ids))
+                    .order_by(plan_model.req_start_time, plan_model.id)
+                    .all()
+                )
+                result[plan_list_key(plan_model)] = [serialize_plan(p) for p in plans]
+            result["result"] = True
+            result["error_msg"] = ""
+            debug_payload(logger, "result:%s", result)
+            return result, 200
+        except Exception as e:
+            logger.error(e, exc_info=True, stack_info=True)
+            return {"result": False, "error_msg": "Error"}, 400
@@ -0,0 +1,165 @@
+# Copyright 2025 Intent Exchange, Inc.
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software
+# and associated documentation files (the “Software”), to deal in the Software without
+# restriction, including without limitation the rights to use, copy, modify, merge, publish,
+# distribute, sublicense, and/or sell copies of the Software, and to permit persons to whom the
+# Software is furnished to do so, subject to the following conditions:
+# The above copyright notice and this permission notice shall be included in all copies or
+# substantial portions of the Software.
+# THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR
+# OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE,
+# ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+# OTHER DEALINGS IN THE SOFTWARE.
+
+import sys
+import os
+import logging
+from flask import Response, request, stream_with_context
+from flask_restx import Namespace, Resource
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+from com.log import debug_payload
+from com.plan_event import (
+    is_plan_event_expired,
+    latest_plan_event_seq,
+    plan_event_stream,
+    plan_event_waiters,
+    wait_plan_events,
+)
+from com.plan_types import PLAN_SUMMARY_SERIALIZERS
+from config import ConfigIns
+
+logger = logging.getLogger("app.flask")
+logger.setLevel(logging.getLevelNamesMapping()[os.environ.get("LOGLEVEL", "DEBUG")])
+
+
+plan_event_api_ns = Namespace(
+    "/mhapi/v1/plan_event", description="バンニング・デバンニング計画の変更通知"
+)
+
+
+def parse_event_seq(value):
+    if value is None or value == "":
+        return None
+    seq = int(value)
+    if seq < 0:
+        raise ValueError("since must be 0 or more")
+    return seq
+
+
+@plan_event_api_ns.route("/<string:mh>/_stream")
+@plan_event_api_ns.param("mh", "MHのGLN")
+class PlanEventStreamApi(Resource):
+
+    @plan_event_api_ns.doc(
+        description=(
+            "計画の変更通知(Server-Sent Events)<br/>"
+            "MHのバンニング・デバンニング計画の登録・更新・削除を、"
+            "event: create/update/delete、id: seq のイベントで配信する。"
+            "data は seq, op, plan_type, trsp_instruction_id, created_at と、"
+            "登録・更新の場合は現在の計画(plan。削除済みの場合は null)。<br/>"
+            "再接続時は Last-Event-ID（または since）に最後に受信した seq を指定すると、"
+            "その後のイベントから配信する。省略時は接続後のイベントのみ配信する。"
+            "保持期間を過ぎて配信できないイベントがある場合は event: reset を送るため、"
+            "計画一覧を取得し直す。"
+            "PLAN_EVENT_STREAM_TIMEOUT 秒で接続を終了する。<br/>"
+            "同時接続数が PLAN_EVENT_MAX_WAITERS を超える場合は503を返すため、"
+            "ロングポーリングを使用する。"
+        ),
+    )
+    @plan_event_api_ns.param("since", "最後に受信した seq（Last-Event-ID が優先）")
+    @plan_event_api_ns.produces(["text/event-stream"])
+    def get(self, mh):
+        logger.debug("計画の変更通知(SSE)")
+        try:
+            since = parse_event_seq(
+                request.headers.get("Last-Event-ID") or request.args.get("since")
+            )
+        except (ValueError, OverflowError) as e:
+            logger.debug("検索条件が不正: %s", e)
+            return {"result": False, "error_msg": str(e)}, 400
+        # 接続中は uwsgi のスレッドを使用し続けるため、同時接続数を制限する
+        if not plan_event_waiters.acquire():
+            logger.warning("SSE の同時接続数が上限を超えたため接続を拒否: mh=%s", mh)
+            result = {"result": False, "error_msg": "too many streams"}
+            return result, 503, {"Retry-After": "60"}
+        response = Response(
+            stream_with_context(
+                plan_event_stream(mh, since, PLAN_SUMMARY_SERIALIZERS)
+            ),
+            mimetype="text/event-stream",
+            # nginx でバッファリングせずに送信させる
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        )
+        # 切断・タイムアウト時（配信を開始する前の切断を含む）に解放する
+        response.call_on_close(plan_event_waiters.release)
+        return response
+
+
+@plan_event_api_ns.route("/<string:mh>")
+@plan_event_api_ns.param("mh", "MHのGLN")
+class PlanEventApi(Resource):
+
+    @plan_event_api_ns.doc(
+        description=(
+            "計画の変更通知(ロングポーリング)<br/>"
+            "SSE を使用できない場合に使用する。since より後のイベントを返し、"
+            "無い場合は最大 wait 秒待つ。次回は last_seq を since に指定する。"
+            "since を省略した場合はイベントを返さず、現在の last_seq のみ返す。"
+            "reset が true の場合は保持期間を過ぎて返せないイベントがあるため、"
+            "計画一覧を取得し直す。"
+            "待機中の数が PLAN_EVENT_MAX_WAITERS を超える場合は待たずに返す。"
+        ),
+    )
+    @plan_event_api_ns.param("since", "前回の last_seq")
+    @plan_event_api_ns.param(
+        "wait", "イベントが無い場合の最大待ち時間(秒)（最大 PLAN_EVENT_LONG_POLL_MAX）"
+    )
+    def get(self, mh):
+        logger.debug("計画の変更通知(ロングポーリング)")
+        try:
+            try:
+                since = parse_event_seq(request.args.get("since"))
+                wait = float(request.args.get("wait", 0))
+                if wait < 0 or wait > ConfigIns.PLAN_EVENT_LONG_POLL_MAX:
+                    raise ValueError(
+                        f"wait must be 0 to {ConfigIns.PLAN_EVENT_LONG_POLL_MAX}"
+                    )
+            except (ValueError, OverflowError) as e:
+                logger.debug("検索条件が不正: %s", e)
+                return {"events": [], "result": False, "error_msg": str(e)}, 400
+            reset = False
+            if since is None:
+                events = []
+                last_seq = latest_plan_event_seq(mh)
+            else:
+                reset = is_plan_event_expired(mh, since)
+                if reset:
+                    events = []
+                    last_seq = latest_plan_event_seq(mh)
+                else:
+                    # 待機中は uwsgi のスレッドを使用し続けるため、待機数を制限する
+                    waiting = wait > 0 and plan_event_waiters.acquire()
+                    try:
+                        events = wait_plan_events(
+                            mh, since, PLAN_SUMMARY_SERIALIZERS, wait if waiting else 0
+                        )
+                    finally:
+                        if waiting:
+                            plan_event_waiters.release()
+                    last_seq = events[-1]["seq"] if events else since
+            result = {
+                "events": events,
+                "last_seq": last_seq,
+                "reset": reset,
+                "result": True,
+                "error_msg": "",
+            }
+            debug_payload(logger, "result:%s", result)
+            return result, 200
+        except Exception as e:
+            logger.error(e, exc_info=True, stack_info=True)
+            return {"events": [], "result": False, "error_msg": "Error"}, 400
@@ -18,9 +18,17 @@ import sys
 import os
 import logging
 from flask import request
-from flask_restx import Namespace, Resource
+from flask_restx import Namespace, Resource, fields
 
 sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+from com.etag import (
+    etag_headers,
+    is_not_modified,
+    make_etag,
+    not_modified_response,
+)
+from com.log import debug_payload
+from com.plan_query import parse_plan_search_batch, plan_search_batch
 from model.devanning_plan import DevanningPlanModel, DevanningPlanModelSchema
 from model.vanning_plan import VanningPlanModel, VanningPlanModelSchema
 from database import db, ma
@@ -40,7 +48,10 @@ class PlanSearchApi(Resource):
 
 
     @plan_search_api_ns.doc(
-        description=("バンニング・デバンニング計画検索 <br/>"),
+        description=(
+            "バンニング・デバンニング計画検索 <br/>"
+            "レスポンスの ETag を If-None-Match に指定すると、更新が無い場合は304を返す。"
+        ),
         params={
             "is_departure_mh": "発MHなら1、着MHなら0(required)",
             "trsp_instruction_id": "trsp_instruction_id(required)",
@@ -55,33 +66,52 @@ class PlanSearchApi(Resource):
             trsp_instruction_id = query_params.get("trsp_instruction_id")
             is_vanning = int(query_params.get("is_vanning", 0))
             if is_vanning == 1:
-                vanning_plan = (
-                    db.session.query(VanningPlanModel)
-                    .filter(
-                        VanningPlanModel.is_departure_mh == is_departure_mh,
-                        VanningPlanModel.trsp_instruction_id == trsp_instruction_id,
-                    )
+                plan_model = VanningPlanModel
+                plan_schema = VanningPlanModelSchema(many=False)
+            else:
+                plan_model = DevanningPlanModel
+                plan_schema = DevanningPlanModelSchema(many=False)
+            plan_filter = (
+                plan_model.is_departure_mh == is_departure_mh,
+                plan_model.trsp_instruction_id == trsp_instruction_id,
+            )
+            if request.if_none_match:
+                # 更新日時のみ取得し、更新が無ければ計画を読み込まずに304を返す
+                plan_meta = (
+                    db.session.query(plan_model.mh, plan_model.updated_at)
+                    .filter(*plan_filter)
+                    .order_by(plan_model.id)
                     .first()
                 )
-                if vanning_plan is None:
-                    plan = None
-                else:
-                    vanning_plan_schema = VanningPlanModelSchema(many=False)
-                    plan = vanning_plan_schema.dump(vanning_plan)
-            else:
-                devanning_plan = (
-                    db.session.query(DevanningPlanModel)
-                    .filter(
-                        DevanningPlanModel.is_departure_mh == is_departure_mh,
-                        DevanningPlanModel.trsp_instruction_id == trsp_instruction_id,
+                if plan_meta is not None:
+                    etag = make_etag(
+                        plan_model.__tablename__,
+                        plan_meta.mh,
+                        trsp_instruction_id,
+                        plan_meta.updated_at.isoformat(),
                     )
-                    .first()
+                    if is_not_modified(etag):
+                        return not_modified_response(etag)
+            plan_row = (
+                db.session.query(plan_model)
+                .filter(*plan_filter)
+                .order_by(plan_model.id)
+                .first()
+            )
+            headers = {}
+            if plan_row is None:
+                plan = None
+            else:
+                plan = plan_schema.dump(plan_row)
+                etag = make_etag(
+                    plan_model.__tablename__,
+                    plan["mh"],
+                    trsp_instruction_id,
+                    plan["updated_at"],
                 )
-                if devanning_plan is None:
-                    plan = None
-                else:
-                    devanning_plan_schema = DevanningPlanModelSchema(many=False)
-                    plan = devanning_plan_schema.dump(devanning_plan)
+                if is_not_modified(etag):
+                    return not_modified_response(etag)
+                headers = etag_headers(etag)
             if plan is None:
                 result = {
                     "plan": None,
@@ -96,9 +126,87 @@ class PlanSearchApi(Resource):
                     "result": True,
                     "error_msg": "",
                 }
-            logger.debug(f"result:{result}")
+            debug_payload(logger, "result:%s", result)
         except Exception as e:
             logger.error(e, exc_info=True, stack_info=True)
             result = {"plan": {}, "result": False, "error_msg": "Error"}
             status = 400
+            headers = {}
+        return result, status, headers
+
+
+# 一括検索で、計画の種類（is_vanning）ごとの結果のキー
+PLAN_SEARCH_BATCH_TYPES = {
+    1: ("vanning_plan", VanningPlanModel, VanningPlanModelSchema),
+    0: ("devanning_plan", DevanningPlanModel, DevanningPlanModelSchema),
+}
+# 一括検索で、発MH・着MH（is_departure_mh）ごとの結果のキー
+PLAN_SEARCH_BATCH_DEPARTURE_KEYS = {1: "departure", 0: "arrival"}
+
+
+@plan_search_api_ns.route("/_batch")
+class PlanSearchBatchApi(Resource):
+    batch_request_model = plan_search_api_ns.model(
+        "PlanSearchBatchBody",
+        {
+            "trsp_instruction_ids": fields.List(
+                fields.String(example="20241024"),
+                required=True,
+                description="trsp_instruction_id の配列",
+            ),
+            "is_vanning": fields.List(
+                fields.Integer(example=1),
+                description="バンニング計画なら1、デバンニング計画なら0（省略時は両方）",
+            ),
+            "is_departure_mh": fields.List(
+                fields.Integer(example=1),
+                description="発MHなら1、着MHなら0（省略時は両方）",
+            ),
+        },
+    )
+
+    @plan_search_api_ns.doc(
+        description=(
+            "バンニング・デバンニング計画一括検索 <br/>"
+            "複数の trsp_instruction_id の計画を1回で検索する。"
+            "is_vanning, is_departure_mh は 0/1 またはその配列で指定する。<br/>"
+            "plans は trsp_instruction_id → 計画の種類(vanning_plan/devanning_plan) → "
+            "発MH(departure)/着MH(arrival) の順のキーで計画を返す。計画が無い場合は null。"
+        ),
+    )
+    @plan_search_api_ns.expect(batch_request_model)
+    def post(self):
+        logger.debug("バンニング・デバンニング計画一括検索")
+        try:
+            data = request.get_json(force=True)
+            try:
+                trsp_instruction_ids, vanning_values, departure_values = (
+                    parse_plan_search_batch(data)
+                )
+            except ValueError as e:
+                logger.debug("検索条件が不正: %s", e)
+                return {"plans": {}, "result": False, "error_msg": str(e)}, 400
+            plans = {
+                trsp_instruction_id: {} for trsp_instruction_id in trsp_instruction_ids
+            }
+            for is_vanning in vanning_values:
+                plan_type, plan_model, plan_schema = PLAN_SEARCH_BATCH_TYPES[is_vanning]
+                schema = plan_schema(many=False)
+                found = plan_search_batch(
+                    plan_model, trsp_instruction_ids, departure_values
+                )
+                for trsp_instruction_id in trsp_instruction_ids:
+                    plan_result = {}
+                    for is_departure_mh in departure_values:
+                        plan = found.get((trsp_instruction_id, is_departure_mh))
+                        key = PLAN_SEARCH_BATCH_DEPARTURE_KEYS[is_departure_mh]
+                        plan_result[key] = None if plan is None else schema.dump(plan)
+                    plans[trsp_instruction_id][plan_type] = plan_result
+            result = {"plans": plans, "result": True, "error_msg": ""}
+            debug_payload(logger, "result:%s", result)
+            status = 200
+        except Exception as e:
+            logger.error(e, exc_info=True, stack_info=True)
+            result = {"plans": {}, "result": False, "error_msg": "Error"}
+            status = 400
         return result, status
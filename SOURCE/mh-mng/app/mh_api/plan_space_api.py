@@ -0,0 +1,163 @@
+# Copyright 2025 Intent Exchange, Inc.
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software
+# and associated documentation files (the “Software”), to deal in the Software without
+# restriction, including without limitation the rights to use, copy, modify, merge, publish,
+# distribute, sublicense, and/or sell copies of the Software, and to permit persons to whom the
+# Software is furnished to do so, subject to the following conditions:
+# The above copyright notice and this permission notice shall be included in all copies or
+# substantial portions of the Software.
+# THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR
+# OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE,
+# ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+# OTHER DEALINGS IN THE SOFTWARE.
+
+import sys
+import os
+import logging
+from flask import request
+from flask_restx import Namespace, Resource
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+from com.log import debug_payload
+from com.occupancy import space_occupancy
+from com.plan_query import (
+    parse_plan_range,
+    plan_space_overlap_filter,
+    plan_windows_query,
+)
+from com.plan_store import split_list_str
+from com.plan_types import (
+    PLAN_SUMMARY_SERIALIZERS,
+    parse_vanning_models,
+    plan_list_key,
+)
+from model.devanning_plan import DevanningPlanModel
+from model.plan_space import PlanSpaceModel
+from model.vanning_plan import VanningPlanModel
+from database import db
+
+logger = logging.getLogger("app.flask")
+logger.setLevel(logging.getLevelNamesMapping()[os.environ.get("LOGLEVEL", "DEBUG")])
+
+
+plan_space_api_ns = Namespace(
+    "/mhapi/v1/plan_space", description="駐車枠ごとの計画検索"
+)
+
+@plan_space_api_ns.route("/<string:mh>/_occupancy")
+@plan_space_api_ns.param("mh", "MHのGLN")
+class PlanSpaceOccupancyApi(Resource):
+
+    @plan_space_api_ns.doc(
+        description=(
+            "駐車枠の占有状況<br/>"
+            "バンニング・デバンニング計画のMH作業希望時間(From～To)から、"
+            "駐車枠ごとに検索範囲内の占有区間と最大同時使用数を返す"
+            "（取消(status: -1)の計画は含めない）。"
+            "date または from のいずれかが必須。<br/>"
+            "spaces は駐車枠ごとに plan_count（検索範囲と重なる計画数）、"
+            "peak（最大同時使用数）、segments（使用数が変わる時刻で区切った "
+            "[開始, 終了, 使用数] の配列。使用数0の区間は含めない）を返す。"
+        ),
+    )
+    @plan_space_api_ns.param("date", "検索する日付[yyyymmdd]")
+    @plan_space_api_ns.param("from", "検索範囲の開始[yyyymmdd または ISO8601 日時]")
+    @plan_space_api_ns.param(
+        "to",
+        "検索範囲の終了[yyyymmdd(その日を含む) または ISO8601 日時]"
+        "（省略時は from の1日後）",
+    )
+    def get(self, mh):
+        logger.debug("駐車枠の占有状況")
+        try:
+            try:
+                range_from, range_to = parse_plan_range(request.args)
+            except (ValueError, OverflowError) as e:
+                logger.debug("検索条件が不正: %s", e)
+                return {"spaces": {}, "result": False, "error_msg": str(e)}, 400
+            windows = db.session.execute(
+                plan_windows_query(
+                    (VanningPlanModel, DevanningPlanModel), mh, range_from, range_to
+                )
+            )
+            spaces = space_occupancy(
+                (
+                    (split_list_str(w.mh_space_list_str), w.window_start, w.window_end)
+                    for w in windows
+                ),
+                range_from,
+                range_to,
+            )
+            result = {
+                "from": range_from,
+                "to": range_to,
+                "spaces": spaces,
+                "result": True,
+                "error_msg": "",
+            }
+            debug_payload(logger, "result:%s", result)
+            return result, 200
+        except Exception as e:
+            logger.error(e, exc_info=True, stack_info=True)
+            return {"spaces": {}, "result": False, "error_msg": "Error"}, 400
+
+
+@plan_space_api_ns.route("/<string:mh>/<string:space>")
+@plan_space_api_ns.param("mh", "MHのGLN")
+@plan_space_api_ns.param("space", "MHの駐車枠")
+class PlanSpaceApi(Resource):
+
+    @plan_space_api_ns.doc(
+        description=(
+            "駐車枠ごとの計画検索<br/>"
+            "指定した駐車枠を使用し、MH作業希望時間(From～To)が検索範囲と重なる計画を返す。"
+            "date または from のいずれかが必須。"
+        ),
+    )
+    @plan_space_api_ns.param("date", "検索する日付[yyyymmdd]")
+    @plan_space_api_ns.param("from", "検索範囲の開始[yyyymmdd または ISO8601 日時]")
+    @plan_space_api_ns.param(
+        "to",
+        "検索範囲の終了[yyyymmdd(その日を含む) または ISO8601 日時]"
+        "（省略時は from の1日後）",
+    )
+    @plan_space_api_ns.param(
+        "is_vanning", "バンニング計画なら1、デバンニング計画なら0（省略時は両方）"
+    )
+    def get(self, mh, space):
+        logger.debug("駐車枠ごとの計画検索")
+        try:
+            try:
+                range_from, range_to = parse_plan_range(request.args)
+                plan_models = parse_vanning_models(request.args)
+            except (ValueError, OverflowError) as e:
+                logger.debug("検索条件が不正: %s", e)
+                return {"result": False, "error_msg": str(e)}, 400
+            result = {}
+            for plan_model in plan_models:
+                serialize_plan = PLAN_SUMMARY_SERIALIZERS[plan_model.__tablename__]
+                # (mh, space, window_start) の索引で割当を絞り込み、計画を主キーで結合する
+                plans = (
+                    db.session.query(plan_model)
+                    .join(
+                        PlanSpaceModel,
+                        (PlanSpaceModel.plan_id == plan_model.id)
+                        & (PlanSpaceModel.plan_type == plan_model.__tablename__),
+                    )
+                    .filter(
+                        *plan_space_overlap_filter(mh, space, range_from, range_to)
+                    )
+                    .order_by(PlanSpaceModel.window_start, plan_model.id)
+                    .all()
+                )
+                result[plan_list_key(plan_model)] = [serialize_plan(p) for p in plans]
+            result["result"] = True
+            result["error_msg"] = ""
+            debug_payload(logger, "result:%s", result)
+            return result, 200
+        except Exception as e:
+            logger.error(e, exc_info=True, stack_info=True)
+            return {"result": False, "error_msg": "Error"}, 400
@@ -0,0 +1,307 @@
+# Copyright 2025 Intent Exchange, Inc.
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software
+# and associated documentation files (the “Software”), to deal in the Software without
+# restriction, including without limitation the rights to use, copy, modify, merge, publish,
+# distribute, sublicense, and/or sell copies of the Software, and to permit persons to whom the
+# Software is furnished to do so, subject to the following conditions:
+# The above copyright notice and this permission notice shall be included in all copies or
+# substantial portions of the Software.
+# THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR
+# OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE,
+# ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+# OTHER DEALINGS IN THE SOFTWARE.
+
+import sys
+import os
+import logging
+from flask_restx import marshal
+from sqlalchemy import func, select
+from starlette.responses import StreamingResponse
+from starlette.routing import Route
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+from com.asgi_response import (
+    CORS_HEADERS,
+    accepts_ndjson,
+    json_response,
+    not_modified_response,
+)
+from com.async_db import async_session
+from com.etag import etag_headers, if_none_match_contains, make_etag
+from com.json_encoder import dumps_json
+from com.log import debug_payload
+from com.plan_query import (
+    NDJSON_MIMETYPE,
+    parse_plan_limit,
+    parse_plan_range,
+    plan_cursor_filter,
+    plan_overlap_filter,
+    plan_page_result,
+)
+from com.plan_types import PLAN_VANNING_MODELS
+from config import ConfigIns
+from mh_api.devanning_plan_api import (
+    DevanningPlanAPI,
+    DevanningPlanListAPI,
+    serialize_devanning_plan,
+)
+from mh_api.vanning_plan_api import (
+    VanningPlanAPI,
+    VanningPlanListAPI,
+    serialize_vanning_plan,
+)
+from model.devanning_plan import DevanningPlanModel, DevanningPlanModelSchema
+from model.vanning_plan import VanningPlanModel, VanningPlanModelSchema
+
+logger = logging.getLogger("app.flask")
+logger.setLevel(logging.getLevelNamesMapping()[os.environ.get("LOGLEVEL", "DEBUG")])
+
+API_PREFIX = "/mhapi/v1"
+# 計画の種類ごとの、モデル・スキーマ・一覧の変換処理と、レスポンスの restx モデル
+# （mh_api の詳細取得・一覧取得と同じ形で返す）
+PLAN_READ_TYPES = {
+    VanningPlanModel.__tablename__: (
+        VanningPlanModel,
+        VanningPlanModelSchema(many=False),
+        serialize_vanning_plan,
+        VanningPlanAPI.post_response_model,
+        VanningPlanListAPI.get_list_res_model,
+    ),
+    DevanningPlanModel.__tablename__: (
+        DevanningPlanModel,
+        DevanningPlanModelSchema(many=False),
+        serialize_devanning_plan,
+        DevanningPlanAPI.post_response_model,
+        DevanningPlanListAPI.get_list_res_model,
+    ),
+}
+
+
+def plan_detail_endpoint(plan_type):
+    """計画詳細取得（GET /<plan_type>/<mh>/<trsp_instruction_id>）
+
+    計画詳細のキャッシュ(plan_cache)は Flask のプロセスの書き込みで無効化されるため
+    使用せず、毎回DBから読み込む。
+    """
+    model, schema, _, response_model, _ = PLAN_READ_TYPES[plan_type]
+
+    async def get_plan(request):
+        mh = request.path_params["mh"]
+        trsp_instruction_id = request.path_params["trsp_instruction_id"]
+        logger.debug(
+            "計画詳細取得 %s mh=%s trsp_instruction_id=%s",
+            plan_type,
+            mh,
+            trsp_instruction_id,
+        )
+        if_none_match = request.headers.get("if-none-match")
+        plan_filter = (
+            model.mh == mh,
+            model.trsp_instruction_id == trsp_instruction_id,
+        )
+        try:
+            async with async_session() as session:
+                if if_none_match:
+                    # 更新日時のみ取得し、更新が無ければ計画を読み込まずに304を返す
+                    updated_at = await session.scalar(
+                        select(model.updated_at).where(*plan_filter)
+                    )
+                    if updated_at is not None:
+                        etag = make_etag(
+                            plan_type, mh, trsp_instruction_id, updated_at.isoformat()
+                        )
+                        if if_none_match_contains(if_none_match, etag):
+                            return not_modified_response(etag)
+                plan_row = await session.scalar(
+                    select(model).where(*plan_filter).limit(1)
+                )
+            headers = {}
+            if plan_row is None:
+                result = {plan_type: None, "result": False, "error_msg": "Not Found"}
+            else:
+                plan = schema.dump(plan_row)
+                etag = make_etag(plan_type, mh, trsp_instruction_id, plan["updated_at"])
+                if if_none_match_contains(if_none_match, etag):
+                    return not_modified_response(etag)
+                headers = etag_headers(etag)
+                result = {plan_type: plan, "result": True, "error_msg": ""}
+            debug_payload(logger, "result:%s", result)
+            status = 200
+        except Exception as e:
+            logger.error(e, exc_info=True, stack_info=True)
+            result = {plan_type: {}, "result": False, "error_msg": "Error"}
+            status = 400
+            headers = {}
+        return json_response(marshal(result, response_model), status, headers)
+
+    return get_plan
+
+
+def plan_ndjson_stream_response(statement, serialize):
+    """plan_ndjson_response と同様に、検索結果を1行1計画の NDJSON でストリーミングする"""
+    statement = statement.execution_options(yield_per=ConfigIns.PLAN_STREAM_BATCH_SIZE)
+
+    async def generate():
+        async with async_session() as session:
+            plans = await session.stream_scalars(statement)
+            async for plan in plans:
+                yield dumps_json(serialize(plan), newline=True)
+
+    return StreamingResponse(
+        generate(), media_type=NDJSON_MIMETYPE, headers=CORS_HEADERS
+    )
+
+
+def plan_list_endpoint(plan_type):
+    """計画検索（GET /<plan_type>/<mh>）
+
+    計画索引(PLAN_INDEX_ENABLED)は使用せず、DBを検索する。
+    """
+    model, _, serialize_plan, _, list_response_model = PLAN_READ_TYPES[plan_type]
+    list_key = f"{plan_type}_list"
+
+    async def get_plan_list(request):
+        mh = request.path_params["mh"]
+        args = request.query_params
+        logger.debug("計画検索 %s mh=%s", plan_type, mh)
+        try:
+            try:
+                range_from, range_to = parse_plan_range(args)
+                plan_filter = plan_overlap_filter(model, mh, range_from, range_to)
+                if accepts_ndjson(request):
+                    statement = plan_cursor_filter(
+                        select(model).where(*plan_filter), model, args
+                    ).order_by(model.req_start_time, model.id)
+                    return plan_ndjson_stream_response(statement, serialize_plan)
+                async with async_session() as session:
+                    # 検索条件に該当する件数と最終更新日時から ETag を作成する
+                    count, last_updated_at = (
+                        await session.execute(
+                            select(
+                                func.count(model.id), func.max(model.updated_at)
+                            ).where(*plan_filter)
+                        )
+                    ).one()
+                    etag = make_etag(
+                        plan_type,
+                        mh,
+                        sorted(args.multi_items()),
+                        count,
+                        last_updated_at,
+                    )
+                    if_none_match = request.headers.get("if-none-match")
+                    if if_none_match_contains(if_none_match, etag):
+                        return not_modified_response(etag)
+                    limit = parse_plan_limit(args)
+                    plans = (
+                        await session.scalars(
+                            plan_cursor_filter(
+                                select(model).where(*plan_filter), model, args
+                            )
+                            .order_by(model.req_start_time, model.id)
+                            .limit(limit + 1)
+                        )
+                    ).all()
+                plans, next_cursor = plan_page_result(plans, limit)
+            except (ValueError, OverflowError) as e:
+                logger.debug("検索条件が不正: %s", e)
+                result = {list_key: {}, "result": False, "error_msg": str(e)}
+                return json_response(marshal(result, list_response_model), 400)
+            result = {
+                list_key: [serialize_plan(p) for p in plans],
+                "next_cursor": next_cursor,
+                "result": True,
+                "error_msg": "",
+            }
+            debug_payload(logger, "result:%s", result)
+            return json_response(result, 200, etag_headers(etag))
+        except Exception as e:
+            logger.error(e, exc_info=True, stack_info=True)
+            result = {list_key: {}, "result": False, "error_msg": "Error"}
+            return json_response(marshal(result, list_response_model), 400)
+
+    return get_plan_list
+
+
+async def get_plan_search(request):
+    """バンニング・デバンニング計画検索（GET /plan_search/）"""
+    logger.debug("バンニング・デバンニング計画検索")
+    if_none_match = request.headers.get("if-none-match")
+    try:
+        query_params = request.query_params
+        is_departure_mh = int(query_params.get("is_departure_mh", 0))
+        trsp_instruction_id = query_params.get("trsp_instruction_id")
+        is_vanning = int(query_params.get("is_vanning", 0))
+        plan_type = PLAN_VANNING_MODELS[1 if is_vanning == 1 else 0].__tablename__
+        plan_model, plan_schema, _, _, _ = PLAN_READ_TYPES[plan_type]
+        plan_filter = (
+            plan_model.is_departure_mh == is_departure_mh,
+            plan_model.trsp_instruction_id == trsp_instruction_id,
+        )
+        async with async_session() as session:
+            if if_none_match:
+                # 更新日時のみ取得し、更新が無ければ計画を読み込まずに304を返す
+                plan_meta = (
+                    await session.execute(
+                        select(plan_model.mh, plan_model.updated_at)
+                        .where(*plan_filter)
+                        .order_by(plan_model.id)
+                        .limit(1)
+                    )
+                ).first()
+                if plan_meta is not None:
+                    etag = make_etag(
+                        plan_type,
+                        plan_meta.mh,
+                        trsp_instruction_id,
+                        plan_meta.updated_at.isoformat(),
+                    )
+                    if if_none_match_contains(if_none_match, etag):
+                        return not_modified_response(etag)
+            plan_row = await session.scalar(
+                select(plan_model).where(*plan_filter).order_by(plan_model.id).limit(1)
+            )
+        headers = {}
+        if plan_row is None:
+            result = {"plan": None, "result": False, "error_msg": "Not Found"}
+            status = 404
+        else:
+            plan = plan_schema.dump(plan_row)
+            etag = make_etag(
+                plan_type, plan["mh"], trsp_instruction_id, plan["updated_at"]
+            )
+            if if_none_match_contains(if_none_match, etag):
+                return not_modified_response(etag)
+            headers = etag_headers(etag)
+            result = {"plan": plan, "result": True, "error_msg": ""}
+            status = 200
+        debug_payload(logger, "result:%s", result)
+    except Exception as e:
+        logger.error(e, exc_info=True, stack_info=True)
+        result = {"plan": {}, "result": False, "error_msg": "Error"}
+        status = 400
+        headers = {}
+    return json_response(result, status, headers)
+
+
+def plan_read_routes():
+    """非同期で処理する計画の読み込みAPIのルート（GET のみ）"""
+    routes = []
+    for plan_type in PLAN_READ_TYPES:
+        routes += [
+            Route(
+                f"{API_PREFIX}/{plan_type}/{{mh}}/{{trsp_instruction_id}}",
+                plan_detail_endpoint(plan_type),
+                methods=["GET"],
+            ),
+            Route(
+                f"{API_PREFIX}/{plan_type}/{{mh}}",
+                plan_list_endpoint(plan_type),
+                methods=["GET"],
+            ),
+        ]
+    routes.append(Route(f"{API_PREFIX}/plan_search/", get_plan_search, methods=["GET"]))
+    return routes
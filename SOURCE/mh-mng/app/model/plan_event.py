@@ -0,0 +1,50 @@
+# Copyright 2025 Intent Exchange, Inc.
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software
+# and associated documentation files (the “Software”), to deal in the Software without
+# restriction, including without limitation the rights to use, copy, modify, merge, publish,
+# distribute, sublicense, and/or sell copies of the Software, and to permit persons to whom the
+# Software is furnished to do so, subject to the following conditions:
+# The above copyright notice and this permission notice shall be included in all copies or
+# substantial portions of the Software.
+# THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR
+# OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE,
+# ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+# OTHER DEALINGS IN THE SOFTWARE.
+
+import sys
+import os
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+from database import db
+
+
+class PlanEventModel(db.Model):
+    """計画の変更イベント（登録・更新・削除）
+
+    計画の書き込みと同じトランザクションで com.plan_store が追加し、
+    変更通知(plan_event)の API が seq 順に配信する。
+    """
+
+    __tablename__ = "plan_event"
+    __table_args__ = (db.Index("idx_plan_event_mh_seq", "mh", "seq"),)
+
+    seq = db.Column(
+        db.BigInteger().with_variant(db.Integer, "sqlite"),
+        primary_key=True,
+        autoincrement=True,
+        doc="イベントの通番",
+    )
+    mh = db.Column(db.String(16), nullable=False, doc="MHのGLN(3桁＋13桁)")
+    plan_type = db.Column(
+        db.String(16), nullable=False, doc="計画の種類(vanning_plan/devanning_plan)"
+    )
+    trsp_instruction_id = db.Column(
+        db.String(20), nullable=False, doc="trsp_instruction_id"
+    )
+    op = db.Column(db.String(8), nullable=False, doc="操作(create/update/delete)")
+    created_at = db.Column(
+        db.DateTime(timezone=True), nullable=False, doc="作成日時"
+    )
@@ -0,0 +1,37 @@
+# Copyright 2025 Intent Exchange, Inc.
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software
+# and associated documentation files (the “Software”), to deal in the Software without
+# restriction, including without limitation the rights to use, copy, modify, merge, publish,
+# distribute, sublicense, and/or sell copies of the Software, and to permit persons to whom the
+# Software is furnished to do so, subject to the following conditions:
+# The above copyright notice and this permission notice shall be included in all copies or
+# substantial portions of the Software.
+# THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR
+# OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE,
+# ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+# OTHER DEALINGS IN THE SOFTWARE.
+
+import sys
+import os
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+from database import db
+
+
+class PlanEventPurgeModel(db.Model):
+    """MHごとの削除済みの変更イベントの最大の seq
+
+    古いイベントの削除と同じトランザクションで com.plan_event が更新し、
+    変更通知(plan_event)の API が、クライアントの最後の seq より後のイベントが
+    削除済みか（全件の再取得が必要か）の判定に使用する。
+    """
+
+    __tablename__ = "plan_event_purge"
+
+    mh = db.Column(db.String(16), primary_key=True, doc="MHのGLN(3桁＋13桁)")
+    purged_seq = db.Column(
+        db.BigInteger, nullable=False, default=0, doc="削除したイベントの最大の seq"
+    )
@@ -0,0 +1,61 @@
+# Copyright 2025 Intent Exchange, Inc.
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software
+# and associated documentation files (the “Software”), to deal in the Software without
+# restriction, including without limitation the rights to use, copy, modify, merge, publish,
+# distribute, sublicense, and/or sell copies of the Software, and to permit persons to whom the
+# Software is furnished to do so, subject to the following conditions:
+# The above copyright notice and this permission notice shall be included in all copies or
+# substantial portions of the Software.
+# THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR
+# OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE,
+# ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+# OTHER DEALINGS IN THE SOFTWARE.
+
+
+import sys
+import os
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+from database import db
+
+
+class PlanSpaceModel(db.Model):
+    """計画ごとの駐車枠の割当
+
+    計画の mh_space_list_str を駐車枠ごとの行に展開したもの。
+    計画の登録・更新・削除と同じトランザクションで com.plan_store が作り直す。
+    """
+
+    __tablename__ = "plan_space"
+    __table_args__ = (
+        db.UniqueConstraint(
+            "plan_type",
+            "plan_id",
+            "space",
+            name="uq_plan_space_plan_type_plan_id_space",
+        ),
+        db.Index(
+            "idx_plan_space_mh_space_window_start", "mh", "space", "window_start"
+        ),
+    )
+
+    id = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    plan_type = db.Column(
+        db.String(16), nullable=False, doc="計画の種類(vanning_plan/devanning_plan)"
+    )
+    plan_id = db.Column(db.Integer, nullable=False, doc="計画のid")
+    mh = db.Column(db.String(16), nullable=False, doc="MHのGLN(3桁＋13桁)")
+    space = db.Column(db.String(256), nullable=False, doc="MHの駐車枠")
+    window_start = db.Column(
+        db.DateTime(timezone=True),
+        nullable=True,
+        doc="MH作業開始時間(MH作業希望時間(From)、無ければ(To))",
+    )
+    window_end = db.Column(
+        db.DateTime(timezone=True),
+        nullable=True,
+        doc="MH作業終了時間(MH作業希望時間(To)、無ければ(From))",
+    )
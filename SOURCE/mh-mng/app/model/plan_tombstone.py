@@ -0,0 +1,56 @@
+# Copyright 2025 Intent Exchange, Inc.
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software
+# and associated documentation files (the “Software”), to deal in the Software without
+# restriction, including without limitation the rights to use, copy, modify, merge, publish,
+# distribute, sublicense, and/or sell copies of the Software, and to permit persons to whom the
+# Software is furnished to do so, subject to the following conditions:
+# The above copyright notice and this permission notice shall be included in all copies or
+# substantial portions of the Software.
+# THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR
+# OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE,
+# ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+# OTHER DEALINGS IN THE SOFTWARE.
+
+import sys
+import os
+from sqlalchemy.dialects import mysql
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+from database import db
+
+
+class PlanTombstoneModel(db.Model):
+    """削除した計画の記録
+
+    計画の削除と同じトランザクションで com.plan_store が追加し、
+    差分同期(plan_changes)の API が削除として返す。
+    """
+
+    __tablename__ = "plan_tombstone"
+    __table_args__ = (
+        db.Index("idx_plan_tombstone_mh_deleted_at_id", "mh", "deleted_at", "id"),
+    )
+
+    id = db.Column(
+        db.BigInteger().with_variant(db.Integer, "sqlite"),
+        primary_key=True,
+        autoincrement=True,
+        doc="The unique id",
+    )
+    plan_type = db.Column(
+        db.String(16), nullable=False, doc="計画の種類(vanning_plan/devanning_plan)"
+    )
+    plan_id = db.Column(db.Integer, nullable=False, doc="削除した計画のid")
+    mh = db.Column(db.String(16), nullable=False, doc="MHのGLN(3桁＋13桁)")
+    trsp_instruction_id = db.Column(
+        db.String(20), nullable=False, doc="trsp_instruction_id"
+    )
+    # 計画の updated_at と同じく、MySQL ではマイクロ秒まで保持する
+    deleted_at = db.Column(
+        db.DateTime(timezone=True).with_variant(mysql.DATETIME(fsp=6), "mysql"),
+        nullable=False,
+        doc="削除日時",
+    )
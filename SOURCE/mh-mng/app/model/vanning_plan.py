@@ -18,6 +18,7 @@ from datetime import datetime, date, time
 from marshmallow import fields, validate, ValidationError
 import sys
 import os
+from sqlalchemy.dialects import mysql
 from sqlalchemy.ext.hybrid import hybrid_property
 
 sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
@@ -26,6 +27,20 @@ from database import db, ma
 
 class VanningPlanModel(db.Model):
     __tablename__ = "vanning_plan"
+    __table_args__ = (
+        db.UniqueConstraint(
+            "mh", "trsp_instruction_id", name="uq_mh_trsp_instruction_id"
+        ),
+        db.Index("idx_vanning_plan_mh_req_start_time", "mh", "req_start_time"),
+        # 差分同期(plan_changes)用
+        db.Index("idx_vanning_plan_mh_updated_at_id", "mh", "updated_at", "id"),
+        # plan_search 用
+        db.Index(
+            "idx_vanning_plan_trsp_instruction_id_is_departure_mh",
+            "trsp_instruction_id",
+            "is_departure_mh",
+        ),
+    )
     id = db.Column(
         db.Integer, primary_key=True, doc="The unique id", autoincrement=True
     )  # created to have a primary key
@@ -58,6 +73,12 @@ class VanningPlanModel(db.Model):
     actual_time = db.Column(
         db.DateTime(timezone=True), nullable=True, doc="MH作業実績時間"
     )
+    # 一覧検索用。MH作業希望時間(From)、無ければ(To)
+    req_start_time = db.Column(
+        db.DateTime(timezone=True),
+        db.Computed("COALESCE(req_from_time, req_to_time)", persisted=True),
+        doc="MH作業開始時間(検索用)",
+    )
     status = db.Column(
         db.Integer, nullable=False, doc="状態(idle(0),planning(1),done(2),cancel(-1))"
     )
@@ -78,8 +99,9 @@ class VanningPlanModel(db.Model):
         nullable=False,
         doc="作成日時",
     )
+    # ETag 等で更新を判別できるよう、MySQL ではマイクロ秒まで保持する
     updated_at = db.Column(
-        db.DateTime(timezone=True),
+        db.DateTime(timezone=True).with_variant(mysql.DATETIME(fsp=6), "mysql"),
         nullable=False,
         doc="更新日時",
     )
@@ -102,7 +124,12 @@ class VanningPlanModelSchema(ma.SQLAlchemyAutoSchema):
         ordered = True
         model = VanningPlanModel
         load_instance = True
-        exclude = ("id", "mh_space_list_str", "trailer_giai_list_str")
+        exclude = (
+            "id",
+            "mh_space_list_str",
+            "trailer_giai_list_str",
+            "req_start_time",
+        )
 
     id = ma.auto_field(
         metadata={"description": VanningPlanModel.__table__.c.id.doc, "max_length": 5}
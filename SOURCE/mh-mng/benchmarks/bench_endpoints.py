@@ -0,0 +1,584 @@
+# Copyright 2025 Intent Exchange, Inc.
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software
+# and associated documentation files (the “Software”), to deal in the Software without
+# restriction, including without limitation the rights to use, copy, modify, merge, publish,
+# distribute, sublicense, and/or sell copies of the Software, and to permit persons to whom the
+# Software is furnished to do so, subject to the following conditions:
+# The above copyright notice and this permission notice shall be included in all copies or
+# substantial portions of the Software.
+# THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR
+# OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE,
+# ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+# OTHER DEALINGS IN THE SOFTWARE.
+
+
+"""API のエンドポイント別ベンチマーク
+
+MySQL の代わりに SQLite のファイルDBで Flask の app を起動し、バンニング・デバンニング計画の
+テストデータを登録した後、mh_api の全ルートに並列でリクエストを送る。
+エンドポイントごとのスループットと p50/p95/p99 の応答時間を JSON で出力する。
+ネットワークは使用せず、リクエストは Flask のテストクライアントで送る。
+--asgi を指定した場合は、非同期サーバー(asgi.py)で処理する計画の読み込みAPIのみを、
+httpx の ASGITransport から asyncio のタスクで並列に送る（starlette, httpx 等が必要）。
+
+    python bench_endpoints.py [--plans 20000] [--clients 8] [--requests 500] [--asgi]
+"""
+
+import sys
+import os
+import re
+import json
+import asyncio
+import time
+import random
+import logging
+import sqlite3
+import argparse
+import datetime
+import platform
+import tempfile
+import itertools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+APP_DIR = os.path.join(os.path.dirname(__file__), "..", "app")
+API_PREFIX = "/mhapi/v1"
+PLAN_TYPES = ("vanning_plan", "devanning_plan")
+# 計画索引(PLAN_INDEX_ENABLED)は直近の計画のみ保持するため、当日からの計画を登録する
+BASE_DATE = datetime.datetime.combine(datetime.date.today(), datetime.time())
+# 計画に割り当てるトラクター・トレーラーの台数
+EQUIPMENT_COUNT = 200
+# mh_api のうち、計測対象外とするルート（Swagger）
+EXCLUDE_ENDPOINTS = ("mh_api.specs", "mh_api.doc", "mh_api.root")
+# mh_api のうち、計測対象外とするルート（SSE は接続を保持し続けるため）
+EXCLUDE_RULES = (f"{API_PREFIX}/plan_event/<string:mh>/_stream",)
+
+
+def setup_app(db_uri, log_file):
+    """環境変数でDBとログの出力先を差し替えてから app を読み込む"""
+    os.environ["MHMNG_DB_URI"] = db_uri
+    os.environ["MHMNG_LOGFILE"] = log_file
+    os.environ.setdefault("LOGLEVEL", "WARNING")
+    sys.path.append(APP_DIR)
+    from flask.logging import default_handler
+    from app import app
+
+    # スロークエリ等のログはログファイルのみに出力し、結果の出力に混ぜない
+    default_handler.setLevel(logging.CRITICAL)
+    return app
+
+
+class Workload:
+    """登録したテストデータと、各エンドポイントへのリクエストの作成"""
+
+    def __init__(self, plans, hubs, days, requests, seed):
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+        self.hubs = [f"99300000{i:05d}" for i in range(hubs)]
+        self.days = days
+        self.counter = itertools.count()
+        # hub ごとの登録済み trsp_instruction_id
+        self.plans = {hub: [] for hub in self.hubs}
+        for i in range(plans):
+            self.plans[self.hubs[i % hubs]].append(f"bench-{i:010d}")
+        # 削除のリクエストで使用する計画（リクエスト数分）
+        self.deletable = {
+            plan_type: [
+                (self.hubs[i % hubs], f"bench-del-{i:06d}") for i in range(requests)
+            ]
+            for plan_type in PLAN_TYPES
+        }
+        self.deletable_iter = {
+            plan_type: iter(rows) for plan_type, rows in self.deletable.items()
+        }
+
+    def tractor_giai(self, n):
+        return f"80049900000010000000000000{n:08d}"
+
+    def trailer_giai(self, n):
+        return f"80049910000010000000000000{n:08d}"
+
+    def plan_body(self, rng, day=None):
+        if day is None:
+            day = rng.randrange(self.days)
+        start = BASE_DATE + datetime.timedelta(
+            days=day, minutes=rng.randrange(24 * 60 - 60)
+        )
+        return {
+            "mh_space_list": [str(n) for n in range(rng.randrange(1, 4))],
+            "shipper_cid": "990000001",
+            "recipient_cid": "991000001",
+            "carrier_cid": "992000001",
+            "tractor_giai": self.tractor_giai(rng.randrange(EQUIPMENT_COUNT)),
+            "trailer_giai_list": [self.trailer_giai(rng.randrange(EQUIPMENT_COUNT))],
+            "req_from_time": start.isoformat(),
+            "req_to_time": (start + datetime.timedelta(minutes=30)).isoformat(),
+            "status": rng.choice([0, 1, 2]),
+            "is_bl_need": 0,
+            "is_departure_mh": 1,
+        }
+
+    def seed(self, app):
+        from database import db
+        from com.plan_store import plan_item_schema, plan_row_from_body, upsert_plans
+        from model.vanning_plan import VanningPlanModel, VanningPlanModelSchema
+        from model.devanning_plan import DevanningPlanModel, DevanningPlanModelSchema
+
+        rng = random.Random(0)
+        dt = datetime.datetime.now()
+        with app.app_context():
+            for model, schema_class in (
+                (VanningPlanModel, VanningPlanModelSchema),
+                (DevanningPlanModel, DevanningPlanModelSchema),
+            ):
+                schema = plan_item_schema(schema_class)
+                rows = []
+                for hub, tids in self.plans.items():
+                    for i, tid in enumerate(tids):
+                        body = self.plan_body(rng, day=i % self.days)
+                        body["trsp_instruction_id"] = tid
+                        rows.append(plan_row_from_body(schema, hub, body, dt))
+                for hub, tid in self.deletable[model.__tablename__]:
+                    body = self.plan_body(rng)
+                    body["trsp_instruction_id"] = tid
+                    rows.append(plan_row_from_body(schema, hub, body, dt))
+                upsert_plans(model, rows, 500)
+            db.session.commit()
+        # 差分同期は、登録後の変更のみを返すカーソルから取得する
+        from com.plan_changes import encode_change_cursor
+
+        self.changes_cursor = encode_change_cursor((datetime.datetime.now(), -1, 0))
+
+    def random_plan(self):
+        with self.lock:
+            hub = self.rng.choice(self.hubs)
+            return hub, self.rng.choice(self.plans[hub])
+
+    def random_date(self):
+        with self.lock:
+            day = BASE_DATE + datetime.timedelta(days=self.rng.randrange(self.days))
+        return day.strftime("%Y%m%d")
+
+    def scenarios(self):
+        """(メソッド, ルート, 種別, リクエスト作成関数) の一覧"""
+        scenarios = []
+        for plan_type in PLAN_TYPES:
+            plan_rule = (
+                f"{API_PREFIX}/{plan_type}/<string:mh>/<string:trsp_instruction_id>"
+            )
+            list_rule = f"{API_PREFIX}/{plan_type}/<string:mh>"
+            bulk_rule = f"{API_PREFIX}/{plan_type}/<string:mh>/_bulk"
+            scenarios += [
+                ("GET", plan_rule, "", self.get_plan(plan_type)),
+                ("PUT", plan_rule, "", self.put_plan(plan_type)),
+                ("POST", plan_rule, "", self.post_plan(plan_type)),
+                ("DELETE", plan_rule, "", self.delete_plan(plan_type)),
+                ("GET", list_rule, "", self.list_plans(plan_type)),
+                ("GET", list_rule, "ndjson", self.list_plans(plan_type, ndjson=True)),
+                ("POST", bulk_rule, "", self.bulk_plans(plan_type)),
+            ]
+        scenarios += [
+            ("GET", f"{API_PREFIX}/plan_search/", "", self.search_plan()),
+            ("POST", f"{API_PREFIX}/plan_search/_batch", "", self.search_plan_batch()),
+            (
+                "GET",
+                f"{API_PREFIX}/plan_space/<string:mh>/<string:space>",
+                "",
+                self.list_space_plans(),
+            ),
+            (
+                "GET",
+                f"{API_PREFIX}/plan_space/<string:mh>/_occupancy",
+                "",
+                self.space_occupancy(),
+            ),
+            (
+                "GET",
+                f"{API_PREFIX}/plan_equipment/<string:giai>",
+                "",
+                self.list_equipment_plans(),
+            ),
+            (
+                "GET",
+                f"{API_PREFIX}/plan_event/<string:mh>",
+                "",
+                self.list_plan_events(),
+            ),
+            (
+                "GET",
+                f"{API_PREFIX}/plan_changes/<string:mh>",
+                "",
+                self.list_plan_changes(),
+            ),
+        ]
+        return scenarios
+
+    def get_plan(self, plan_type):
+        def request():
+            hub, tid = self.random_plan()
+            return {"path": f"{API_PREFIX}/{plan_type}/{hub}/{tid}"}
+
+        return request
+
+    def put_plan(self, plan_type):
+        def request():
+            hub, tid = self.random_plan()
+            with self.lock:
+                status = self.rng.choice([0, 1, 2])
+            return {
+                "path": f"{API_PREFIX}/{plan_type}/{hub}/{tid}",
+                "json": {"status": status},
+            }
+
+        return request
+
+    def post_plan(self, plan_type):
+        def request():
+            with self.lock:
+                hub = self.rng.choice(self.hubs)
+                body = self.plan_body(self.rng)
+            tid = f"bench-post-{next(self.counter):010d}"
+            return {"path": f"{API_PREFIX}/{plan_type}/{hub}/{tid}", "json": body}
+
+        return request
+
+    def delete_plan(self, plan_type):
+        def request():
+            with self.lock:
+                hub, tid = next(self.deletable_iter[plan_type])
+            return {"path": f"{API_PREFIX}/{plan_type}/{hub}/{tid}"}
+
+        return request
+
+    def list_plans(self, plan_type, ndjson=False):
+        def request():
+            with self.lock:
+                hub = self.rng.choice(self.hubs)
+            kwargs = {
+                "path": f"{API_PREFIX}/{plan_type}/{hub}",
+                "query_string": {"date": self.random_date()},
+            }
+            if ndjson:
+                kwargs["headers"] = {"Accept": "application/x-ndjson"}
+            return kwargs
+
+        return request
+
+    def bulk_plans(self, plan_type, size=50):
+        def request():
+            with self.lock:
+                hub = self.rng.choice(self.hubs)
+                tids = self.rng.sample(
+                    self.plans[hub], min(size, len(self.plans[hub]))
+                )
+                plans = []
+                for tid in tids:
+                    body = self.plan_body(self.rng)
+                    body["trsp_instruction_id"] = tid
+                    plans.append(body)
+            return {
+                "path": f"{API_PREFIX}/{plan_type}/{hub}/_bulk",
+                "json": plans,
+            }
+
+        return request
+
+    def search_plan(self):
+        def request():
+            _, tid = self.random_plan()
+            with self.lock:
+                is_vanning = self.rng.choice([0, 1])
+            return {
+                "path": f"{API_PREFIX}/plan_search/",
+                "query_string": {
+                    "trsp_instruction_id": tid,
+                    "is_departure_mh": 1,
+                    "is_vanning": is_vanning,
+                },
+            }
+
+        return request
+
+
+    def search_plan_batch(self, size=100):
+        def request():
+            tids = [self.random_plan()[1] for _ in range(size)]
+            return {
+                "path": f"{API_PREFIX}/plan_search/_batch",
+                "json": {"trsp_instruction_ids": tids},
+            }
+
+        return request
+
+    def list_space_plans(self):
+        def request():
+            with self.lock:
+                hub = self.rng.choice(self.hubs)
+                space = str(self.rng.randrange(3))
+            return {
+                "path": f"{API_PREFIX}/plan_space/{hub}/{space}",
+                "query_string": {"date": self.random_date()},
+            }
+
+        return request
+
+    def list_equipment_plans(self):
+        def request():
+            with self.lock:
+                n = self.rng.randrange(EQUIPMENT_COUNT)
+                giai = self.rng.choice([self.tractor_giai(n), self.trailer_giai(n)])
+            return {"path": f"{API_PREFIX}/plan_equipment/{giai}"}
+
+        return request
+
+    def list_plan_events(self):
+        def request():
+            with self.lock:
+                hub = self.rng.choice(self.hubs)
+            return {
+                "path": f"{API_PREFIX}/plan_event/{hub}",
+                "query_string": {"since": 0},
+            }
+
+        return request
+
+    def list_plan_changes(self):
+        def request():
+            with self.lock:
+                hub = self.rng.choice(self.hubs)
+            return {
+                "path": f"{API_PREFIX}/plan_changes/{hub}",
+                "query_string": {"since": self.changes_cursor},
+            }
+
+        return request
+
+    def space_occupancy(self):
+        def request():
+            with self.lock:
+                hub = self.rng.choice(self.hubs)
+            return {
+                "path": f"{API_PREFIX}/plan_space/{hub}/_occupancy",
+                "query_string": {"date": self.random_date()},
+            }
+
+        return request
+
+
+def uncovered_routes(app, scenarios):
+    """ベンチマークのシナリオが無い mh_api のルートを返す"""
+    covered = {(rule, method) for method, rule, _, _ in scenarios}
+    routes = []
+    for rule in app.url_map.iter_rules():
+        if not rule.endpoint.startswith("mh_api."):
+            continue
+        if rule.endpoint in EXCLUDE_ENDPOINTS or rule.rule in EXCLUDE_RULES:
+            continue
+        for method in sorted(rule.methods - {"HEAD", "OPTIONS"}):
+            if (rule.rule, method) not in covered:
+                routes.append(f"{method} {rule.rule}")
+    return routes
+
+
+def percentile(sorted_values, ratio):
+    if not sorted_values:
+        return None
+    index = min(int(round(ratio * (len(sorted_values) - 1))), len(sorted_values) - 1)
+    return sorted_values[index]
+
+
+def scenario_label(method, rule, variant):
+    return f"{method} {rule}" + (f" ({variant})" if variant else "")
+
+
+def asgi_routes():
+    """非同期サーバーで処理するルートを、Flask のルートの形式で返す"""
+    from mh_asgi import mh_asgi_routes
+
+    return {
+        (method, re.sub(r"\{(\w+)\}", r"<string:\1>", route.path))
+        for route in mh_asgi_routes
+        for method in route.methods - {"HEAD"}
+    }
+
+
+def run_scenario(app, label, method, make_request, clients, requests, warmup):
+    local = threading.local()
+
+    def send():
+        client = getattr(local, "client", None)
+        if client is None:
+            client = local.client = app.test_client()
+        kwargs = make_request()
+        start = time.perf_counter()
+        response = client.open(method=method, **kwargs)
+        response.get_data()
+        elapsed = time.perf_counter() - start
+        ok = response.status_code < 400 and b'"result":false' not in response.data
+        return elapsed, ok
+
+    with ThreadPoolExecutor(max_workers=clients) as executor:
+        list(executor.map(lambda _: send(), range(warmup)))
+        start = time.perf_counter()
+        results = list(executor.map(lambda _: send(), range(requests)))
+        wall = time.perf_counter() - start
+    return scenario_result(label, clients, results, wall)
+
+
+def run_asgi_scenario(label, method, make_request, clients, requests, warmup):
+    """非同期サーバーに clients 個のタスクから並列にリクエストを送る"""
+    import httpx
+    from asgi import app as asgi_app
+    from com.async_db import async_engine
+
+    async def run():
+        try:
+            return await send_requests()
+        finally:
+            # 接続待ちのキューがイベントループに結び付くため、ループごとにプールを作り直す
+            await async_engine.dispose()
+
+    async def send_requests():
+        transport = httpx.ASGITransport(app=asgi_app)
+        semaphore = asyncio.Semaphore(clients)
+        async with httpx.AsyncClient(
+            transport=transport, base_url="http://bench"
+        ) as client:
+
+            async def send():
+                kwargs = make_request()
+                async with semaphore:
+                    start = time.perf_counter()
+                    response = await client.request(
+                        method,
+                        kwargs["path"],
+                        params=kwargs.get("query_string"),
+                        headers=kwargs.get("headers"),
+                        json=kwargs.get("json"),
+                    )
+                    elapsed = time.perf_counter() - start
+                ok = (
+                    response.status_code < 400
+                    and b'"result":false' not in response.content
+                )
+                return elapsed, ok
+
+            await asyncio.gather(*(send() for _ in range(warmup)))
+            start = time.perf_counter()
+            results = await asyncio.gather(*(send() for _ in range(requests)))
+            return results, time.perf_counter() - start
+
+    results, wall = asyncio.run(run())
+    return scenario_result(label, clients, results, wall)
+
+
+def scenario_result(label, clients, results, wall):
+    latencies = sorted(elapsed for elapsed, _ in results)
+    errors = sum(1 for _, ok in results if not ok)
+
+    def ms(value):
+        return None if value is None else round(value * 1000, 3)
+
+    return {
+        "endpoint": label,
+        "clients": clients,
+        "requests": len(results),
+        "errors": errors,
+        "throughput_rps": round(len(results) / wall, 1) if wall else None,
+        "mean_ms": ms(sum(latencies) / len(latencies)) if latencies else None,
+        "p50_ms": ms(percentile(latencies, 0.50)),
+        "p95_ms": ms(percentile(latencies, 0.95)),
+        "p99_ms": ms(percentile(latencies, 0.99)),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--plans", type=int, default=20000, help="計画の種類ごとの登録件数"
+    )
+    parser.add_argument("--hubs", type=int, default=20)
+    parser.add_argument("--days", type=int, default=7)
+    parser.add_argument(
+        "--clients", type=int, default=8, help="並列のクライアント数"
+    )
+    parser.add_argument(
+        "--requests", type=int, default=500, help="エンドポイントごとのリクエスト数"
+    )
+    parser.add_argument("--warmup", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--db", help="SQLite のファイル（省略時は一時ディレクトリに作成）"
+    )
+    parser.add_argument(
+        "--only", help="ラベルにこの文字列を含むエンドポイントのみ計測する"
+    )
+    parser.add_argument(
+        "--asgi",
+        action="store_true",
+        help="非同期サーバー(asgi.py)で処理するエンドポイントを非同期で計測する",
+    )
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="mhmng-bench-")
+    db_path = args.db or os.path.join(workdir, "bench.db")
+    app = setup_app(
+        f"sqlite:///{os.path.abspath(db_path)}", os.path.join(workdir, "bench.log")
+    )
+    workload = Workload(
+        args.plans, args.hubs, args.days, args.requests + args.warmup, args.seed
+    )
+    start = time.perf_counter()
+    workload.seed(app)
+    seed_sec = time.perf_counter() - start
+
+    scenarios = workload.scenarios()
+    for route in uncovered_routes(app, scenarios):
+        print(f"warning: no benchmark scenario for {route}", file=sys.stderr)
+    print(
+        json.dumps(
+            {
+                "meta": {
+                    "plans": args.plans,
+                    "hubs": args.hubs,
+                    "days": args.days,
+                    "clients": args.clients,
+                    "requests": args.requests,
+                    "seed_sec": round(seed_sec, 3),
+                    "python": platform.python_version(),
+                    "sqlite": sqlite3.sqlite_version,
+                    "db": db_path,
+                }
+            }
+        ),
+        flush=True,
+    )
+    if args.asgi:
+        routes = asgi_routes()
+        scenarios = [scenario for scenario in scenarios if scenario[:2] in routes]
+    for method, rule, variant, make_request in scenarios:
+        label = scenario_label(method, rule, variant)
+        if args.only and args.only not in label:
+            continue
+        if args.asgi:
+            result = run_asgi_scenario(
+                label, method, make_request, args.clients, args.requests, args.warmup
+            )
+        else:
+            result = run_scenario(
+                app,
+                label,
+                method,
+                make_request,
+                args.clients,
+                args.requests,
+                args.warmup,
+            )
+        print(json.dumps(result), flush=True)
+
+
+if __name__ == "__main__":
+    main()
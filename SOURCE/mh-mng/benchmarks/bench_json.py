@@ -0,0 +1,94 @@
+# Copyright 2025 Intent Exchange, Inc.
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software
+# and associated documentation files (the “Software”), to deal in the Software without
+# restriction, including without limitation the rights to use, copy, modify, merge, publish,
+# distribute, sublicense, and/or sell copies of the Software, and to permit persons to whom the
+# Software is furnished to do so, subject to the following conditions:
+# The above copyright notice and this permission notice shall be included in all copies or
+# substantial portions of the Software.
+# THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR
+# OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE,
+# ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+# OTHER DEALINGS IN THE SOFTWARE.
+
+
+"""計画一覧レスポンスの JSON エンコードのベンチマーク
+
+バンニング計画一覧のレスポンス（1k件・10k件）について、flask-restx 標準の
+output_json と com.json_encoder.output_json（orjson が無い場合は標準の json）の
+結果が同じ JSON になることを確認し、処理時間を JSON で出力する。
+
+    python bench_json.py [--sizes 1000 10000] [--repeat 5] [--debug]
+"""
+
+import sys
+import os
+import json
+import time
+import argparse
+from flask import Flask
+from flask_restx.representations import output_json as restx_output_json
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "app"))
+from com.helper import compile_schema_serializer
+from com.json_encoder import JSON_ENCODER, output_json
+from model.vanning_plan import VanningPlanModel, VanningPlanModelSchema
+from bench_serializer import EXCLUDE_FIELDS, best_time, make_plans
+
+
+def run(sizes, repeat, debug):
+    app = Flask(__name__)
+    app.debug = debug
+    serialize = compile_schema_serializer(
+        VanningPlanModelSchema, exclude_fields=EXCLUDE_FIELDS
+    )
+    results = []
+    with app.app_context():
+        for size in sizes:
+            data = {
+                "vanning_plan_list": [
+                    serialize(plan) for plan in make_plans(VanningPlanModel, size)
+                ],
+                "next_cursor": None,
+                "result": True,
+                "error_msg": "",
+            }
+
+            def baseline():
+                return restx_output_json(data, 200).get_data()
+
+            def encoder():
+                return output_json(data, 200).get_data()
+
+            if json.loads(baseline()) != json.loads(encoder()):
+                raise AssertionError(f"response body differs at {size} rows")
+            baseline_sec = best_time(baseline, repeat)
+            encoder_sec = best_time(encoder, repeat)
+            results.append(
+                {
+                    "encoder": JSON_ENCODER,
+                    "debug": debug,
+                    "rows": size,
+                    "parity": True,
+                    "bytes": len(encoder()),
+                    "restx_sec": round(baseline_sec, 6),
+                    "encoder_sec": round(encoder_sec, 6),
+                    "speedup": round(baseline_sec / encoder_sec, 2),
+                }
+            )
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument(
+        "--debug", action="store_true", help="flask-restx の整形出力を有効にする"
+    )
+    args = parser.parse_args()
+    for result in run(args.sizes, args.repeat, args.debug):
+        print(json.dumps(result))
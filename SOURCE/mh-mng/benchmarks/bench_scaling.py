@@ -0,0 +1,309 @@
+# Copyright 2025 Intent Exchange, Inc.
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software
+# and associated documentation files (the “Software”), to deal in the Software without
+# restriction, including without limitation the rights to use, copy, modify, merge, publish,
+# distribute, sublicense, and/or sell copies of the Software, and to permit persons to whom the
+# Software is furnished to do so, subject to the following conditions:
+# The above copyright notice and this permission notice shall be included in all copies or
+# substantial portions of the Software.
+# THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR
+# OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE,
+# ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+# OTHER DEALINGS IN THE SOFTWARE.
+
+
+"""計画テーブルの件数と検索時間のベンチマーク
+
+vanning_plan テーブルを 10k・100k・1M・10M 件と段階的に増やしながら、各件数で
+API と同じ検索の応答時間を計測し、実行計画（EXPLAIN）を JSON で出力する。
+実行計画がテーブルの全件走査になった検索は "full_scan": true となる。
+--check を指定した場合は、全件走査になった検索や、EXPECTED_INDEXES の索引を
+使用しない検索があれば、終了コード1で終了する。
+
+計測する検索
+  point    : (mh, trsp_instruction_id) の1件取得（計画詳細取得）
+  search   : (trsp_instruction_id, is_departure_mh) の1件取得（plan_search）
+  search_batch : trsp_instruction_id 100件の IN 検索（plan_search/_batch）
+  hub_day  : MH・1日分の一覧（計画一覧）
+  hub_meta : MH・1日分の件数と最終更新日時（計画一覧の ETag）
+
+既定では一時ディレクトリの SQLite を使用する。--db-uri で MySQL 等を指定する場合は、
+vanning_plan テーブルが空であること。10M 件の SQLite のファイルは数GBになる。
+
+    python bench_scaling.py [--sizes 10000 100000 1000000 10000000] [--queries 200]
+    python bench_scaling.py --sizes 10000 --check
+"""
+
+import sys
+import os
+import re
+import json
+import time
+import random
+import argparse
+import datetime
+import tempfile
+from sqlalchemy import event, func, insert
+
+from bench_endpoints import percentile, setup_app
+
+HUB_PLANS_PER_DAY = 20
+BASE_DATE = datetime.datetime(2024, 1, 1)
+INSERT_CHUNK_SIZE = 10000
+SEARCH_BATCH_SIZE = 100
+# 検索ごとに使用されるべき索引（{table} はテーブル名）
+EXPECTED_INDEXES = {
+    "search": "idx_{table}_trsp_instruction_id_is_departure_mh",
+    "search_batch": "idx_{table}_trsp_instruction_id_is_departure_mh",
+    "hub_day": "idx_{table}_mh_req_start_time",
+    "hub_meta": "idx_{table}_mh_req_start_time",
+}
+
+
+class PlanTable:
+    """計画を1件目から順に生成する。テーブルは日付順に（運用期間の経過と同様に）増える"""
+
+    def __init__(self, model, hubs):
+        self.model = model
+        self.hubs = [f"99300000{i:05d}" for i in range(hubs)]
+        self.rows = 0
+
+    def hub_of(self, index):
+        return self.hubs[index % len(self.hubs)]
+
+    def day_of(self, index):
+        return index // (len(self.hubs) * HUB_PLANS_PER_DAY)
+
+    def make_row(self, index, rng, dt):
+        start = BASE_DATE + datetime.timedelta(
+            days=self.day_of(index), minutes=rng.randrange(24 * 60 - 60)
+        )
+        return {
+            "mh": self.hub_of(index),
+            "mh_space_list_str": "1,2",
+            "shipper_cid": "990000001",
+            "recipient_cid": "991000001",
+            "carrier_cid": "992000001",
+            "trsp_instruction_id": f"{index:020d}",
+            "tractor_giai": "8004990000001000000000000000000001",
+            "trailer_giai_list_str": "8004991000001000000000000000000001",
+            "req_from_time": start,
+            "req_to_time": start + datetime.timedelta(minutes=30),
+            "actual_time": None,
+            "status": rng.choice([0, 1, 2]),
+            "is_bl_need": 0,
+            "is_departure_mh": index % 2,
+            "created_at": dt,
+            "updated_at": dt,
+        }
+
+    def grow(self, session, size):
+        rng = random.Random(self.rows)
+        dt = datetime.datetime.now()
+        statement = insert(self.model.__table__)
+        while self.rows < size:
+            end = min(self.rows + INSERT_CHUNK_SIZE, size)
+            session.execute(
+                statement, [self.make_row(i, rng, dt) for i in range(self.rows, end)]
+            )
+            session.commit()
+            self.rows = end
+
+    def random_index(self, rng):
+        return rng.randrange(self.rows)
+
+
+def query_shapes(db, model, table):
+    """(名前, 検索の実行関数) の一覧。実行関数は乱数から対象を選んで検索する"""
+    from com.plan_query import plan_overlap_filter, plan_page_query, plan_search_batch
+
+    def point(rng):
+        index = table.random_index(rng)
+        return (
+            db.session.query(model)
+            .filter(
+                model.mh == table.hub_of(index),
+                model.trsp_instruction_id == f"{index:020d}",
+            )
+            .first()
+        )
+
+    def search(rng):
+        index = table.random_index(rng)
+        return (
+            db.session.query(model)
+            .filter(
+                model.is_departure_mh == index % 2,
+                model.trsp_instruction_id == f"{index:020d}",
+            )
+            .order_by(model.id)
+            .first()
+        )
+
+    def search_batch(rng):
+        indexes = [table.random_index(rng) for _ in range(SEARCH_BATCH_SIZE)]
+        return plan_search_batch(
+            model, [f"{index:020d}" for index in indexes], [1, 0]
+        )
+
+    def hub_day_filter(rng):
+        index = table.random_index(rng)
+        range_from = BASE_DATE + datetime.timedelta(days=table.day_of(index))
+        range_to = range_from + datetime.timedelta(days=1)
+        return plan_overlap_filter(model, table.hub_of(index), range_from, range_to)
+
+    def hub_day(rng):
+        query = db.session.query(model).filter(*hub_day_filter(rng))
+        return plan_page_query(query, model, {})
+
+    def hub_meta(rng):
+        return (
+            db.session.query(func.count(model.id), func.max(model.updated_at))
+            .filter(*hub_day_filter(rng))
+            .one()
+        )
+
+    return [
+        ("point", point),
+        ("search", search),
+        ("search_batch", search_batch),
+        ("hub_day", hub_day),
+        ("hub_meta", hub_meta),
+    ]
+
+
+def capture_statement(engine, run):
+    """run の実行で最後に発行したSQLとパラメータを返す"""
+    captured = {}
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, many):
+        captured["statement"] = statement
+        captured["parameters"] = parameters
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        run()
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+    return captured["statement"], captured["parameters"]
+
+
+def explain(engine, statement, parameters, table_name):
+    """実行計画と、テーブルを全件走査するか、使用する索引の名前を返す"""
+    dialect = engine.dialect.name
+    prefix = "EXPLAIN QUERY PLAN " if dialect == "sqlite" else "EXPLAIN "
+    with engine.connect() as conn:
+        rows = [
+            dict(row._mapping)
+            for row in conn.exec_driver_sql(prefix + statement, parameters)
+        ]
+    if dialect == "sqlite":
+        plan = [row["detail"] for row in rows]
+        full_scan = any(
+            re.match(rf"SCAN {table_name}\b(?! USING)", detail) for detail in plan
+        )
+        indexes = [
+            match.group(1)
+            for detail in plan
+            if (match := re.search(r"USING (?:COVERING )?INDEX (\S+)", detail))
+        ]
+    else:
+        plan = rows
+        full_scan = any(row.get("type") == "ALL" for row in rows)
+        indexes = [row["key"] for row in rows if row.get("key")]
+    return plan, full_scan, indexes
+
+
+def measure(db, run, queries, seed):
+    rng = random.Random(seed)
+    latencies = []
+    for _ in range(queries):
+        start = time.perf_counter()
+        run(rng)
+        latencies.append(time.perf_counter() - start)
+        db.session.expunge_all()
+    latencies.sort()
+    return latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--sizes", type=int, nargs="+", default=[10000, 100000, 1000000, 10000000]
+    )
+    parser.add_argument("--hubs", type=int, default=1000, help="MHの数")
+    parser.add_argument(
+        "--queries", type=int, default=200, help="件数・検索ごとの計測回数"
+    )
+    parser.add_argument(
+        "--db-uri", help="計測するDB（省略時は一時ディレクトリの SQLite）"
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--check", action="store_true", help="索引を使用しない検索があればエラーとする"
+    )
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="mhmng-bench-")
+    db_uri = args.db_uri or f"sqlite:///{os.path.join(workdir, 'scaling.db')}"
+    app = setup_app(db_uri, os.path.join(workdir, "bench.log"))
+    from database import db
+    from model.vanning_plan import VanningPlanModel
+
+    table_name = VanningPlanModel.__tablename__
+    table = PlanTable(VanningPlanModel, args.hubs)
+    failures = []
+    with app.app_context():
+        engine = db.engine
+        if db.session.query(VanningPlanModel.id).first() is not None:
+            sys.exit("vanning_plan must be empty")
+        shapes = query_shapes(db, VanningPlanModel, table)
+        for size in sorted(args.sizes):
+            start = time.perf_counter()
+            table.grow(db.session, size)
+            load_sec = time.perf_counter() - start
+            for name, run in shapes:
+                rng = random.Random(args.seed)
+                statement, parameters = capture_statement(engine, lambda: run(rng))
+                plan, full_scan, indexes = explain(
+                    engine, statement, parameters, table_name
+                )
+                expected_index = EXPECTED_INDEXES.get(name, "").format(table=table_name)
+                if full_scan or (expected_index and expected_index not in indexes):
+                    failures.append(
+                        f"{name} at {size} rows: expected index "
+                        f"{expected_index or '(any)'}, plan {plan}"
+                    )
+                latencies = measure(db, run, args.queries, args.seed)
+                print(
+                    json.dumps(
+                        {
+                            "rows": size,
+                            "query": name,
+                            "queries": len(latencies),
+                            "mean_ms": round(
+                                sum(latencies) / len(latencies) * 1000, 3
+                            ),
+                            "p50_ms": round(percentile(latencies, 0.50) * 1000, 3),
+                            "p95_ms": round(percentile(latencies, 0.95) * 1000, 3),
+                            "p99_ms": round(percentile(latencies, 0.99) * 1000, 3),
+                            "full_scan": full_scan,
+                            "indexes": indexes,
+                            "plan": plan,
+                            "load_sec": round(load_sec, 3),
+                        },
+                        default=str,
+                    ),
+                    flush=True,
+                )
+    if args.check and failures:
+        for failure in failures:
+            print(f"check failed: {failure}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
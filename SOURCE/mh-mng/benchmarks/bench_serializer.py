@@ -0,0 +1,138 @@
+# Copyright 2025 Intent Exchange, Inc.
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software
+# and associated documentation files (the “Software”), to deal in the Software without
+# restriction, including without limitation the rights to use, copy, modify, merge, publish,
+# distribute, sublicense, and/or sell copies of the Software, and to permit persons to whom the
+# Software is furnished to do so, subject to the following conditions:
+# The above copyright notice and this permission notice shall be included in all copies or
+# substantial portions of the Software.
+# THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR
+# OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE,
+# ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+# OTHER DEALINGS IN THE SOFTWARE.
+
+"""計画一覧のシリアライズのベンチマーク
+
+marshmallow の dump + flask-restx の marshal（従来の処理）と、
+compile_schema_serializer で生成したシリアライザの結果が一致することを確認し、
+1k件・10k件の一覧での処理時間を JSON で出力する。
+
+    python bench_serializer.py [--sizes 1000 10000] [--repeat 5]
+"""
+
+import sys
+import os
+import json
+import time
+import random
+import argparse
+import datetime
+from flask_restx import Namespace, marshal
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "app"))
+from com.helper import compile_schema_serializer, create_restx_model_usingSchema
+from model.vanning_plan import VanningPlanModel, VanningPlanModelSchema
+from model.devanning_plan import DevanningPlanModel, DevanningPlanModelSchema
+
+EXCLUDE_FIELDS = ["created_at", "updated_at"]
+
+
+def make_plans(model, size, seed=0):
+    rng = random.Random(seed)
+    base = datetime.datetime(2025, 1, 10)
+    plans = []
+    for i in range(size):
+        start = base + datetime.timedelta(minutes=rng.randrange(24 * 60))
+        plans.append(
+            model(
+                id=i + 1,
+                mh=f"99300000{rng.randrange(100):05d}",
+                mh_space_list_str=",".join(
+                    str(n) for n in range(rng.randrange(1, 4))
+                ),
+                shipper_cid="990000001",
+                recipient_cid=rng.choice([None, "991000001"]),
+                carrier_cid="992000001",
+                trsp_instruction_id=f"{i:020d}",
+                tractor_giai=rng.choice([None, "8004990000001000000000000000000001"]),
+                trailer_giai_list_str=rng.choice(
+                    ["", "8004991000001000000000000000000001"]
+                ),
+                req_from_time=start,
+                req_to_time=start + datetime.timedelta(minutes=30),
+                actual_time=rng.choice(
+                    [None, start + datetime.timedelta(seconds=1.5)]
+                ),
+                status=rng.choice([-1, 0, 1, 2]),
+                is_bl_need=0,
+                is_departure_mh=1,
+                created_at=base,
+                updated_at=base,
+            )
+        )
+    return plans
+
+
+def best_time(func, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def run(sizes, repeat):
+    namespace = Namespace("bench")
+    results = []
+    for name, model, schema_class in (
+        ("vanning_plan", VanningPlanModel, VanningPlanModelSchema),
+        ("devanning_plan", DevanningPlanModel, DevanningPlanModelSchema),
+    ):
+        restx_model = create_restx_model_usingSchema(
+            f"{name}_bench", namespace, schema_class, exclude_fields=EXCLUDE_FIELDS
+        )
+        schema = schema_class(many=True)
+        serialize = compile_schema_serializer(
+            schema_class, exclude_fields=EXCLUDE_FIELDS
+        )
+        for size in sizes:
+            plans = make_plans(model, size)
+
+            def baseline():
+                return marshal(schema.dump(plans), restx_model)
+
+            def compiled():
+                return [serialize(plan) for plan in plans]
+
+            expected = json.dumps(baseline())
+            actual = json.dumps(compiled())
+            if expected != actual:
+                raise AssertionError(
+                    f"{name}: serializer output differs at {size} rows"
+                )
+            baseline_sec = best_time(baseline, repeat)
+            compiled_sec = best_time(compiled, repeat)
+            results.append(
+                {
+                    "plan_type": name,
+                    "rows": size,
+                    "parity": True,
+                    "marshmallow_restx_sec": round(baseline_sec, 6),
+                    "compiled_sec": round(compiled_sec, 6),
+                    "speedup": round(baseline_sec / compiled_sec, 2),
+                }
+            )
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    for result in run(args.sizes, args.repeat):
+        print(json.dumps(result))
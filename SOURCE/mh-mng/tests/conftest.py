@@ -0,0 +1,85 @@
+# Copyright 2025 Intent Exchange, Inc.
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software
+# and associated documentation files (the “Software”), to deal in the Software without
+# restriction, including without limitation the rights to use, copy, modify, merge, publish,
+# distribute, sublicense, and/or sell copies of the Software, and to permit persons to whom the
+# Software is furnished to do so, subject to the following conditions:
+# The above copyright notice and this permission notice shall be included in all copies or
+# substantial portions of the Software.
+# THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR
+# OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE,
+# ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+# OTHER DEALINGS IN THE SOFTWARE.
+
+"""API のテストの共通設定
+
+MySQL の代わりに SQLite のファイルDBで Flask の app を起動し、テストごとに全テーブルを空にする。
+設定は ConfigIns の属性を monkeypatch で差し替える（pytest が必要）。
+
+    cd SOURCE/mh-mng && python -m pytest -q
+"""
+
+import sys
+import os
+import logging
+import tempfile
+import pytest
+
+APP_DIR = os.path.join(os.path.dirname(__file__), "..", "app")
+API_PREFIX = "/mhapi/v1"
+TEST_MH = "9930000000001"
+
+# app の読み込み前に、DBとログの出力先を差し替える
+TMP_DIR = tempfile.mkdtemp(prefix="mhmng-test-")
+os.environ["MHMNG_DB_URI"] = "sqlite:///" + os.path.join(TMP_DIR, "test.db")
+os.environ["MHMNG_LOGFILE"] = os.path.join(TMP_DIR, "debug.log")
+os.environ.setdefault("LOGLEVEL", "WARNING")
+sys.path.append(APP_DIR)
+
+from flask.logging import default_handler
+from app import app as flask_app
+from config import ConfigIns
+from database import db
+from com.cache import LRUCacheBackend, plan_cache
+
+default_handler.setLevel(logging.CRITICAL)
+
+
+@pytest.fixture
+def app():
+    """テストごとに全テーブルとキャッシュを空にする"""
+    with flask_app.app_context():
+        for table in reversed(db.metadata.sorted_tables):
+            db.session.execute(table.delete())
+        db.session.commit()
+    plan_cache.backend = LRUCacheBackend(
+        ConfigIns.PLAN_CACHE_MAX_ENTRIES, ConfigIns.PLAN_CACHE_TTL
+    )
+    yield flask_app
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+def plan_url(plan_type, mh=TEST_MH, trsp_instruction_id=None):
+    url = f"{API_PREFIX}/{plan_type}/{mh}"
+    if trsp_instruction_id is not None:
+        url += f"/{trsp_instruction_id}"
+    return url
+
+
+def plan_body(**values):
+    """計画登録(POST)のリクエスト"""
+    body = {
+        "mh_space_list": ["1"],
+        "req_from_time": "2025-01-10T10:00:00",
+        "req_to_time": "2025-01-10T11:00:00",
+        "status": 1,
+    }
+    body.update(values)
+    return body
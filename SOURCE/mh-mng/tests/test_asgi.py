@@ -0,0 +1,117 @@
+# Copyright 2025 Intent Exchange, Inc.
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software
+# and associated documentation files (the “Software”), to deal in the Software without
+# restriction, including without limitation the rights to use, copy, modify, merge, publish,
+# distribute, sublicense, and/or sell copies of the Software, and to permit persons to whom the
+# Software is furnished to do so, subject to the following conditions:
+# The above copyright notice and this permission notice shall be included in all copies or
+# substantial portions of the Software.
+# THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR
+# OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE,
+# ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+# OTHER DEALINGS IN THE SOFTWARE.
+
+
+import pytest
+from starlette.testclient import TestClient
+
+from conftest import API_PREFIX, plan_body, plan_url
+from asgi import app as asgi_app
+
+# 非同期サーバー(asgi.py)の計画の読み込みAPIのテスト
+# 同じDBに対して、Flask(mh_api)と同じレスポンスを返すことを確認する
+
+PLAN_TYPES = ("vanning_plan", "devanning_plan")
+
+
+@pytest.fixture
+def asgi_client(app):
+    with TestClient(asgi_app) as client:
+        yield client
+
+
+def add_plans(client, plan_type):
+    for i, hour in enumerate((12, 10, 11)):
+        client.post(
+            plan_url(plan_type, trsp_instruction_id=f"T{i}"),
+            json=plan_body(
+                req_from_time=f"2025-01-10T{hour}:00:00",
+                req_to_time=f"2025-01-10T{hour}:30:00",
+                trailer_giai_list=["G1"],
+                is_departure_mh=1,
+            ),
+        )
+
+
+@pytest.mark.parametrize("plan_type", PLAN_TYPES)
+def test_list_matches_flask(client, asgi_client, plan_type):
+    add_plans(client, plan_type)
+    query_string = {"date": "20250110", "limit": 2}
+    while True:
+        flask_res = client.get(plan_url(plan_type), query_string=query_string)
+        asgi_res = asgi_client.get(plan_url(plan_type), params=query_string)
+        assert asgi_res.status_code == flask_res.status_code == 200
+        assert asgi_res.json() == flask_res.get_json()
+        assert asgi_res.headers["ETag"] == flask_res.headers["ETag"]
+        next_cursor = asgi_res.json()["next_cursor"]
+        if not next_cursor:
+            break
+        query_string["cursor"] = next_cursor
+
+
+@pytest.mark.parametrize("plan_type", PLAN_TYPES)
+def test_list_etag(client, asgi_client, plan_type):
+    add_plans(client, plan_type)
+    query_string = {"date": "20250110"}
+    etag = client.get(plan_url(plan_type), query_string=query_string).headers["ETag"]
+    res = asgi_client.get(
+        plan_url(plan_type), params=query_string, headers={"If-None-Match": etag}
+    )
+    assert res.status_code == 304
+    assert res.headers["ETag"] == etag
+    # 更新後は新しい一覧を返す
+    client.put(plan_url(plan_type, trsp_instruction_id="T0"), json={"status": 2})
+    res = asgi_client.get(
+        plan_url(plan_type), params=query_string, headers={"If-None-Match": etag}
+    )
+    assert res.status_code == 200
+    assert res.headers["ETag"] != etag
+    assert res.json() == client.get(
+        plan_url(plan_type), query_string=query_string
+    ).get_json()
+
+
+@pytest.mark.parametrize("plan_type", PLAN_TYPES)
+def test_detail_matches_flask(client, asgi_client, plan_type):
+    add_plans(client, plan_type)
+    for trsp_instruction_id in ("T0", "missing"):
+        url = plan_url(plan_type, trsp_instruction_id=trsp_instruction_id)
+        flask_res = client.get(url)
+        asgi_res = asgi_client.get(url)
+        assert asgi_res.status_code == flask_res.status_code
+        assert asgi_res.json() == flask_res.get_json()
+        assert asgi_res.headers.get("ETag") == flask_res.headers.get("ETag")
+    url = plan_url(plan_type, trsp_instruction_id="T0")
+    etag = client.get(url).headers["ETag"]
+    assert asgi_client.get(url, headers={"If-None-Match": etag}).status_code == 304
+
+
+def test_plan_search_matches_flask(client, asgi_client):
+    add_plans(client, "vanning_plan")
+    query_string = {"trsp_instruction_id": "T1", "is_departure_mh": 1, "is_vanning": 1}
+    flask_res = client.get(f"{API_PREFIX}/plan_search/", query_string=query_string)
+    asgi_res = asgi_client.get(f"{API_PREFIX}/plan_search/", params=query_string)
+    assert asgi_res.status_code == flask_res.status_code == 200
+    assert asgi_res.json() == flask_res.get_json()
+    assert asgi_res.headers["ETag"] == flask_res.headers["ETag"]
+
+
+def test_invalid_range_matches_flask(client, asgi_client):
+    query_string = {"date": "2025131"}
+    flask_res = client.get(plan_url("vanning_plan"), query_string=query_string)
+    asgi_res = asgi_client.get(plan_url("vanning_plan"), params=query_string)
+    assert asgi_res.status_code == flask_res.status_code == 400
+    assert asgi_res.json() == flask_res.get_json()
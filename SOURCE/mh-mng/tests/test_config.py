@@ -0,0 +1,108 @@
+# Copyright 2025 Intent Exchange, Inc.
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software
+# and associated documentation files (the “Software”), to deal in the Software without
+# restriction, including without limitation the rights to use, copy, modify, merge, publish,
+# distribute, sublicense, and/or sell copies of the Software, and to permit persons to whom the
+# Software is furnished to do so, subject to the following conditions:
+# The above copyright notice and this permission notice shall be included in all copies or
+# substantial portions of the Software.
+# THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR
+# OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE,
+# ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+# OTHER DEALINGS IN THE SOFTWARE.
+
+
+import importlib.util
+import os
+
+import pytest
+
+from conftest import APP_DIR
+
+# 設定(config.py)の読み込みのテスト
+
+# docker-compose.yml で .env から渡す数値の設定
+# .env に無い場合は空文字列で渡されるため、既定値を使用する
+NUMERIC_KEYS = {
+    "WORKER_THREADS": 100,
+    "DB_POOL_SIZE": 20,
+    "DB_MAX_OVERFLOW": 80,
+    "LOG_PAYLOAD_SAMPLE_RATE": 1.0,
+    "SLOW_QUERY_THRESHOLD_MS": 200,
+    "PLAN_BULK_MAX_ITEMS": 1000,
+    "PLAN_BULK_CHUNK_SIZE": 500,
+    "PLAN_SEARCH_BATCH_MAX_ITEMS": 1000,
+    "PLAN_SEARCH_BATCH_CHUNK_SIZE": 500,
+    "PLAN_LIST_MAX_DAYS": 31,
+    "PLAN_MAX_WINDOW_HOURS": 24,
+    "PLAN_LIST_MAX_LIMIT": 500,
+    "PLAN_STREAM_BATCH_SIZE": 500,
+    "PLAN_CACHE_TTL": 30,
+    "PLAN_CACHE_MAX_ENTRIES": 10000,
+    "PLAN_INDEX_MAX_HUBS": 100,
+    "PLAN_INDEX_PAST_DAYS": 7,
+    "PLAN_INDEX_CHECK_INTERVAL": 1.0,
+    "PLAN_INDEX_MAX_AGE": 600,
+    "PLAN_EVENT_RETENTION_HOURS": 48,
+    "PLAN_EVENT_BATCH_SIZE": 500,
+    "PLAN_EVENT_POLL_INTERVAL": 1.0,
+    "PLAN_EVENT_HEARTBEAT": 15,
+    "PLAN_EVENT_STREAM_TIMEOUT": 300,
+    "PLAN_EVENT_LONG_POLL_MAX": 30,
+    "PLAN_EVENT_MAX_WAITERS": 25,
+    "PLAN_EVENT_LAG_SECONDS": 2,
+    "PLAN_TOMBSTONE_RETENTION_DAYS": 30,
+    "PLAN_CHANGES_LAG_SECONDS": 5,
+    "ASYNC_DB_POOL_SIZE": 10,
+    "ASYNC_DB_MAX_OVERFLOW": 10,
+}
+
+
+def load_config():
+    """config.py を読み込み直した Config を返す（ConfigIns は差し替えない）"""
+    spec = importlib.util.spec_from_file_location(
+        "config_under_test", os.path.join(APP_DIR, "config.py")
+    )
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module.Config
+
+
+@pytest.mark.parametrize("key", sorted(NUMERIC_KEYS))
+def test_empty_env_uses_default(monkeypatch, key):
+    monkeypatch.setenv(key, "")
+    assert getattr(load_config(), key) == NUMERIC_KEYS[key]
+
+
+def test_all_empty_env_uses_defaults(monkeypatch):
+    for key in [*NUMERIC_KEYS, "DB_POOL_TIMEOUT", "DB_POOL_RECYCLE"]:
+        monkeypatch.setenv(key, "")
+    config = load_config()
+    assert {key: getattr(config, key) for key in NUMERIC_KEYS} == NUMERIC_KEYS
+    assert config.SQLALCHEMY_ENGINE_OPTIONS["pool_timeout"] == 10
+    assert config.SQLALCHEMY_ENGINE_OPTIONS["pool_recycle"] == 3600
+
+
+def test_env_value_is_used(monkeypatch):
+    monkeypatch.setenv("LOG_PAYLOAD_SAMPLE_RATE", "0.25")
+    monkeypatch.setenv("WORKER_THREADS", "40")
+    monkeypatch.delenv("DB_MAX_OVERFLOW", raising=False)
+    config = load_config()
+    assert config.LOG_PAYLOAD_SAMPLE_RATE == 0.25
+    assert config.DB_MAX_OVERFLOW == 20
+
+
+def test_async_pool_is_separate(monkeypatch):
+    """非同期サーバーのプールは同期のプールの大きさを使用しない"""
+    monkeypatch.setenv("ASYNC_DB_POOL_SIZE", "5")
+    monkeypatch.delenv("ASYNC_DB_MAX_OVERFLOW", raising=False)
+    config = load_config()
+    assert config.ASYNC_DB_ENGINE_OPTIONS["pool_size"] == 5
+    assert config.ASYNC_DB_ENGINE_OPTIONS["max_overflow"] == 10
+    assert (
+        config.ASYNC_DB_ENGINE_OPTIONS["pool_timeout"]
+        == config.SQLALCHEMY_ENGINE_OPTIONS["pool_timeout"]
+    )
@@ -0,0 +1,37 @@
+# Copyright 2025 Intent Exchange, Inc.
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software
+# and associated documentation files (the “Software”), to deal in the Software without
+# restriction, including without limitation the rights to use, copy, modify, merge, publish,
+# distribute, sublicense, and/or sell copies of the Software, and to permit persons to whom the
+# Software is furnished to do so, subject to the following conditions:
+# The above copyright notice and this permission notice shall be included in all copies or
+# substantial portions of the Software.
+# THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR
+# OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE,
+# ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+# OTHER DEALINGS IN THE SOFTWARE.
+
+
+from conftest import plan_url
+from com import metrics
+
+# メトリクス(/metrics)のテスト
+
+
+def test_mark_process_dead_uses_exiting_pid(monkeypatch):
+    """読み込み時ではなく、終了するプロセスのIDを集計から除く"""
+    marked = []
+    monkeypatch.setattr(metrics.multiprocess, "mark_process_dead", marked.append)
+    monkeypatch.setattr(metrics.os, "getpid", lambda: 4321)
+    metrics.mark_process_dead()
+    assert marked == [4321]
+
+
+def test_metrics_endpoint(client):
+    client.get(plan_url("vanning_plan"))
+    res = client.get("/metrics")
+    assert res.status_code == 200
+    assert b"mhmng_http_requests_total" in res.data
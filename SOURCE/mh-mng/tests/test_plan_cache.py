@@ -0,0 +1,75 @@
+# Copyright 2025 Intent Exchange, Inc.
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software
+# and associated documentation files (the “Software”), to deal in the Software without
+# restriction, including without limitation the rights to use, copy, modify, merge, publish,
+# distribute, sublicense, and/or sell copies of the Software, and to permit persons to whom the
+# Software is furnished to do so, subject to the following conditions:
+# The above copyright notice and this permission notice shall be included in all copies or
+# substantial portions of the Software.
+# THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR
+# OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE,
+# ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+# OTHER DEALINGS IN THE SOFTWARE.
+
+import pytest
+
+from conftest import TEST_MH, plan_body, plan_url
+from com.cache import plan_cache
+
+# 計画詳細取得のキャッシュ(plan_cache)の無効化のテスト
+
+PLAN_TYPES = ("vanning_plan", "devanning_plan")
+
+
+def cached_plan(plan_type, trsp_instruction_id):
+    key = plan_cache.key(plan_type, TEST_MH, trsp_instruction_id)
+    return plan_cache.backend.get(key)
+
+
+def put_plan(client, plan_type):
+    return client.put(plan_url(plan_type, trsp_instruction_id="T1"), json={"status": 2})
+
+
+def post_plan(client, plan_type):
+    return client.post(
+        plan_url(plan_type, trsp_instruction_id="T1"), json=plan_body(status=2)
+    )
+
+
+def bulk_plans(client, plan_type):
+    return client.post(
+        plan_url(plan_type) + "/_bulk",
+        json=[plan_body(trsp_instruction_id="T1", status=2)],
+    )
+
+
+@pytest.mark.parametrize("plan_type", PLAN_TYPES)
+@pytest.mark.parametrize("write_plan", [put_plan, post_plan, bulk_plans])
+def test_write_invalidates_cache(client, plan_type, write_plan):
+    """登録・更新後の計画詳細取得は、キャッシュではなく更新後の計画を返す"""
+    url = plan_url(plan_type, trsp_instruction_id="T1")
+    client.post(url, json=plan_body(status=1))
+    client.post(plan_url(plan_type, trsp_instruction_id="T2"), json=plan_body())
+    assert client.get(url).get_json()[plan_type]["status"] == 1
+    client.get(plan_url(plan_type, trsp_instruction_id="T2"))
+    assert cached_plan(plan_type, "T1")["status"] == 1
+    res = write_plan(client, plan_type)
+    assert res.status_code == 200
+    assert cached_plan(plan_type, "T1") is None
+    # 更新していない計画のキャッシュは残す
+    assert cached_plan(plan_type, "T2") is not None
+    assert client.get(url).get_json()[plan_type]["status"] == 2
+
+
+@pytest.mark.parametrize("plan_type", PLAN_TYPES)
+def test_delete_invalidates_cache(client, plan_type):
+    url = plan_url(plan_type, trsp_instruction_id="T1")
+    client.post(url, json=plan_body())
+    assert client.get(url).get_json()["result"] is True
+    assert cached_plan(plan_type, "T1") is not None
+    assert client.delete(url).status_code == 200
+    assert cached_plan(plan_type, "T1") is None
+    assert client.get(url).get_json()["error_msg"] == "Not Found"
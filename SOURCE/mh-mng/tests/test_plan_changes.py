@@ -0,0 +1,142 @@
+# Copyright 2025 Intent Exchange, Inc.
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software
+# and associated documentation files (the “Software”), to deal in the Software without
+# restriction, including without limitation the rights to use, copy, modify, merge, publish,
+# distribute, sublicense, and/or sell copies of the Software, and to permit persons to whom the
+# Software is furnished to do so, subject to the following conditions:
+# The above copyright notice and this permission notice shall be included in all copies or
+# substantial portions of the Software.
+# THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR
+# OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE,
+# ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+# OTHER DEALINGS IN THE SOFTWARE.
+
+import datetime
+import pytest
+
+from conftest import API_PREFIX, TEST_MH, plan_body, plan_url
+from config import ConfigIns
+from database import db
+from com.plan_changes import encode_change_cursor
+from model.vanning_plan import VanningPlanModel
+
+# 計画の差分同期(plan_changes)のテスト
+
+CHANGES_URL = f"{API_PREFIX}/plan_changes/{TEST_MH}"
+
+
+@pytest.fixture(autouse=True)
+def no_lag(monkeypatch):
+    monkeypatch.setattr(ConfigIns, "PLAN_CHANGES_LAG_SECONDS", 0)
+
+
+def get_changes(client, since=None, limit=None):
+    query_string = {}
+    if since is not None:
+        query_string["since"] = since
+    if limit is not None:
+        query_string["limit"] = limit
+    res = client.get(CHANGES_URL, query_string=query_string)
+    assert res.status_code == 200
+    return res.get_json()
+
+
+def sync_all(client, since=None, limit=None):
+    """has_more が false になるまで取得し、(変更の一覧, 最後のカーソル) を返す"""
+    changes = []
+    for _ in range(100):
+        data = get_changes(client, since, limit)
+        assert data["reset"] is False
+        changes += [
+            (change["op"], change["plan_type"], change["trsp_instruction_id"])
+            for change in data["changes"]
+        ]
+        since = data["next_cursor"]
+        if not data["has_more"]:
+            return changes, since
+    pytest.fail("sync does not finish")
+
+
+def post_plans(client, plan_type, trsp_instruction_ids):
+    for trsp_instruction_id in trsp_instruction_ids:
+        res = client.post(
+            plan_url(plan_type, trsp_instruction_id=trsp_instruction_id),
+            json=plan_body(),
+        )
+        assert res.status_code == 200
+
+
+def age_plans(app, days):
+    """計画の更新日時を days 日前にする"""
+    with app.app_context():
+        for plan in db.session.query(VanningPlanModel):
+            plan.updated_at -= datetime.timedelta(days=days)
+        db.session.commit()
+
+
+def test_full_sync_then_delta(client):
+    post_plans(client, "vanning_plan", ["A", "B", "C"])
+    post_plans(client, "devanning_plan", ["D"])
+    changes, cursor = sync_all(client, limit=3)
+    assert sorted(changes) == [
+        ("upsert", "devanning_plan", "D"),
+        ("upsert", "vanning_plan", "A"),
+        ("upsert", "vanning_plan", "B"),
+        ("upsert", "vanning_plan", "C"),
+    ]
+    assert sync_all(client, cursor)[0] == []
+    client.put(plan_url("vanning_plan", trsp_instruction_id="B"), json={"status": 2})
+    client.delete(plan_url("devanning_plan", trsp_instruction_id="D"))
+    changes, cursor = sync_all(client, cursor, limit=1)
+    assert changes == [
+        ("upsert", "vanning_plan", "B"),
+        ("delete", "devanning_plan", "D"),
+    ]
+
+
+def test_full_sync_pages_over_old_plans(client, app):
+    """保持期間より古い計画が limit より多くても、初回の同期をページングできる"""
+    post_plans(client, "vanning_plan", [f"T{i}" for i in range(5)])
+    age_plans(app, ConfigIns.PLAN_TOMBSTONE_RETENTION_DAYS + 10)
+    changes, cursor = sync_all(client, limit=2)
+    assert [change[2] for change in changes] == [f"T{i}" for i in range(5)]
+    data = get_changes(client, cursor)
+    assert data["reset"] is False
+    assert data["changes"] == []
+
+
+def test_full_sync_returns_deletes_after_start(client, app):
+    """初回の同期の途中で削除された計画は delete を返し、開始前の削除は返さない"""
+    post_plans(client, "vanning_plan", [f"T{i}" for i in range(4)])
+    client.delete(plan_url("vanning_plan", trsp_instruction_id="T3"))
+    age_plans(app, 1)
+    data = get_changes(client, limit=2)
+    assert data["has_more"] is True
+    client.delete(plan_url("vanning_plan", trsp_instruction_id="T0"))
+    changes, _ = sync_all(client, data["next_cursor"], limit=2)
+    assert changes == [
+        ("upsert", "vanning_plan", "T2"),
+        ("delete", "vanning_plan", "T0"),
+    ]
+
+
+def test_expired_delta_cursor_resets(client):
+    expired = encode_change_cursor((datetime.datetime(2000, 1, 1), -1, 0))
+    data = get_changes(client, expired)
+    assert data["reset"] is True
+    assert data["next_cursor"] is None
+    # 初回の同期の開始日時が保持期間を過ぎた場合も返し直す
+    expired = encode_change_cursor(
+        (datetime.datetime.now(), 0, 1), datetime.datetime(2000, 1, 1)
+    )
+    assert get_changes(client, expired)["reset"] is True
+
+
+@pytest.mark.parametrize("since", ["bad", "WzEsMiwzLDQsNV0="])
+def test_invalid_cursor(client, since):
+    res = client.get(CHANGES_URL, query_string={"since": since})
+    assert res.status_code == 400
+    assert res.get_json()["error_msg"] == "since is invalid"
@@ -0,0 +1,193 @@
+# Copyright 2025 Intent Exchange, Inc.
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software
+# and associated documentation files (the “Software”), to deal in the Software without
+# restriction, including without limitation the rights to use, copy, modify, merge, publish,
+# distribute, sublicense, and/or sell copies of the Software, and to permit persons to whom the
+# Software is furnished to do so, subject to the following conditions:
+# The above copyright notice and this permission notice shall be included in all copies or
+# substantial portions of the Software.
+# THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR
+# OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE,
+# ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+# OTHER DEALINGS IN THE SOFTWARE.
+
+import pytest
+
+from conftest import TEST_MH, plan_body, plan_url
+from config import ConfigIns
+
+# 計画の駐車枠の重複の検出(PLAN_CONFLICT_MODE)のテスト
+
+
+@pytest.fixture
+def conflict_mode(monkeypatch):
+    def set_mode(mode):
+        monkeypatch.setattr(ConfigIns, "PLAN_CONFLICT_MODE", mode)
+
+    return set_mode
+
+
+def post_plan(client, plan_type, trsp_instruction_id, **values):
+    return client.post(
+        plan_url(plan_type, trsp_instruction_id=trsp_instruction_id),
+        json=plan_body(**values),
+    )
+
+
+def plan_status(client, plan_type, trsp_instruction_id):
+    res = client.get(plan_url(plan_type, trsp_instruction_id=trsp_instruction_id))
+    return res.get_json()[plan_type]["status"]
+
+
+def test_off_does_not_check(client, conflict_mode):
+    conflict_mode("off")
+    post_plan(client, "vanning_plan", "A")
+    res = post_plan(client, "devanning_plan", "B")
+    assert res.status_code == 200
+    assert res.get_json()["conflicts"] == []
+
+
+def test_warn_returns_conflicts(client, conflict_mode):
+    conflict_mode("warn")
+    post_plan(client, "vanning_plan", "A")
+    res = post_plan(
+        client,
+        "devanning_plan",
+        "B",
+        mh_space_list=["2", "1"],
+        req_from_time="2025-01-10T10:30:00",
+        req_to_time="2025-01-10T12:00:00",
+    )
+    assert res.status_code == 200
+    conflicts = res.get_json()["conflicts"]
+    assert [
+        (c["trsp_instruction_id"], c["space"], c["conflict_plan_type"])
+        for c in conflicts
+    ] == [("B", "1", "vanning_plan")]
+    assert conflicts[0]["conflict_trsp_instruction_id"] == "A"
+    assert plan_status(client, "devanning_plan", "B") == 1
+
+
+@pytest.mark.parametrize(
+    "values",
+    [
+        # 終了時間と開始時間が同じ場合は重ならない
+        {"req_from_time": "2025-01-10T11:00:00", "req_to_time": "2025-01-10T12:00:00"},
+        {"mh_space_list": ["2"]},
+        {"status": -1},
+    ],
+)
+def test_reject_allows_non_overlapping(client, conflict_mode, values):
+    conflict_mode("reject")
+    post_plan(client, "vanning_plan", "A")
+    res = post_plan(client, "vanning_plan", "B", **values)
+    assert res.status_code == 200
+    assert res.get_json()["conflicts"] == []
+
+
+def test_reject_overlapping_write(client, conflict_mode):
+    conflict_mode("reject")
+    post_plan(client, "vanning_plan", "A")
+    res = post_plan(client, "devanning_plan", "B")
+    assert res.status_code == 409
+    data = res.get_json()
+    assert data["error_msg"] == "conflict"
+    assert data["conflicts"][0]["conflict_trsp_instruction_id"] == "A"
+    res = client.get(plan_url("devanning_plan", trsp_instruction_id="B"))
+    assert res.get_json()["error_msg"] == "Not Found"
+    # 更新で作業時間を重ねる場合も拒否し、更新前の値を残す
+    post_plan(client, "devanning_plan", "B", req_from_time="2025-01-10T12:00:00")
+    res = client.put(
+        plan_url("devanning_plan", trsp_instruction_id="B"),
+        json={"req_from_time": "2025-01-10T10:00:00"},
+    )
+    assert res.status_code == 409
+    res = client.get(plan_url("devanning_plan", trsp_instruction_id="B"))
+    assert res.get_json()["devanning_plan"]["req_from_time"].startswith(
+        "2025-01-10T12:00:00"
+    )
+
+
+@pytest.mark.parametrize("mode, status_code", [("warn", 200), ("reject", 409)])
+def test_status_change_from_cancel_is_checked(
+    client, conflict_mode, mode, status_code
+):
+    """取消の計画を状態のみの更新で戻す場合も重複を検出する"""
+    conflict_mode(mode)
+    post_plan(client, "vanning_plan", "A")
+    post_plan(client, "vanning_plan", "B", status=-1)
+    res = client.put(
+        plan_url("vanning_plan", trsp_instruction_id="B"), json={"status": 1}
+    )
+    assert res.status_code == status_code
+    assert [c["conflict_trsp_instruction_id"] for c in res.get_json()["conflicts"]] == [
+        "A"
+    ]
+    assert plan_status(client, "vanning_plan", "B") == (1 if mode == "warn" else -1)
+
+
+@pytest.mark.parametrize("plan_type", ["vanning_plan", "devanning_plan"])
+def test_reject_bulk(client, conflict_mode, plan_type):
+    """409の場合は全件を書き込まないため、全ての計画を登録失敗とする"""
+    conflict_mode("reject")
+    post_plan(client, "vanning_plan", "A")
+    res = client.post(
+        plan_url(plan_type) + "/_bulk",
+        json=[
+            plan_body(trsp_instruction_id="B", mh_space_list=["2"]),
+            plan_body(trsp_instruction_id="C"),
+            plan_body(trsp_instruction_id="D", req_to_time="2025-01-12T10:00:00"),
+        ],
+    )
+    assert res.status_code == 409
+    data = res.get_json()
+    assert data["result"] is False
+    assert [
+        (r["trsp_instruction_id"], r["result"], r["error_msg"]) for r in data["results"]
+    ] == [
+        ("B", False, "rolled back"),
+        ("C", False, "conflict"),
+        (
+            "D",
+            False,
+            f"req_to_time must be within {ConfigIns.PLAN_MAX_WINDOW_HOURS} hours "
+            "of req_from_time",
+        ),
+    ]
+    for trsp_instruction_id in ("B", "C", "D"):
+        res = client.get(plan_url(plan_type, trsp_instruction_id=trsp_instruction_id))
+        assert res.get_json()["error_msg"] == "Not Found"
+
+
+def test_reject_locks_candidates(app, client):
+    """reject の場合は候補の割当と計画の行を SELECT ... FOR UPDATE で読み込む"""
+    from sqlalchemy import event
+    from sqlalchemy.dialects import mysql
+    from sqlalchemy.orm import Session
+    from database import db
+    from com.plan_conflict import find_plan_conflicts
+    from model.vanning_plan import VanningPlanModel
+
+    post_plan(client, "vanning_plan", "A")
+    post_plan(client, "vanning_plan", "B")
+    statements = []
+
+    def record_statement(orm_execute_state):
+        statement = orm_execute_state.statement
+        statements.append(str(statement.compile(dialect=mysql.dialect())))
+
+    event.listen(Session, "do_orm_execute", record_statement)
+    try:
+        with app.app_context():
+            conflicts = find_plan_conflicts(VanningPlanModel, TEST_MH, ["B"], lock=True)
+            db.session.rollback()
+    finally:
+        event.remove(Session, "do_orm_execute", record_statement)
+    assert [c["conflict_trsp_instruction_id"] for c in conflicts] == ["A"]
+    locked = [sql for sql in statements if sql.endswith("FOR UPDATE")]
+    assert len(locked) == 2
+    assert "FROM plan_space" in locked[0]
+    assert "FROM vanning_plan" in locked[1]
@@ -0,0 +1,164 @@
+# Copyright 2025 Intent Exchange, Inc.
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software
+# and associated documentation files (the “Software”), to deal in the Software without
+# restriction, including without limitation the rights to use, copy, modify, merge, publish,
+# distribute, sublicense, and/or sell copies of the Software, and to permit persons to whom the
+# Software is furnished to do so, subject to the following conditions:
+# The above copyright notice and this permission notice shall be included in all copies or
+# substantial portions of the Software.
+# THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR
+# OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE,
+# ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+# OTHER DEALINGS IN THE SOFTWARE.
+
+
+import pytest
+
+from conftest import API_PREFIX, TEST_MH, plan_body, plan_url
+from database import db
+from model.plan_equipment import PlanEquipmentModel
+from model.vanning_plan import VanningPlanModel
+
+# 計画の使用機材(plan_equipment)と機材ごとの計画検索のテスト
+
+EQUIPMENT_URL = f"{API_PREFIX}/plan_equipment"
+
+
+def equipment_rows(app):
+    """(plan_type, kind, giai, window_start, window_end) の一覧を返す"""
+    with app.app_context():
+        return sorted(
+            (
+                row.plan_type,
+                row.kind,
+                row.giai,
+                row.window_start.isoformat(),
+                row.window_end.isoformat(),
+            )
+            for row in db.session.query(PlanEquipmentModel)
+        )
+
+
+def search(client, giai, **query_string):
+    query_string.setdefault("date", "20250110")
+    res = client.get(f"{EQUIPMENT_URL}/{giai}", query_string=query_string)
+    assert res.status_code == 200
+    data = res.get_json()
+    return {
+        key: [p["trsp_instruction_id"] for p in data[key]]
+        for key in ("vanning_plan_list", "devanning_plan_list")
+        if key in data
+    }
+
+
+@pytest.mark.parametrize("plan_type", ["vanning_plan", "devanning_plan"])
+def test_equipment_rows_follow_writes(app, client, plan_type):
+    url = plan_url(plan_type, trsp_instruction_id="T1")
+    client.post(
+        url,
+        json=plan_body(tractor_giai="TR1", trailer_giai_list=["TL1", "TL2", "TL1"]),
+    )
+    window = ("2025-01-10T10:00:00", "2025-01-10T11:00:00")
+    assert equipment_rows(app) == [
+        (plan_type, "tractor", "TR1", *window),
+        (plan_type, "trailer", "TL1", *window),
+        (plan_type, "trailer", "TL2", *window),
+    ]
+    # 機材と作業時間の変更で作り直す
+    client.put(
+        url, json={"trailer_giai_list": ["TL3"], "req_to_time": "2025-01-10T12:00:00"}
+    )
+    window = ("2025-01-10T10:00:00", "2025-01-10T12:00:00")
+    assert equipment_rows(app) == [
+        (plan_type, "tractor", "TR1", *window),
+        (plan_type, "trailer", "TL3", *window),
+    ]
+    # 機材を使用しない計画は行を作成しない
+    client.put(url, json={"tractor_giai": "", "trailer_giai_list": []})
+    assert equipment_rows(app) == []
+    client.put(url, json={"tractor_giai": "TR2"})
+    client.delete(url)
+    assert equipment_rows(app) == []
+
+
+def test_equipment_rows_from_bulk(app, client):
+    client.post(
+        plan_url("vanning_plan") + "/_bulk",
+        json=[
+            plan_body(trsp_instruction_id="T1", tractor_giai="TR1"),
+            plan_body(trsp_instruction_id="T2", trailer_giai_list=["TL1"]),
+        ],
+    )
+    assert [row[1:3] for row in equipment_rows(app)] == [
+        ("tractor", "TR1"),
+        ("trailer", "TL1"),
+    ]
+
+
+def test_search_by_giai(client):
+    client.post(
+        plan_url("vanning_plan", trsp_instruction_id="V1"),
+        json=plan_body(tractor_giai="G1"),
+    )
+    client.post(
+        plan_url("vanning_plan", trsp_instruction_id="V2"),
+        json=plan_body(
+            trailer_giai_list=["G2", "G1"],
+            req_from_time="2025-01-10T08:00:00",
+            req_to_time="2025-01-10T09:00:00",
+        ),
+    )
+    client.post(
+        plan_url("devanning_plan", trsp_instruction_id="D1"),
+        json=plan_body(trailer_giai_list=["G1"]),
+    )
+    client.post(
+        plan_url("devanning_plan", trsp_instruction_id="D2"),
+        json=plan_body(
+            tractor_giai="G1",
+            req_from_time="2025-01-12T10:00:00",
+            req_to_time="2025-01-12T11:00:00",
+        ),
+    )
+    # 開始時間順に、検索範囲と重なる計画を返す
+    assert search(client, "G1") == {
+        "vanning_plan_list": ["V2", "V1"],
+        "devanning_plan_list": ["D1"],
+    }
+    assert search(client, "G1", kind="tractor") == {
+        "vanning_plan_list": ["V1"],
+        "devanning_plan_list": [],
+    }
+    assert search(client, "G1", is_vanning=0, kind="trailer") == {
+        "devanning_plan_list": ["D1"]
+    }
+    assert search(client, "G1", date="20250112") == {
+        "vanning_plan_list": [],
+        "devanning_plan_list": ["D2"],
+    }
+    assert search(client, "G3") == {"vanning_plan_list": [], "devanning_plan_list": []}
+
+
+@pytest.mark.parametrize(
+    "query_string", [{"kind": "truck"}, {"is_vanning": "2"}, {"date": "2025131"}]
+)
+def test_search_invalid_query(client, query_string):
+    res = client.get(f"{EQUIPMENT_URL}/G1", query_string=query_string)
+    assert res.status_code == 400
+    assert res.get_json()["result"] is False
+
+
+def test_long_trailer_giai(app, client):
+    """trailer_giai_list_str に入る長さの GIAI は行を作成して検索できる"""
+    column_length = VanningPlanModel.__table__.c.trailer_giai_list_str.type.length
+    assert PlanEquipmentModel.__table__.c.giai.type.length >= column_length
+    giai = "G" * 100
+    res = client.post(
+        plan_url("vanning_plan", trsp_instruction_id="T1"),
+        json=plan_body(trailer_giai_list=[giai]),
+    )
+    assert res.status_code == 200
+    assert search(client, giai)["vanning_plan_list"] == ["T1"]
@@ -0,0 +1,133 @@
+# Copyright 2025 Intent Exchange, Inc.
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software
+# and associated documentation files (the “Software”), to deal in the Software without
+# restriction, including without limitation the rights to use, copy, modify, merge, publish,
+# distribute, sublicense, and/or sell copies of the Software, and to permit persons to whom the
+# Software is furnished to do so, subject to the following conditions:
+# The above copyright notice and this permission notice shall be included in all copies or
+# substantial portions of the Software.
+# THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR
+# OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE,
+# ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+# OTHER DEALINGS IN THE SOFTWARE.
+
+import pytest
+
+from conftest import API_PREFIX, TEST_MH, plan_body, plan_url
+
+# 計画の読み込みAPIの ETag・条件付きGET(304)のテスト
+
+PLAN_TYPES = ("vanning_plan", "devanning_plan")
+
+
+def get_etag(client, url, **kwargs):
+    res = client.get(url, **kwargs)
+    assert res.status_code == 200
+    assert res.headers["ETag"]
+    return res.headers["ETag"]
+
+
+@pytest.mark.parametrize("plan_type", PLAN_TYPES)
+def test_detail_not_modified(client, plan_type):
+    url = plan_url(plan_type, trsp_instruction_id="T1")
+    client.post(url, json=plan_body())
+    etag = get_etag(client, url)
+    res = client.get(url, headers={"If-None-Match": etag})
+    assert res.status_code == 304
+    assert res.headers["ETag"] == etag
+    assert res.get_data() == b""
+    # キャッシュに無い場合（更新日時のみ読み込む場合）も304を返す
+    from com.cache import plan_cache
+
+    plan_cache.invalidate(plan_type, TEST_MH, ["T1"])
+    assert client.get(url, headers={"If-None-Match": etag}).status_code == 304
+
+
+@pytest.mark.parametrize("plan_type", PLAN_TYPES)
+def test_detail_modified_after_write(client, plan_type):
+    url = plan_url(plan_type, trsp_instruction_id="T1")
+    client.post(url, json=plan_body())
+    etag = get_etag(client, url)
+    client.put(url, json={"status": 2})
+    res = client.get(url, headers={"If-None-Match": etag})
+    assert res.status_code == 200
+    assert res.headers["ETag"] != etag
+    assert res.get_json()[plan_type]["status"] == 2
+
+
+def test_detail_not_modified_with_etag_list(client):
+    url = plan_url("vanning_plan", trsp_instruction_id="T1")
+    client.post(url, json=plan_body())
+    etag = get_etag(client, url)
+    res = client.get(url, headers={"If-None-Match": f'"other", {etag}'})
+    assert res.status_code == 304
+    assert client.get(url, headers={"If-None-Match": "*"}).status_code == 304
+
+
+@pytest.mark.parametrize("plan_type", PLAN_TYPES)
+def test_list_not_modified(client, plan_type):
+    client.post(plan_url(plan_type, trsp_instruction_id="T1"), json=plan_body())
+    query_string = {"date": "20250110"}
+    etag = get_etag(client, plan_url(plan_type), query_string=query_string)
+    res = client.get(
+        plan_url(plan_type),
+        query_string=query_string,
+        headers={"If-None-Match": etag},
+    )
+    assert res.status_code == 304
+    # 検索条件が異なれば ETag も異なる
+    assert etag != get_etag(
+        client, plan_url(plan_type), query_string={"date": "20250110", "limit": 1}
+    )
+    # 検索範囲の計画が追加・削除されれば ETag が変わる
+    client.post(plan_url(plan_type, trsp_instruction_id="T2"), json=plan_body())
+    res = client.get(
+        plan_url(plan_type),
+        query_string=query_string,
+        headers={"If-None-Match": etag},
+    )
+    assert res.status_code == 200
+    etag = res.headers["ETag"]
+    client.delete(plan_url(plan_type, trsp_instruction_id="T2"))
+    res = client.get(
+        plan_url(plan_type),
+        query_string=query_string,
+        headers={"If-None-Match": etag},
+    )
+    assert res.status_code == 200
+
+
+@pytest.mark.parametrize(
+    "is_vanning, plan_type", [(1, "vanning_plan"), (0, "devanning_plan")]
+)
+def test_plan_search_not_modified(client, is_vanning, plan_type):
+    client.post(
+        plan_url(plan_type, trsp_instruction_id="T1"),
+        json=plan_body(is_departure_mh=1),
+    )
+    url = f"{API_PREFIX}/plan_search/"
+    query_string = {
+        "trsp_instruction_id": "T1",
+        "is_departure_mh": 1,
+        "is_vanning": is_vanning,
+    }
+    etag = get_etag(client, url, query_string=query_string)
+    res = client.get(url, query_string=query_string, headers={"If-None-Match": etag})
+    assert res.status_code == 304
+    client.put(plan_url(plan_type, trsp_instruction_id="T1"), json={"status": 2})
+    res = client.get(url, query_string=query_string, headers={"If-None-Match": etag})
+    assert res.status_code == 200
+    assert res.get_json()["plan"]["status"] == 2
+
+
+def test_plan_search_not_found(client):
+    res = client.get(
+        f"{API_PREFIX}/plan_search/",
+        query_string={"trsp_instruction_id": "NONE", "is_vanning": 1},
+        headers={"If-None-Match": '"x"'},
+    )
+    assert res.status_code == 404
+    assert "ETag" not in res.headers
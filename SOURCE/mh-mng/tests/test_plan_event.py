@@ -0,0 +1,192 @@
+# Copyright 2025 Intent Exchange, Inc.
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software
+# and associated documentation files (the “Software”), to deal in the Software without
+# restriction, including without limitation the rights to use, copy, modify, merge, publish,
+# distribute, sublicense, and/or sell copies of the Software, and to permit persons to whom the
+# Software is furnished to do so, subject to the following conditions:
+# The above copyright notice and this permission notice shall be included in all copies or
+# substantial portions of the Software.
+# THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR
+# OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE,
+# ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+# OTHER DEALINGS IN THE SOFTWARE.
+
+import datetime
+import pytest
+
+from conftest import API_PREFIX, TEST_MH, plan_body, plan_url
+from config import ConfigIns
+from database import db
+from com import plan_event
+from com.plan_event import plan_event_waiters
+from model.plan_event import PlanEventModel
+
+# 計画の変更通知(plan_event)のテスト
+
+EVENT_URL = f"{API_PREFIX}/plan_event/{TEST_MH}"
+
+
+@pytest.fixture(autouse=True)
+def event_config(monkeypatch):
+    monkeypatch.setattr(ConfigIns, "PLAN_EVENT_LAG_SECONDS", 0)
+    monkeypatch.setattr(ConfigIns, "PLAN_EVENT_POLL_INTERVAL", 0.05)
+    monkeypatch.setattr(ConfigIns, "PLAN_EVENT_HEARTBEAT", 0.1)
+    monkeypatch.setattr(ConfigIns, "PLAN_EVENT_STREAM_TIMEOUT", 0.3)
+
+
+def poll(client, since=None, wait=None):
+    query_string = {}
+    if since is not None:
+        query_string["since"] = since
+    if wait is not None:
+        query_string["wait"] = wait
+    res = client.get(EVENT_URL, query_string=query_string)
+    assert res.status_code == 200
+    return res.get_json()
+
+
+def add_events(app, created_ats):
+    """追加日時を指定してイベントを追加し、seq の一覧を返す"""
+    with app.app_context():
+        rows = [
+            PlanEventModel(
+                mh=TEST_MH,
+                plan_type="vanning_plan",
+                trsp_instruction_id=f"T{i}",
+                op="create",
+                created_at=created_at,
+            )
+            for i, created_at in enumerate(created_ats)
+        ]
+        db.session.add_all(rows)
+        db.session.commit()
+        return [row.seq for row in rows]
+
+
+def test_long_poll_events(client):
+    last_seq = poll(client)["last_seq"]
+    url = plan_url("vanning_plan", trsp_instruction_id="T1")
+    client.post(url, json=plan_body())
+    client.put(url, json={"status": 2})
+    client.delete(url)
+    data = poll(client, last_seq)
+    assert [(e["op"], e["trsp_instruction_id"]) for e in data["events"]] == [
+        ("create", "T1"),
+        ("update", "T1"),
+        ("delete", "T1"),
+    ]
+    # 削除済みの計画は null を返す
+    assert [e["plan"] for e in data["events"]] == [None, None, None]
+    assert data["last_seq"] == data["events"][-1]["seq"]
+    data = poll(client, data["last_seq"], wait=0.1)
+    assert data["events"] == []
+    assert data["reset"] is False
+
+
+def test_events_wait_for_visibility_lag(client, app, monkeypatch):
+    """PLAN_EVENT_LAG_SECONDS 秒経過していないイベントは返さない"""
+    monkeypatch.setattr(ConfigIns, "PLAN_EVENT_LAG_SECONDS", 60)
+    client.post(plan_url("vanning_plan", trsp_instruction_id="T1"), json=plan_body())
+    assert poll(client)["last_seq"] == 0
+    assert poll(client, 0)["events"] == []
+    monkeypatch.setattr(ConfigIns, "PLAN_EVENT_LAG_SECONDS", 0)
+    assert [e["trsp_instruction_id"] for e in poll(client, 0)["events"]] == ["T1"]
+
+
+def test_events_stop_before_recent_event(client, app, monkeypatch):
+    """後の seq が先にコミットされても、前の seq のイベントを飛ばさない"""
+    monkeypatch.setattr(ConfigIns, "PLAN_EVENT_LAG_SECONDS", 5)
+    now = datetime.datetime.now()
+    old = now - datetime.timedelta(seconds=10)
+    seqs = add_events(app, [old, now, old])
+    data = poll(client, 0)
+    assert [e["seq"] for e in data["events"]] == seqs[:1]
+    assert data["last_seq"] == seqs[0]
+
+
+def purge_events(app, monkeypatch):
+    """保持期間を過ぎたイベントを削除する"""
+    monkeypatch.setattr(plan_event, "_purged_at", 0.0)
+    with app.app_context():
+        plan_event.purge_plan_events()
+        db.session.commit()
+
+
+def test_expired_since_resets(client, app, monkeypatch):
+    now = datetime.datetime.now()
+    old = now - datetime.timedelta(hours=ConfigIns.PLAN_EVENT_RETENTION_HOURS + 1)
+    seqs = add_events(app, [old, old, now])
+    purge_events(app, monkeypatch)
+    data = poll(client, seqs[0] - 1)
+    assert data["reset"] is True
+    assert data["last_seq"] == seqs[-1]
+    assert poll(client, seqs[1])["reset"] is False
+
+
+def test_expired_since_resets_after_all_events_purged(client, app, monkeypatch):
+    """イベントが全て削除された後も、削除済みのイベントより前の seq はリセットする"""
+    old = datetime.datetime.now() - datetime.timedelta(
+        hours=ConfigIns.PLAN_EVENT_RETENTION_HOURS + 1
+    )
+    seqs = add_events(app, [old, old])
+    purge_events(app, monkeypatch)
+    with app.app_context():
+        assert db.session.query(PlanEventModel).count() == 0
+    data = poll(client, seqs[0])
+    assert data["reset"] is True
+    assert poll(client, seqs[1])["reset"] is False
+    # 他のMHのイベントの削除ではリセットしない
+    res = client.get(
+        f"{API_PREFIX}/plan_event/9930000000002", query_string={"since": 0}
+    )
+    assert res.get_json()["reset"] is False
+
+
+def test_stream_resets_expired_last_event_id(client, app, monkeypatch):
+    old = datetime.datetime.now() - datetime.timedelta(
+        hours=ConfigIns.PLAN_EVENT_RETENTION_HOURS + 1
+    )
+    seqs = add_events(app, [old])
+    purge_events(app, monkeypatch)
+    res = client.get(
+        f"{EVENT_URL}/_stream", headers={"Last-Event-ID": str(seqs[0] - 1)}
+    )
+    assert "event: reset\n" in res.get_data(as_text=True)
+    res.close()
+
+
+def test_stream_events(client):
+    url = plan_url("vanning_plan", trsp_instruction_id="T1")
+    client.post(url, json=plan_body())
+    res = client.get(f"{EVENT_URL}/_stream", headers={"Last-Event-ID": "0"})
+    assert res.status_code == 200
+    assert res.mimetype == "text/event-stream"
+    body = res.get_data(as_text=True)
+    assert body.startswith("retry: 50\n\n")
+    assert "event: create\n" in body
+    assert '"trsp_instruction_id":"T1"' in body
+    assert ": keep-alive" in body
+    res.close()
+    assert plan_event_waiters.stats()["active"] == 0
+
+
+def test_stream_limit(client, monkeypatch):
+    monkeypatch.setattr(ConfigIns, "PLAN_EVENT_MAX_WAITERS", 1)
+    res = client.get(f"{EVENT_URL}/_stream", buffered=False)
+    assert res.status_code == 200
+    assert plan_event_waiters.stats()["active"] == 1
+    busy = client.get(f"{EVENT_URL}/_stream")
+    assert busy.status_code == 503
+    assert busy.headers["Retry-After"]
+    # 上限を超えた場合、ロングポーリングは待たずに返す
+    started = datetime.datetime.now()
+    assert poll(client, 0, wait=5)["events"] == []
+    assert datetime.datetime.now() - started < datetime.timedelta(seconds=2)
+    res.close()
+    assert plan_event_waiters.stats()["active"] == 0
+    res = client.get(f"{EVENT_URL}/_stream")
+    assert res.status_code == 200
+    res.close()
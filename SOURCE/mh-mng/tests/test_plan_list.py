@@ -0,0 +1,169 @@
+# Copyright 2025 Intent Exchange, Inc.
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software
+# and associated documentation files (the “Software”), to deal in the Software without
+# restriction, including without limitation the rights to use, copy, modify, merge, publish,
+# distribute, sublicense, and/or sell copies of the Software, and to permit persons to whom the
+# Software is furnished to do so, subject to the following conditions:
+# The above copyright notice and this permission notice shall be included in all copies or
+# substantial portions of the Software.
+# THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR
+# OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE,
+# ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+# OTHER DEALINGS IN THE SOFTWARE.
+
+import datetime
+import pytest
+
+from conftest import TEST_MH, plan_body, plan_url
+from config import ConfigIns
+from com.plan_index import PlanIndex
+
+# 計画一覧（期間検索・カーソルによるページング）のテスト
+
+# 計画索引は直近の計画のみ保持するため、当日の計画を登録する
+TODAY = datetime.datetime.combine(datetime.date.today(), datetime.time())
+PLAN_TYPES = ("vanning_plan", "devanning_plan")
+
+
+@pytest.fixture(params=["sql", "index"])
+def list_source(request, monkeypatch):
+    """計画一覧をDBから検索する場合と、計画索引(PLAN_INDEX_ENABLED)から返す場合"""
+    if request.param == "index":
+        from mh_api.devanning_plan_api import serialize_devanning_plan
+        from mh_api.vanning_plan_api import serialize_vanning_plan
+        from model.devanning_plan import DevanningPlanModel
+        from model.vanning_plan import VanningPlanModel
+
+        monkeypatch.setattr(ConfigIns, "PLAN_INDEX_ENABLED", True)
+        index = PlanIndex(max_hubs=10, past_days=7, check_interval=0, max_age=600)
+        index.register(VanningPlanModel, serialize_vanning_plan)
+        index.register(DevanningPlanModel, serialize_devanning_plan)
+        monkeypatch.setattr("mh_api.vanning_plan_api.plan_index", index)
+        monkeypatch.setattr("mh_api.devanning_plan_api.plan_index", index)
+        return index
+    return None
+
+
+def post_plans(client, plan_type, count, start=TODAY):
+    """30分ずつずらした計画を count 件登録する"""
+    for i in range(count):
+        req_from_time = start + datetime.timedelta(minutes=30 * i)
+        res = client.post(
+            plan_url(plan_type, trsp_instruction_id=f"T{i:03d}"),
+            json=plan_body(
+                req_from_time=req_from_time.isoformat(),
+                req_to_time=(req_from_time + datetime.timedelta(hours=1)).isoformat(),
+            ),
+        )
+        assert res.status_code == 200
+
+
+def list_plans(client, plan_type, **params):
+    params.setdefault("date", TODAY.strftime("%Y%m%d"))
+    return client.get(plan_url(plan_type), query_string=params)
+
+
+@pytest.mark.parametrize("plan_type", PLAN_TYPES)
+def test_list_pages_with_cursor(client, list_source, plan_type):
+    post_plans(client, plan_type, 7)
+    ids, cursor, pages = [], None, 0
+    while True:
+        params = {"limit": 3}
+        if cursor:
+            params["cursor"] = cursor
+        res = list_plans(client, plan_type, **params)
+        assert res.status_code == 200
+        data = res.get_json()
+        page = data[f"{plan_type}_list"]
+        assert len(page) <= 3
+        ids += [plan["trsp_instruction_id"] for plan in page]
+        pages += 1
+        cursor = data["next_cursor"]
+        if not cursor:
+            break
+    assert pages == 3
+    assert ids == [f"T{i:03d}" for i in range(7)]
+    if list_source is not None:
+        assert list_source.counts["hits"] == pages
+
+
+@pytest.mark.parametrize("plan_type", PLAN_TYPES)
+def test_list_cursor_skips_written_plans(client, list_source, plan_type):
+    """カーソルより前に登録された計画は次のページに含まれない"""
+    post_plans(client, plan_type, 4)
+    data = list_plans(client, plan_type, limit=2).get_json()
+    client.post(
+        plan_url(plan_type, trsp_instruction_id="EARLY"),
+        json=plan_body(req_from_time=TODAY.isoformat(), req_to_time=None),
+    )
+    data = list_plans(client, plan_type, limit=2, cursor=data["next_cursor"]).get_json()
+    assert [p["trsp_instruction_id"] for p in data[f"{plan_type}_list"]] == [
+        "T002",
+        "T003",
+    ]
+    assert data["next_cursor"] is None
+
+
+def test_list_overlap_range(client, list_source):
+    """前日から続く計画は含め、範囲の終了時間以降に始まる計画は含めない"""
+    yesterday = TODAY - datetime.timedelta(hours=2)
+    client.post(
+        plan_url("vanning_plan", trsp_instruction_id="OVERNIGHT"),
+        json=plan_body(
+            req_from_time=yesterday.isoformat(),
+            req_to_time=(TODAY + datetime.timedelta(hours=1)).isoformat(),
+        ),
+    )
+    post_plans(client, "vanning_plan", 2, start=TODAY + datetime.timedelta(hours=9))
+    params = {
+        "from": (TODAY + datetime.timedelta(minutes=30)).isoformat(),
+        "to": (TODAY + datetime.timedelta(hours=9, minutes=30)).isoformat(),
+    }
+    data = list_plans(client, "vanning_plan", **params).get_json()
+    assert [p["trsp_instruction_id"] for p in data["vanning_plan_list"]] == [
+        "OVERNIGHT",
+        "T000",
+    ]
+
+
+def test_list_mixed_timezone_range(client, list_source):
+    """タイムゾーン付きとなしの from/to を混在させても、ローカル時間として検索する"""
+    post_plans(client, "vanning_plan", 3, start=TODAY + datetime.timedelta(hours=9))
+    range_to = TODAY + datetime.timedelta(hours=10)
+    params = {
+        "from": (TODAY + datetime.timedelta(hours=8)).isoformat(),
+        "to": range_to.astimezone(datetime.timezone.utc).isoformat(),
+    }
+    res = list_plans(client, "vanning_plan", **params)
+    assert res.status_code == 200
+    assert [p["trsp_instruction_id"] for p in res.get_json()["vanning_plan_list"]] == [
+        "T000",
+        "T001",
+    ]
+
+
+@pytest.mark.parametrize(
+    "params",
+    [{"cursor": "not-a-cursor"}, {"limit": 0}, {"limit": "x"}, {"date": "2025-13-01"}],
+)
+def test_list_invalid_params(client, params):
+    res = list_plans(client, "vanning_plan", **params)
+    assert res.status_code == 400
+    assert res.get_json()["result"] is False
+
+
+def test_list_ndjson(client, list_source):
+    post_plans(client, "vanning_plan", 3)
+    res = client.get(
+        plan_url("vanning_plan"),
+        query_string={"date": TODAY.strftime("%Y%m%d")},
+        headers={"Accept": "application/x-ndjson"},
+    )
+    assert res.status_code == 200
+    assert res.mimetype == "application/x-ndjson"
+    lines = res.get_data(as_text=True).splitlines()
+    assert len(lines) == 3
+    assert TEST_MH in lines[0]
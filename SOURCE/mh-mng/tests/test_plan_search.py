@@ -0,0 +1,118 @@
+# Copyright 2025 Intent Exchange, Inc.
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software
+# and associated documentation files (the “Software”), to deal in the Software without
+# restriction, including without limitation the rights to use, copy, modify, merge, publish,
+# distribute, sublicense, and/or sell copies of the Software, and to permit persons to whom the
+# Software is furnished to do so, subject to the following conditions:
+# The above copyright notice and this permission notice shall be included in all copies or
+# substantial portions of the Software.
+# THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR
+# OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE,
+# ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+# OTHER DEALINGS IN THE SOFTWARE.
+
+import pytest
+
+from conftest import API_PREFIX, TEST_MH, plan_body, plan_url
+from config import ConfigIns
+
+# 計画一括検索(plan_search/_batch)のテスト
+
+BATCH_URL = f"{API_PREFIX}/plan_search/_batch"
+ARRIVAL_MH = "9930000000002"
+
+
+@pytest.fixture
+def search_plans(client):
+    """T1 はバンニング計画の発MH・着MH、T2 はデバンニング計画の発MHのみ登録する"""
+    client.post(plan_url("vanning_plan", trsp_instruction_id="T1"), json=plan_body())
+    client.post(
+        plan_url("vanning_plan", mh=ARRIVAL_MH, trsp_instruction_id="T1"),
+        json=plan_body(is_departure_mh=0),
+    )
+    client.post(plan_url("devanning_plan", trsp_instruction_id="T2"), json=plan_body())
+
+
+def plan_mh(plan):
+    return None if plan is None else plan["mh"]
+
+
+def test_batch_returns_keyed_plans(client, search_plans):
+    res = client.post(BATCH_URL, json={"trsp_instruction_ids": ["T1", "T2", "T3"]})
+    assert res.status_code == 200
+    plans = res.get_json()["plans"]
+    assert list(plans) == ["T1", "T2", "T3"]
+    assert {
+        tid: {
+            plan_type: {key: plan_mh(plan) for key, plan in plan_result.items()}
+            for plan_type, plan_result in plan_types.items()
+        }
+        for tid, plan_types in plans.items()
+    } == {
+        "T1": {
+            "vanning_plan": {"departure": TEST_MH, "arrival": ARRIVAL_MH},
+            "devanning_plan": {"departure": None, "arrival": None},
+        },
+        "T2": {
+            "vanning_plan": {"departure": None, "arrival": None},
+            "devanning_plan": {"departure": TEST_MH, "arrival": None},
+        },
+        "T3": {
+            "vanning_plan": {"departure": None, "arrival": None},
+            "devanning_plan": {"departure": None, "arrival": None},
+        },
+    }
+    # 1件検索と同じ形で計画を返す
+    query_string = {"trsp_instruction_id": "T1", "is_departure_mh": 1, "is_vanning": 1}
+    single = client.get(f"{API_PREFIX}/plan_search/", query_string=query_string)
+    assert plans["T1"]["vanning_plan"]["departure"] == single.get_json()["plan"]
+
+
+def test_batch_filters_and_dedups(client, search_plans, monkeypatch):
+    monkeypatch.setattr(ConfigIns, "PLAN_SEARCH_BATCH_CHUNK_SIZE", 1)
+    res = client.post(
+        BATCH_URL,
+        json={
+            "trsp_instruction_ids": ["T1", "T2", "T1"],
+            "is_vanning": 1,
+            "is_departure_mh": [0],
+        },
+    )
+    assert res.status_code == 200
+    plans = res.get_json()["plans"]
+    assert list(plans) == ["T1", "T2"]
+    assert plan_mh(plans["T1"]["vanning_plan"]["arrival"]) == ARRIVAL_MH
+    assert plans["T1"] == {"vanning_plan": plans["T1"]["vanning_plan"]}
+    assert plans["T2"] == {"vanning_plan": {"arrival": None}}
+
+
+def test_batch_max_items(client, search_plans, monkeypatch):
+    monkeypatch.setattr(ConfigIns, "PLAN_SEARCH_BATCH_MAX_ITEMS", 2)
+    res = client.post(BATCH_URL, json={"trsp_instruction_ids": ["T1", "T2"]})
+    assert res.status_code == 200
+    res = client.post(BATCH_URL, json={"trsp_instruction_ids": ["T1", "T2", "T3"]})
+    assert res.status_code == 400
+    assert res.get_json() == {
+        "plans": {},
+        "result": False,
+        "error_msg": "too many trsp_instruction_ids",
+    }
+
+
+@pytest.mark.parametrize(
+    "body",
+    [
+        [],
+        {"trsp_instruction_ids": "T1"},
+        {"trsp_instruction_ids": [""]},
+        {"trsp_instruction_ids": ["T1"], "is_vanning": 2},
+        {"trsp_instruction_ids": ["T1"], "is_departure_mh": []},
+    ],
+)
+def test_batch_invalid_request(client, body):
+    res = client.post(BATCH_URL, json=body)
+    assert res.status_code == 400
+    assert res.get_json()["result"] is False
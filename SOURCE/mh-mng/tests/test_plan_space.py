@@ -0,0 +1,91 @@
+# Copyright 2025 Intent Exchange, Inc.
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software
+# and associated documentation files (the “Software”), to deal in the Software without
+# restriction, including without limitation the rights to use, copy, modify, merge, publish,
+# distribute, sublicense, and/or sell copies of the Software, and to permit persons to whom the
+# Software is furnished to do so, subject to the following conditions:
+# The above copyright notice and this permission notice shall be included in all copies or
+# substantial portions of the Software.
+# THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR
+# OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE,
+# ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+# OTHER DEALINGS IN THE SOFTWARE.
+
+from conftest import API_PREFIX, TEST_MH, plan_body, plan_url
+
+# 駐車枠の割当・占有状況(plan_space)のテスト
+
+OCCUPANCY_URL = f"{API_PREFIX}/plan_space/{TEST_MH}/_occupancy"
+
+
+def test_occupancy(client):
+    client.post(plan_url("vanning_plan", trsp_instruction_id="A"), json=plan_body())
+    client.post(
+        plan_url("devanning_plan", trsp_instruction_id="B"),
+        json=plan_body(
+            mh_space_list=["1", "2"],
+            req_from_time="2025-01-10T10:30:00",
+            req_to_time="2025-01-10T12:00:00",
+        ),
+    )
+    res = client.get(OCCUPANCY_URL, query_string={"date": "20250110"})
+    assert res.status_code == 200
+    spaces = res.get_json()["spaces"]
+    assert sorted(spaces) == ["1", "2"]
+    assert spaces["1"]["plan_count"] == 2
+    assert spaces["1"]["peak"] == 2
+    assert spaces["2"]["peak"] == 1
+
+
+def test_occupancy_excludes_cancelled_plans(client):
+    client.post(plan_url("vanning_plan", trsp_instruction_id="A"), json=plan_body())
+    client.post(
+        plan_url("devanning_plan", trsp_instruction_id="B"), json=plan_body(status=-1)
+    )
+    client.post(
+        plan_url("vanning_plan", trsp_instruction_id="C"),
+        json=plan_body(mh_space_list=["2"], status=-1),
+    )
+    spaces = client.get(OCCUPANCY_URL, query_string={"date": "20250110"}).get_json()[
+        "spaces"
+    ]
+    assert sorted(spaces) == ["1"]
+    assert spaces["1"]["plan_count"] == 1
+    assert spaces["1"]["peak"] == 1
+
+
+def test_long_space_name(client):
+    """mh_space_list_str に入る長さの駐車枠は割当を作成して検索できる"""
+    space = "S" * 200
+    res = client.post(
+        plan_url("vanning_plan", trsp_instruction_id="A"),
+        json=plan_body(mh_space_list=[space]),
+    )
+    assert res.status_code == 200
+    res = client.get(
+        f"{API_PREFIX}/plan_space/{TEST_MH}/{space}", query_string={"date": "20250110"}
+    )
+    assert res.status_code == 200
+    assert [p["trsp_instruction_id"] for p in res.get_json()["vanning_plan_list"]] == [
+        "A"
+    ]
+
+
+def test_space_plans_by_is_vanning(client):
+    client.post(plan_url("vanning_plan", trsp_instruction_id="A"), json=plan_body())
+    client.post(plan_url("devanning_plan", trsp_instruction_id="B"), json=plan_body())
+    url = f"{API_PREFIX}/plan_space/{TEST_MH}/1"
+    data = client.get(url, query_string={"date": "20250110"}).get_json()
+    assert [p["trsp_instruction_id"] for p in data["vanning_plan_list"]] == ["A"]
+    assert [p["trsp_instruction_id"] for p in data["devanning_plan_list"]] == ["B"]
+    data = client.get(
+        url, query_string={"date": "20250110", "is_vanning": 0}
+    ).get_json()
+    assert "vanning_plan_list" not in data
+    assert [p["trsp_instruction_id"] for p in data["devanning_plan_list"]] == ["B"]
+    res = client.get(url, query_string={"date": "20250110", "is_vanning": 2})
+    assert res.status_code == 400
+    assert res.get_json()["error_msg"] == "is_vanning must be 0 or 1"
@@ -0,0 +1,197 @@
+# Copyright 2025 Intent Exchange, Inc.
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software
+# and associated documentation files (the “Software”), to deal in the Software without
+# restriction, including without limitation the rights to use, copy, modify, merge, publish,
+# distribute, sublicense, and/or sell copies of the Software, and to permit persons to whom the
+# Software is furnished to do so, subject to the following conditions:
+# The above copyright notice and this permission notice shall be included in all copies or
+# substantial portions of the Software.
+# THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR
+# OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE,
+# ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+# OTHER DEALINGS IN THE SOFTWARE.
+
+import pytest
+
+from conftest import TEST_MH, plan_body, plan_url
+from config import ConfigIns
+
+# 計画の登録・更新（PUT/POST/_bulk）のテスト
+
+PLAN_TYPES = ("vanning_plan", "devanning_plan")
+
+
+@pytest.mark.parametrize("plan_type", PLAN_TYPES)
+def test_post_rejects_long_window(client, plan_type):
+    url = plan_url(plan_type, trsp_instruction_id="T1")
+    res = client.post(
+        url,
+        json=plan_body(
+            req_from_time="2025-01-10T10:00:00", req_to_time="2025-01-11T10:00:01"
+        ),
+    )
+    assert res.status_code == 400
+    assert res.get_json()["error_msg"] == (
+        f"req_to_time must be within {ConfigIns.PLAN_MAX_WINDOW_HOURS} hours "
+        "of req_from_time"
+    )
+    assert client.get(url).get_json()["error_msg"] == "Not Found"
+
+
+@pytest.mark.parametrize("plan_type", PLAN_TYPES)
+def test_post_accepts_max_window(client, plan_type):
+    url = plan_url(plan_type, trsp_instruction_id="T1")
+    res = client.post(
+        url,
+        json=plan_body(
+            req_from_time="2025-01-10T10:00:00", req_to_time="2025-01-11T10:00:00"
+        ),
+    )
+    assert res.status_code == 200
+    # 終了日の一覧にも含まれる
+    res = client.get(plan_url(plan_type), query_string={"date": "20250111"})
+    assert [p["trsp_instruction_id"] for p in res.get_json()[f"{plan_type}_list"]] == [
+        "T1"
+    ]
+
+
+@pytest.mark.parametrize("plan_type", PLAN_TYPES)
+def test_put_rejects_long_window_with_stored_time(client, plan_type):
+    """更新で片方の時間のみ指定した場合も、登録済みの時間と合わせて確認する"""
+    url = plan_url(plan_type, trsp_instruction_id="T1")
+    client.post(url, json=plan_body())
+    res = client.put(url, json={"req_to_time": "2025-01-12T10:00:00"})
+    assert res.status_code == 400
+    assert res.get_json()["result"] is False
+    plan = client.get(url).get_json()[plan_type]
+    assert plan["req_to_time"].startswith("2025-01-10T11:00:00")
+    res = client.put(url, json={"req_to_time": "2025-01-10T20:00:00"})
+    assert res.status_code == 200
+
+
+@pytest.mark.parametrize("plan_type", PLAN_TYPES)
+def test_bulk_rejects_long_window_item(client, plan_type):
+    res = client.post(
+        plan_url(plan_type) + "/_bulk",
+        json=[
+            plan_body(trsp_instruction_id="T1"),
+            plan_body(trsp_instruction_id="T2", req_to_time="2025-01-12T00:00:00"),
+        ],
+    )
+    assert res.status_code == 200
+    data = res.get_json()
+    assert [item["result"] for item in data["results"]] == [True, False]
+    assert data["result"] is False
+    assert client.get(plan_url(plan_type, TEST_MH, "T1")).get_json()["result"]
+    res = client.get(plan_url(plan_type, TEST_MH, "T2"))
+    assert res.get_json()["error_msg"] == "Not Found"
+
+
+@pytest.mark.parametrize("plan_type", PLAN_TYPES)
+@pytest.mark.parametrize(
+    "values, error_msg",
+    [
+        ({"status": "abc"}, "status: Not a valid integer."),
+        ({"shipper_cid": "S" * 51}, "shipper_cid: Longer than maximum length 50."),
+        ({"mh_space_list": [1]}, "mh_space_list: Not a valid string."),
+        (
+            {"mh_space_list": ["S" * 100] * 3},
+            "mh_space_list: Longer than maximum length 256.",
+        ),
+        (
+            {"trailer_giai_list": ["G" * 50] * 3},
+            "trailer_giai_list: Longer than maximum length 140.",
+        ),
+        ({"req_from_time": "not a time"}, "Unknown string format: not a time"),
+    ],
+)
+def test_bulk_rejects_invalid_item(client, plan_type, values, error_msg):
+    """不正な計画のみ登録せず、他の計画は登録する"""
+    res = client.post(
+        plan_url(plan_type) + "/_bulk",
+        json=[
+            plan_body(trsp_instruction_id="T1"),
+            plan_body(trsp_instruction_id="T2", **values),
+        ],
+    )
+    assert res.status_code == 200
+    data = res.get_json()
+    assert [(item["result"], item["error_msg"]) for item in data["results"]] == [
+        (True, ""),
+        (False, error_msg),
+    ]
+    assert client.get(plan_url(plan_type, TEST_MH, "T1")).get_json()["result"]
+    res = client.get(plan_url(plan_type, TEST_MH, "T2"))
+    assert res.get_json()["error_msg"] == "Not Found"
+
+
+@pytest.mark.parametrize("plan_type", PLAN_TYPES)
+def test_bulk_rejects_duplicate_item(client, plan_type):
+    """同じ trsp_instruction_id の2件目以降は登録せず、エラーを返す"""
+    res = client.post(
+        plan_url(plan_type) + "/_bulk",
+        json=[
+            plan_body(trsp_instruction_id="T1", status=1),
+            plan_body(trsp_instruction_id="T2"),
+            plan_body(trsp_instruction_id="T1", status=2),
+        ],
+    )
+    data = res.get_json()
+    assert [(item["result"], item["error_msg"]) for item in data["results"]] == [
+        (True, ""),
+        (True, ""),
+        (False, "duplicate trsp_instruction_id"),
+    ]
+    assert data["result"] is False
+    plan = client.get(plan_url(plan_type, TEST_MH, "T1")).get_json()[plan_type]
+    assert plan["status"] == 1
+
+
+@pytest.mark.parametrize("plan_type", PLAN_TYPES)
+def test_put_returns_stored_plan(client, plan_type):
+    """更新のレスポンスは、指定しなかった項目を含めて更新後の計画を返す"""
+    url = plan_url(plan_type, trsp_instruction_id="T1")
+    res = client.post(url, json=plan_body(shipper_cid="S1", mh_space_list=["1", "2"]))
+    assert res.status_code == 200
+    posted = res.get_json()[plan_type]
+    assert posted == client.get(url).get_json()[plan_type]
+    res = client.put(url, json={"status": 2})
+    assert res.status_code == 200
+    plan = res.get_json()[plan_type]
+    assert plan["status"] == 2
+    assert plan["shipper_cid"] == "S1"
+    assert plan["mh_space_list"] == ["1", "2"]
+    assert plan["req_from_time"] == posted["req_from_time"]
+    assert plan["req_to_time"] == posted["req_to_time"]
+    assert plan == client.get(url).get_json()[plan_type]
+
+
+@pytest.mark.parametrize("plan_type", PLAN_TYPES)
+def test_put_reads_plan_once_after_write(app, client, plan_type):
+    """更新では、イベントの判別と書き込み後の計画の読み込みの2回のみ計画を読み込む"""
+    from sqlalchemy import event
+    from database import db
+
+    url = plan_url(plan_type, trsp_instruction_id="T1")
+    client.post(url, json=plan_body())
+    statements = []
+
+    def record_statement(conn, cursor, statement, *args):
+        if statement.lstrip().upper().startswith("SELECT") and (
+            f"FROM {plan_type}" in statement
+        ):
+            statements.append(statement)
+
+    with app.app_context():
+        engine = db.engine
+    event.listen(engine, "before_cursor_execute", record_statement)
+    try:
+        res = client.put(url, json={"req_to_time": "2025-01-10T12:00:00"})
+    finally:
+        event.remove(engine, "before_cursor_execute", record_statement)
+    assert res.status_code == 200
+    assert res.get_json()[plan_type]["req_to_time"].startswith("2025-01-10T12:00:00")
+    assert len(statements) == 2
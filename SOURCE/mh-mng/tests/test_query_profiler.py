@@ -0,0 +1,45 @@
+# Copyright 2025 Intent Exchange, Inc.
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software
+# and associated documentation files (the “Software”), to deal in the Software without
+# restriction, including without limitation the rights to use, copy, modify, merge, publish,
+# distribute, sublicense, and/or sell copies of the Software, and to permit persons to whom the
+# Software is furnished to do so, subject to the following conditions:
+# The above copyright notice and this permission notice shall be included in all copies or
+# substantial portions of the Software.
+# THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR
+# OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE,
+# ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+# OTHER DEALINGS IN THE SOFTWARE.
+
+import pytest
+from flask import g
+from sqlalchemy.exc import OperationalError
+
+from conftest import plan_body, plan_url
+from database import db
+
+# リクエスト単位のSQLの計測(com.query_profiler)のテスト
+
+
+def test_db_profile_headers(client):
+    url = plan_url("vanning_plan", trsp_instruction_id="T1")
+    res = client.post(url, json=plan_body())
+    assert int(res.headers["X-DB-Queries"]) > 0
+    assert float(res.headers["X-DB-Time"]) >= 0
+
+
+def test_failed_statement_is_not_left_in_timer(app):
+    """エラーで終了したSQLの開始時間が接続に残らず、後続のSQLを計測できる"""
+    with app.test_request_context():
+        for _ in range(3):
+            with pytest.raises(OperationalError):
+                db.session.execute(db.text("SELECT * FROM no_such_table"))
+            db.session.rollback()
+        connection = db.session.connection()
+        assert db.session.execute(db.text("SELECT 1")).scalar() == 1
+        assert g.db_queries == 1
+        assert "query_start_time" not in connection.info
+        db.session.rollback()
@@ -0,0 +1,85 @@
+# Copyright 2025 Intent Exchange, Inc.
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software
+# and associated documentation files (the “Software”), to deal in the Software without
+# restriction, including without limitation the rights to use, copy, modify, merge, publish,
+# distribute, sublicense, and/or sell copies of the Software, and to permit persons to whom the
+# Software is furnished to do so, subject to the following conditions:
+# The above copyright notice and this permission notice shall be included in all copies or
+# substantial portions of the Software.
+# THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR
+# OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE,
+# ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+# OTHER DEALINGS IN THE SOFTWARE.
+
+import pytest
+from flask_restx import marshal
+
+from conftest import plan_body, plan_url
+
+# 計画一覧の変換処理(compile_schema_serializer)のテスト
+
+
+@pytest.fixture(params=["vanning_plan", "devanning_plan"])
+def plan_api(request):
+    """計画の種類ごとの (種類, モデル, スキーマ, 変換処理, restx モデル)"""
+    if request.param == "vanning_plan":
+        from mh_api import vanning_plan_api as api
+        from model.vanning_plan import VanningPlanModel, VanningPlanModelSchema
+
+        return (
+            request.param,
+            VanningPlanModel,
+            VanningPlanModelSchema,
+            api.serialize_vanning_plan,
+            api.post_request_model,
+        )
+    from mh_api import devanning_plan_api as api
+    from model.devanning_plan import DevanningPlanModel, DevanningPlanModelSchema
+
+    return (
+        request.param,
+        DevanningPlanModel,
+        DevanningPlanModelSchema,
+        api.serialize_devanning_plan,
+        api.post_request_model,
+    )
+
+
+def test_serializer_matches_marshal(app, client, plan_api):
+    """登録済みの計画（None の項目、リストの項目を含む）を marshal と同じ形に変換する"""
+    from database import db
+
+    plan_type, model, schema, serialize, restx_model = plan_api
+    client.post(
+        plan_url(plan_type, trsp_instruction_id="T1"),
+        json=plan_body(
+            mh_space_list=["1", "2"],
+            tractor_giai="TR1",
+            trailer_giai_list=["TL1", "TL2"],
+            shipper_cid=None,
+            req_to_time=None,
+        ),
+    )
+    with app.app_context():
+        plan = db.session.query(model).filter_by(trsp_instruction_id="T1").one()
+        serialized = serialize(plan)
+        assert serialized == marshal(schema(many=False).dump(plan), restx_model)
+    assert serialized["mh_space_list"] == ["1", "2"]
+    assert serialized["trailer_giai_list"] == ["TL1", "TL2"]
+    assert serialized["shipper_cid"] is None
+    assert serialized["req_to_time"] is None
+
+
+def test_serializer_matches_marshal_empty_plan(app, plan_api):
+    """項目が未設定の計画（空のリスト、全て None）も marshal と同じ形に変換する"""
+    _, model, schema, serialize, restx_model = plan_api
+    with app.app_context():
+        plan = model(mh="9930000000001", trsp_instruction_id="T1")
+        serialized = serialize(plan)
+        assert serialized == marshal(schema(many=False).dump(plan), restx_model)
+    assert serialized["mh_space_list"] == []
+    assert serialized["trailer_giai_list"] == []
+    assert serialized["req_from_time"] is None